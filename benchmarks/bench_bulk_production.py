@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Compare production ingestion throughput of the single-row endpoint
+(/api/record_production_data) against /api/productions/bulk.
+
+Runs against a throwaway SQLite database unless TEAFARM_DATABASE_URI
+is already set.
+
+Usage:
+    python benchmarks/bench_bulk_production.py --rows 5000 --single-rows 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def seed(db, employees):
+    """Create one farmer with a plucking labour type and its employees."""
+    from models.employee import Employee
+    from models.farmer import Farmer
+    from models.labour import Labour
+
+    farmer = Farmer(name="Bench Farmer", email="bench@farm.com",
+                    phone_number="0700000000", password_hash="x")
+    db.session.add(farmer)
+    db.session.flush()
+    labour = Labour(type="plucking", rate=12.0, farmer_id=farmer.id)
+    db.session.add(labour)
+    db.session.flush()
+    employee_ids = []
+    for number in range(employees):
+        employee = Employee(name=f"Plucker {number}",
+                            phone_number=f"07{number:08d}",
+                            password_hash="x", labour_id=labour.id,
+                            farmer_id=farmer.id)
+        db.session.add(employee)
+        employee_ids.append(employee.id)
+    db.session.commit()
+    return farmer.id, employee_ids
+
+
+def make_rows(employee_ids, count):
+    """Build a day's worth of weigh-ins."""
+    rng = random.Random(42)
+    day = date.today() - timedelta(days=1)
+    return [{
+        "employee_id": rng.choice(employee_ids),
+        "weight": round(rng.uniform(5, 40), 1),
+        "date": day.isoformat()
+    } for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000,
+                        help='rows sent through the bulk endpoint')
+    parser.add_argument('--single-rows', type=int, default=500,
+                        help='rows sent one request at a time')
+    parser.add_argument('--employees', type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='teafarm-bench-')
+    os.environ.setdefault(
+        'TEAFARM_DATABASE_URI',
+        f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+
+    from flask_jwt_extended import create_access_token
+    from web_dynamic.app import create_app
+    app = create_app()
+    from models import db
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        farmer_id, employee_ids = seed(db, args.employees)
+        headers = {'Authorization':
+                   f'Bearer {create_access_token(identity=farmer_id)}'}
+
+    client = app.test_client()
+
+    single_rows = make_rows(employee_ids, args.single_rows)
+    started = time.perf_counter()
+    for row in single_rows:
+        response = client.post('/api/record_production_data',
+                               json=row, headers=headers)
+        assert response.status_code == 201, response.get_data(as_text=True)
+    single_elapsed = time.perf_counter() - started
+
+    bulk_rows = make_rows(employee_ids, args.rows)
+    started = time.perf_counter()
+    response = client.post('/api/productions/bulk',
+                           json={"productions": bulk_rows}, headers=headers)
+    bulk_elapsed = time.perf_counter() - started
+    assert response.status_code == 201, response.get_data(as_text=True)
+
+    single_rate = args.single_rows / single_elapsed
+    bulk_rate = args.rows / bulk_elapsed
+    print(f"single-row endpoint: {args.single_rows} rows in "
+          f"{single_elapsed:.2f}s ({single_rate:,.0f} rows/s)")
+    print(f"bulk endpoint:       {args.rows} rows in "
+          f"{bulk_elapsed:.2f}s ({bulk_rate:,.0f} rows/s)")
+    print(f"speed-up:            {bulk_rate / single_rate:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Compare the old dashboard aggregation (five queries, each wrapping the
+date column in a formatting function) against the single sargable
+query in web_dynamic.services.dashboard.
+
+Runs against a throwaway SQLite database unless TEAFARM_DATABASE_URI
+is already set.
+
+Usage:
+    python benchmarks/bench_dashboard.py --rows 1000000 --farmers 100
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BATCH_SIZE = 10000
+
+
+def seed(db, farmers, rows):
+    """
+    Create farmers, each with a labour type and a few employees, and
+    spread the production and expense rows over the last two years.
+    """
+    from sqlalchemy import insert
+    from models.employee import Employee
+    from models.expense import Expense
+    from models.farmer import Farmer
+    from models.inventory import Inventory
+    from models.labour import Labour
+    from models.production import ProductionRecord
+    from models.production_daily_total import ProductionDailyTotal
+
+    rng = random.Random(42)
+    owners = []
+    for number in range(farmers):
+        farmer = Farmer(name=f"Bench Farmer {number}",
+                        email=f"bench{number}@farm.com",
+                        phone_number=f"07{number:08d}", password_hash="x")
+        db.session.add(farmer)
+        db.session.flush()
+        labour = Labour(type="plucking", rate=12.0, farmer_id=farmer.id)
+        db.session.add(labour)
+        db.session.flush()
+        employee_ids = []
+        for index in range(10):
+            employee = Employee(name=f"Plucker {number}-{index}",
+                                phone_number=f"08{number:05d}{index:03d}",
+                                password_hash="x", labour_id=labour.id,
+                                farmer_id=farmer.id)
+            db.session.add(employee)
+            employee_ids.append(employee.id)
+        db.session.add(Inventory(item_name="Fertilizer", quantity=10,
+                                 farmer_id=farmer.id))
+        owners.append((farmer.id, labour.id, employee_ids))
+    db.session.commit()
+
+    today = date.today()
+    now = datetime.utcnow()
+
+    def production_rows(count):
+        for _ in range(count):
+            farmer_id, labour_id, employee_ids = rng.choice(owners)
+            yield {"id": str(uuid.uuid4()), "created_at": now,
+                   "updated_at": now, "farmer_id": farmer_id,
+                   "employee_id": rng.choice(employee_ids),
+                   "weight": round(rng.uniform(5, 40), 1), "rate": 12.0,
+                   "date": today - timedelta(days=rng.randrange(730))}
+
+    def expense_rows(count):
+        for _ in range(count):
+            farmer_id, labour_id, employee_ids = rng.choice(owners)
+            yield {"id": str(uuid.uuid4()), "created_at": now,
+                   "updated_at": now, "farmer_id": farmer_id,
+                   "category_id": labour_id, "description": "Wages",
+                   "amount": round(rng.uniform(100, 5000), 2),
+                   "date": today - timedelta(days=rng.randrange(730))}
+
+    for model, rows_of, count in ((ProductionRecord, production_rows, rows),
+                                  (Expense, expense_rows, rows // 10)):
+        remaining = count
+        while remaining:
+            batch = min(BATCH_SIZE, remaining)
+            db.session.execute(insert(model), list(rows_of(batch)))
+            db.session.commit()
+            remaining -= batch
+
+    ProductionDailyTotal.rebuild()
+    return [farmer_id for farmer_id, labour_id, employee_ids in owners]
+
+
+def legacy_dashboard_totals(db):
+    """The dashboard queries as they were: one per figure, unsargable."""
+    from models.expense import Expense
+    from models.inventory import Inventory
+    from models.production import ProductionRecord
+
+    if db.engine.dialect.name == 'sqlite':
+        def month_of(column):
+            return db.func.strftime('%Y-%m', column)
+
+        def year_of(column):
+            return db.func.strftime('%Y', column)
+    else:
+        def month_of(column):
+            return db.func.date_format(column, '%Y-%m')
+
+        def year_of(column):
+            return db.func.date_format(column, '%Y')
+
+    current_month = datetime.now().strftime('%Y-%m')
+    current_year = datetime.now().strftime('%Y')
+    return {
+        'total_expenses': db.session.query(db.func.sum(Expense.amount)).filter(
+            month_of(Expense.date) == current_month).scalar() or 0,
+        'total_tea_produced': db.session.query(
+            db.func.sum(ProductionRecord.weight)).filter(
+            month_of(ProductionRecord.date) == current_month).scalar() or 0,
+        'total_expenses_year': db.session.query(
+            db.func.sum(Expense.amount)).filter(
+            year_of(Expense.date) == current_year).scalar() or 0,
+        'total_tea_produced_year': db.session.query(
+            db.func.sum(ProductionRecord.weight)).filter(
+            year_of(ProductionRecord.date) == current_year).scalar() or 0,
+        'total_inventory_balance': db.session.query(
+            db.func.sum(Inventory.quantity)).scalar() or 0,
+    }
+
+
+def time_calls(function, repeat):
+    """Return the mean wall time of a call in milliseconds."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000,
+                        help='production rows to seed')
+    parser.add_argument('--farmers', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='dashboard loads timed per variant')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='teafarm-bench-')
+    os.environ.setdefault(
+        'TEAFARM_DATABASE_URI',
+        f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+
+    from web_dynamic.app import create_app
+    app = create_app()
+    from models import db
+    from web_dynamic.services.dashboard import get_dashboard_totals
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        farmer_ids = seed(db, args.farmers, args.rows)
+        print(f"seeded {args.rows:,} productions and {args.rows // 10:,} "
+              f"expenses in {time.perf_counter() - started:.1f}s")
+
+        farmer_id = farmer_ids[0]
+        legacy_ms = time_calls(lambda: legacy_dashboard_totals(db),
+                               args.repeat)
+        single_ms = time_calls(lambda: get_dashboard_totals(farmer_id),
+                               args.repeat)
+
+    print(f"five unsargable queries:  {legacy_ms:9.1f} ms per dashboard")
+    print(f"single scoped query:      {single_ms:9.1f} ms per dashboard")
+    print(f"speed-up:                 {legacy_ms / single_ms:9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
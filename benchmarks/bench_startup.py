@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Measure how long a fresh worker takes to become useful: the import
+time of web_dynamic.app, broken down with `python -X importtime`, and
+the wall time from interpreter start to a ready app, and how long the
+first request then takes with and without warm_up (what a worker
+forked from a --preload master skips).
+
+Every sample runs in a new interpreter so nothing is cached in
+sys.modules. Runs against a throwaway SQLite database unless
+TEAFARM_DATABASE_URI is already set.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_REQUEST = """
+import sys, time
+started = time.perf_counter()
+from web_dynamic.app import create_app, warm_up
+app = create_app()
+if sys.argv[1] == 'warm':
+    warm_up(app)
+imported = time.perf_counter()
+response = app.test_client().get('/')
+assert response.status_code < 500, response.status_code
+served = time.perf_counter()
+print(imported - started, served - imported)
+"""
+
+
+def run_python(args, env):
+    """Run a fresh interpreter from the repo root and return its output."""
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, env=env, check=True,
+        capture_output=True, text=True)
+
+
+def import_profile(env):
+    """
+    Return the cumulative import time in microseconds of every module
+    imported by web_dynamic.app, keyed by module name.
+    """
+    result = run_python(['-X', 'importtime', '-c', 'import web_dynamic.app'],
+                        env)
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        profile[name.strip()] = int(cumulative_us)
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5,
+                        help='fresh interpreters started per measurement')
+    parser.add_argument('--top', type=int, default=15,
+                        help='slowest imports to list')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault('TEAFARM_DATABASE_URI', 'sqlite:///' + os.path.join(
+        tempfile.mkdtemp(prefix='teafarm-bench-'), 'bench.db'))
+    env['PYTHONPATH'] = os.pathsep.join(
+        filter(None, [ROOT, env.get('PYTHONPATH')]))
+
+    profile = import_profile(env)
+    print(f"import web_dynamic.app: {profile['web_dynamic.app'] / 1000:.1f} ms"
+          " (cumulative, -X importtime)")
+    print(f"slowest of the {len(profile)} imported modules:")
+    for name, cumulative in sorted(
+            profile.items(), key=lambda item: item[1],
+            reverse=True)[1:args.top + 1]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    for mode in ('cold', 'warm'):
+        ready, first_requests = [], []
+        for _ in range(args.runs):
+            output = run_python(['-c', FIRST_REQUEST, mode], env).stdout.split()
+            ready.append(float(output[0]) * 1000)
+            first_requests.append(float(output[1]) * 1000)
+        print(f"{mode}, median over {args.runs} fresh interpreters:")
+        print(f"  app ready:     {statistics.median(ready):8.1f} ms")
+        print(f"  first request: {statistics.median(first_requests):8.1f} ms")
+
+if __name__ == '__main__':
+    main()
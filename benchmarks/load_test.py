@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Drive authenticated traffic at a running app and report latency and
+throughput per endpoint, to size gunicorn workers before harvest peaks.
+
+Every virtual user is one seeded farmer (see `flask seed`). It signs in
+twice: through /api/login for a JWT pair and through /signin for the
+session cookie the dashboard needs. During the run its access token is
+refreshed through /api/refresh every --refresh-every seconds, and at
+once if a request is answered 401.
+
+Requests are started at the target rate whether or not earlier ones
+have finished (an open model, like real pluckers' phones), picking an
+operation from the mix:
+
+    record           POST /api/record_production_data
+    bulk             POST /api/productions/bulk, 50 weigh-ins
+    list             GET /api/productions, first page of 100
+    expenses         GET /api/expenses, first page of 100
+    report           POST /api/reports, the last 90 days by week
+    dashboard        GET /farmer/dashboard
+
+Latency is measured from when a request was due, not when a thread got
+round to sending it, so an overloaded server shows up as growing
+latency rather than as a quietly lower request rate. If the achieved
+rate falls short of the target, add --concurrency or workers.
+
+Usage:
+    flask seed --reset --scale small
+    # wsgi.py uses ProductionConfig, which refuses to start without
+    # TEAFARM_SECRET_KEY and JWT_SECRET_KEY; gunicorn.conf.py binds
+    # 0.0.0.0:5004 unless TEAFARM_BIND says otherwise
+    export TEAFARM_SECRET_KEY=... JWT_SECRET_KEY=...
+    gunicorn -c gunicorn.conf.py wsgi:app
+    python benchmarks/load_test.py --url http://127.0.0.1:5004 \\
+        --rate 100 --duration 60 --mix record=40,list=20,report=10,dashboard=30
+
+    # Or serve the app from this process, on TEAFARM_DATABASE_URI
+    python benchmarks/load_test.py --serve --rate 50 --duration 30
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from urllib.parse import urlencode, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from run_suite import percentile  # noqa: E402
+
+DEFAULT_MIX = 'record=35,bulk=5,list=20,expenses=10,report=10,dashboard=20'
+BULK_ROWS = 50
+OPERATIONS = ('record', 'bulk', 'list', 'expenses', 'report', 'dashboard')
+
+_CSRF_TOKEN = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+
+
+class Client:
+    """One keep-alive HTTP connection, for the thread that owns it."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self._host = parts.hostname
+        self._port = parts.port or 80
+        self._connection = None
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        Send a request and read the whole response.
+
+        Returns:
+            tuple: The status, the response headers and the body.
+        """
+        headers = dict(headers or {})
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        for attempt in range(2):
+            if self._connection is None:
+                self._connection = http.client.HTTPConnection(
+                    self._host, self._port, timeout=60)
+            try:
+                self._connection.request(method, path, body, headers)
+                response = self._connection.getresponse()
+                return response.status, response.headers, response.read()
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed an idle keep-alive connection
+                self._connection.close()
+                self._connection = None
+                if attempt:
+                    raise
+
+
+class VirtualUser:
+    """A signed in farmer: its tokens, session cookie and employees."""
+
+    def __init__(self, number, password):
+        self.number = number
+        self.email = f"farmer{number}@seed.teafarm.test"
+        self.phone_number = f"07{number:08d}"
+        self.password = password
+        self.access_token = None
+        self.refresh_token = None
+        self.refreshed_at = 0.0
+        self.cookie = None
+        self.employee_ids = []
+        self.rng = random.Random(number)
+
+    def auth(self):
+        return {'Authorization': f'Bearer {self.access_token}'}
+
+    def session(self):
+        return {'Cookie': self.cookie} if self.cookie else {}
+
+
+def session_cookie(headers):
+    """Return the session cookie set by a response, if any."""
+    for value in headers.get_all('Set-Cookie') or ():
+        pair = value.split(';', 1)[0]
+        if pair.startswith('session='):
+            return pair
+    return None
+
+
+class Recorder:
+    """Latencies and failures per endpoint, shared by every thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, name, due, ok):
+        latency = (time.perf_counter() - due) * 1000
+        with self._lock:
+            self.latencies[name].append(latency)
+            if not ok:
+                self.errors[name] += 1
+
+    def summary(self, elapsed):
+        """Return count, errors, throughput and percentiles by endpoint."""
+        summary = {}
+        for name in sorted(self.latencies):
+            samples = self.latencies[name]
+            summary[name] = {
+                'requests': len(samples),
+                'errors': self.errors[name],
+                'throughput_rps': round(len(samples) / elapsed, 2),
+                'p50_ms': round(percentile(samples, 0.50), 2),
+                'p95_ms': round(percentile(samples, 0.95), 2),
+                'p99_ms': round(percentile(samples, 0.99), 2),
+                'max_ms': round(max(samples), 2),
+            }
+        return summary
+
+
+def sign_in(client, user, recorder):
+    """Sign a user in through the API and the web form."""
+    due = time.perf_counter()
+    status, _, body = client.request('POST', '/api/login', {
+        'email': user.email, 'password': user.password})
+    recorder.record('login', due, status == 200)
+    if status != 200:
+        raise RuntimeError(f"{user.email} could not log in ({status}); "
+                           f"is the database seeded?")
+    tokens = json.loads(body)
+    user.access_token = tokens['access_token']
+    user.refresh_token = tokens['refresh_token']
+    user.refreshed_at = time.monotonic()
+
+    status, headers, body = client.request('GET', '/signin')
+    user.cookie = session_cookie(headers)
+    form = {'phone_number': user.phone_number, 'password': user.password}
+    match = _CSRF_TOKEN.search(body.decode())
+    if match:
+        form['csrf_token'] = match.group(1)
+    due = time.perf_counter()
+    status, headers, _ = client.request(
+        'POST', '/signin', urlencode(form), dict(user.session(), **{
+            'Content-Type': 'application/x-www-form-urlencoded'}))
+    recorder.record('signin', due, status == 302)
+    user.cookie = session_cookie(headers) or user.cookie
+
+    # Weigh-ins are recorded for the pluckers
+    _, _, body = client.request('GET', '/api/labours', headers=user.auth())
+    plucking = {labour['id'] for labour in json.loads(body)['labours']
+                if labour['type'] == 'plucking'}
+    _, _, body = client.request('GET', '/api/employees?limit=1000',
+                                headers=user.auth())
+    user.employee_ids = [employee['id']
+                         for employee in json.loads(body)['employees']
+                         if employee['labour_id'] in plucking]
+    if not user.employee_ids:
+        raise RuntimeError(f"{user.email} has no pluckers")
+
+
+def refresh(client, user, recorder):
+    """Swap the refresh token for a new access token."""
+    due = time.perf_counter()
+    status, _, body = client.request(
+        'POST', '/api/refresh',
+        headers={'Authorization': f'Bearer {user.refresh_token}'})
+    recorder.record('refresh', due, status == 200)
+    if status == 200:
+        user.access_token = json.loads(body)['access_token']
+        user.refreshed_at = time.monotonic()
+
+
+def weigh_in(user):
+    return {'employee_id': user.rng.choice(user.employee_ids),
+            'weight': round(user.rng.uniform(5, 40), 1),
+            'date': date.today().isoformat()}
+
+
+def operation(name, user):
+    """Return the method, path, body and expected status of a request."""
+    if name == 'record':
+        return 'POST', '/api/record_production_data', weigh_in(user), 201
+    if name == 'bulk':
+        return 'POST', '/api/productions/bulk', {
+            'productions': [weigh_in(user) for _ in range(BULK_ROWS)]}, 201
+    if name == 'list':
+        return 'GET', '/api/productions?limit=100', None, 200
+    if name == 'expenses':
+        return 'GET', '/api/expenses?limit=100', None, 200
+    if name == 'report':
+        today = date.today()
+        return 'POST', '/api/reports', {
+            'report_type': 'production', 'granularity': 'week',
+            'start': (today - timedelta(days=90)).isoformat(),
+            'end': today.isoformat()}, 200
+    return 'GET', '/farmer/dashboard', None, 200
+
+
+def send(client, user, name, due, recorder, refresh_every):
+    """Make one request of the mix as a user."""
+    if time.monotonic() - user.refreshed_at > refresh_every:
+        refresh(client, user, recorder)
+    method, path, body, expected = operation(name, user)
+    headers = user.session() if name == 'dashboard' else user.auth()
+    status, _, _ = client.request(method, path, body, headers)
+    if status == 401 and name != 'dashboard':
+        refresh(client, user, recorder)
+        status, _, _ = client.request(method, path, body, user.auth())
+    recorder.record(name, due, status == expected)
+
+
+def parse_mix(mix):
+    """Turn "record=40,list=20" into names and cumulative weights."""
+    names, weights = [], []
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown operation {name!r}; pick from "
+                             f"{', '.join(OPERATIONS)}")
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+def run(url, users, rate, duration, mix, concurrency, refresh_every):
+    """Run the load and return the recorder and the seconds it took."""
+    names, weights = parse_mix(mix)
+    recorder = Recorder()
+
+    client = Client(url)
+    for user in users:
+        sign_in(client, user, recorder)
+
+    free_users = queue.Queue()
+    for user in users:
+        free_users.put(user)
+    due_requests = queue.Queue()
+
+    def worker():
+        own_client = Client(url)
+        while True:
+            item = due_requests.get()
+            if item is None:
+                return
+            name, due = item
+            user = free_users.get()
+            try:
+                send(own_client, user, name, due, recorder, refresh_every)
+            except Exception as e:
+                print(f"{name}: {e}", file=sys.stderr)
+                recorder.record(name, due, False)
+            finally:
+                free_users.put(user)
+
+    threads = [threading.Thread(target=worker, daemon=True)
+               for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+
+    rng = random.Random(0)
+    interval = 1 / rate
+    started = time.perf_counter()
+    for number in range(int(rate * duration)):
+        due = started + number * interval
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        due_requests.put((rng.choices(names, weights)[0], due))
+    for _ in threads:
+        due_requests.put(None)
+    for thread in threads:
+        thread.join()
+    return recorder, time.perf_counter() - started
+
+
+def serve(port):
+    """Serve the app from this process, for a quick local run."""
+    from werkzeug.serving import make_server
+    from web_dynamic.app import create_app
+
+    # One access log line per request would drown the summary
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    app = create_app({'REQUEST_LOG': False})
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def print_summary(summary, elapsed, rate):
+    total = sum(row['requests'] for name, row in summary.items()
+                if name not in ('login', 'signin'))
+    print(f"{total} requests in {elapsed:.1f}s: "
+          f"{total / elapsed:.1f} req/s (target {rate:g})")
+    print(f"{'endpoint':<10} {'requests':>8} {'errors':>6} {'req/s':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, row in summary.items():
+        print(f"{name:<10} {row['requests']:>8} {row['errors']:>6} "
+              f"{row['throughput_rps']:>7.1f} {row['p50_ms']:>8.1f} "
+              f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+              f"{row['max_ms']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5004',
+                        help='base URL of the running app')
+    parser.add_argument('--serve', action='store_true',
+                        help='serve the app from this process instead')
+    parser.add_argument('--users', type=int, default=10,
+                        help='seeded farmers to sign in as')
+    parser.add_argument('--password', default='teafarm-seed')
+    parser.add_argument('--rate', type=float, default=50,
+                        help='requests started per second')
+    parser.add_argument('--duration', type=float, default=30,
+                        help='seconds to run for')
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help='operations and their weights')
+    parser.add_argument('--concurrency', type=int, default=32,
+                        help='requests in flight at most')
+    parser.add_argument('--refresh-every', type=float, default=300,
+                        help='seconds between access token refreshes')
+    parser.add_argument('--output', default=None,
+                        help='also write the results here as JSON')
+    args = parser.parse_args()
+
+    url = serve(0) if args.serve else args.url
+    users = [VirtualUser(number, args.password)
+             for number in range(args.users)]
+    recorder, elapsed = run(url, users, args.rate, args.duration, args.mix,
+                            args.concurrency, args.refresh_every)
+    summary = recorder.summary(elapsed)
+    print_summary(summary, elapsed, args.rate)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'url': url, 'rate': args.rate,
+                       'duration_s': round(elapsed, 2), 'mix': args.mix,
+                       'users': args.users, 'endpoints': summary},
+                      output, indent=2)
+            output.write('\n')
+    if any(row['errors'] for row in summary.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
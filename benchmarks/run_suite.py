@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Time the hot paths of the app at realistic data sizes and compare the
+results against a stored baseline.
+
+For each size, a fresh database is seeded with that many production
+records (and a tenth as many expenses) spread over two years, many
+farmers and their employees, then every case below is run through the
+test client and timed:
+
+    dashboard               /farmer/dashboard with the cache emptied
+    dashboard_cached        /farmer/dashboard served from the cache
+    report_production       POST /api/reports, a year by month
+    report_expenses         POST /api/reports, a quarter by week
+    payroll                 GET /api/payroll, the last 31 days
+    list_productions        GET /api/productions, first page of 100
+    list_expenses           GET /api/expenses, first page of 100
+    list_employees          GET /api/employees
+    record_production       POST /api/record_production_data
+    record_production_bulk  POST /api/productions/bulk, 500 rows
+    pdf_render              a year's report rendered to PDF (skipped
+                            when WeasyPrint is not installed)
+
+Timings go through the whole Flask stack but not a network. The
+results, with the median, 95th percentile and fastest run of each case
+in milliseconds, are written as JSON. Given a baseline, any case whose
+median and fastest run both got slower than the tolerance allows is
+reported and the exit status is 1.
+
+Runs against throwaway SQLite files unless --database-uri is given;
+that database (e.g. a scratch MySQL schema) is dropped and re-created
+for every size.
+
+Usage:
+    python benchmarks/run_suite.py --sizes 10000 100000 1000000
+    python benchmarks/run_suite.py --sizes 10000 100000 \\
+        --baseline benchmarks/baseline.json
+    python benchmarks/run_suite.py --sizes 10000 100000 \\
+        --output benchmarks/baseline.json
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import math
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_dashboard import seed  # noqa: E402
+
+DEFAULT_SIZES = (10000, 100000)
+# Production records each farmer holds, on average
+ROWS_PER_FARMER = 2000
+BULK_ROWS = 500
+
+
+def percentile(samples, fraction):
+    """Return a percentile of the samples, nearest-rank."""
+    ordered = sorted(samples)
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(samples):
+    """Return the median, 95th percentile and fastest run in ms."""
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(percentile(samples, 0.95), 3),
+        'min_ms': round(min(samples), 3),
+        'runs': len(samples),
+    }
+
+
+def time_case(case, repeat, warmup=1):
+    """Run a case warmup + repeat times and return the timed runs."""
+    samples = []
+    for run in range(warmup + repeat):
+        started = time.perf_counter()
+        case()
+        elapsed = (time.perf_counter() - started) * 1000
+        if run >= warmup:
+            samples.append(elapsed)
+    return samples
+
+
+def expect(response, status):
+    """Fail the run when a case stops returning what it should."""
+    if response.status_code != status:
+        raise RuntimeError(
+            f"{response.request.method} {response.request.path} returned "
+            f"{response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return response
+
+
+def weasyprint_available():
+    # WeasyPrint explains missing system libraries on stdout, where the
+    # JSON goes
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            import weasyprint  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def build_cases(app, client, farmer_id, employee_ids, workdir):
+    """Return the named cases, each a function making one call."""
+    from flask import render_template
+    from flask_jwt_extended import create_access_token
+    from web_dynamic.services import pdf_jobs
+    from web_dynamic.services.dashboard import dashboard_cache
+    from web_dynamic.services.reporting import build_report
+
+    with app.app_context():
+        headers = {'Authorization':
+                   f'Bearer {create_access_token(identity=farmer_id)}'}
+    with client.session_transaction() as session:
+        session['_user_id'] = f'farmer:{farmer_id}'
+        session['_fresh'] = True
+
+    rng = random.Random(7)
+    today = date.today()
+
+    def weigh_in():
+        return {"employee_id": rng.choice(employee_ids),
+                "weight": round(rng.uniform(5, 40), 1),
+                "date": (today - timedelta(days=1)).isoformat()}
+
+    def dashboard():
+        dashboard_cache.clear()
+        expect(client.get('/farmer/dashboard'), 200)
+
+    def dashboard_cached():
+        expect(client.get('/farmer/dashboard'), 200)
+
+    def report_production():
+        expect(client.post('/api/reports', headers=headers, json={
+            'report_type': 'production', 'granularity': 'month',
+            'start': (today - timedelta(days=365)).isoformat(),
+            'end': today.isoformat()}), 200)
+
+    def report_expenses():
+        expect(client.post('/api/reports', headers=headers, json={
+            'report_type': 'expenses', 'granularity': 'week',
+            'start': (today - timedelta(days=91)).isoformat(),
+            'end': today.isoformat()}), 200)
+
+    def payroll():
+        expect(client.get('/api/payroll', headers=headers, query_string={
+            'start': (today - timedelta(days=30)).isoformat(),
+            'end': today.isoformat()}), 200)
+
+    def list_productions():
+        expect(client.get('/api/productions?limit=100', headers=headers), 200)
+
+    def list_expenses():
+        expect(client.get('/api/expenses?limit=100', headers=headers), 200)
+
+    def list_employees():
+        expect(client.get('/api/employees', headers=headers), 200)
+
+    def record_production():
+        expect(client.post('/api/record_production_data', headers=headers,
+                           json=weigh_in()), 201)
+
+    def record_production_bulk():
+        expect(client.post('/api/productions/bulk', headers=headers, json={
+            'productions': [weigh_in() for _ in range(BULK_ROWS)]}), 201)
+
+    cases = {
+        'dashboard': dashboard,
+        'dashboard_cached': dashboard_cached,
+        'report_production': report_production,
+        'report_expenses': report_expenses,
+        'payroll': payroll,
+        'list_productions': list_productions,
+        'list_expenses': list_expenses,
+        'list_employees': list_employees,
+        'record_production': record_production,
+        'record_production_bulk': record_production_bulk,
+    }
+
+    if weasyprint_available():
+        with app.test_request_context():
+            start = today - timedelta(days=365)
+            report = build_report('production', farmer_id, start,
+                                  today + timedelta(days=1), 'month')
+            report.update(report_type='production', granularity='month',
+                          start=start.isoformat(), end=today.isoformat())
+            html = render_template('report_template.html', report=report)
+        pdf_path = os.path.join(workdir, 'report.pdf')
+
+        def pdf_render():
+            pdf_jobs.render_pdf(html, pdf_path)
+
+        cases['pdf_render'] = pdf_render
+    return cases
+
+
+def run_size(rows, args, workdir):
+    """Seed a database with rows production records and time every case."""
+    from models import db
+    from web_dynamic.app import create_app
+
+    uri = args.database_uri or \
+        f"sqlite:///{os.path.join(workdir, f'bench-{rows}.db')}"
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'WTF_CSRF_ENABLED': False,
+        'REQUEST_LOG': False,
+        'PDF_RENDER_WORKERS': 0,
+    })
+    # Slow-request and N+1 warnings would drown the results
+    app.logger.setLevel(logging.ERROR)
+
+    farmers = args.farmers or max(rows // ROWS_PER_FARMER, 5)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        farmer_ids = seed(db, farmers, rows)
+        seconds = time.perf_counter() - started
+        from models.employee import Employee
+        farmer_id = farmer_ids[0]
+        employee_ids = [employee_id for employee_id, in db.session.query(
+            Employee.id).filter_by(farmer_id=farmer_id)]
+        db.session.remove()
+    print(f"seeded {rows:,} productions for {farmers} farmers in "
+          f"{seconds:.1f}s", file=sys.stderr)
+
+    client = app.test_client()
+    cases = build_cases(app, client, farmer_id, employee_ids, workdir)
+    results = {}
+    for name, case in cases.items():
+        if args.cases and name not in args.cases:
+            continue
+        results[name] = summarize(time_case(case, args.repeat))
+        print(f"  {rows:>9,} {name:<24} "
+              f"median {results[name]['median_ms']:9.2f} ms  "
+              f"p95 {results[name]['p95_ms']:9.2f} ms", file=sys.stderr)
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    return results
+
+
+def environment():
+    """Describe where the numbers were measured."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+    }
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """
+    Return a line per case that got slower than the baseline by more
+    than tolerance (a fraction) and min_delta_ms. Both the median and
+    the fastest run must have slowed down, so a noisy neighbour
+    stalling a few runs is not taken for a regression. Cases or sizes
+    missing from either side are not compared.
+    """
+    def slower(before, after):
+        return after > before * (1 + tolerance) and \
+            after - before > min_delta_ms
+
+    regressions = []
+    for size, cases in results.items():
+        for name, current in cases.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            before, after = previous['median_ms'], current['median_ms']
+            if slower(before, after) and \
+                    slower(previous['min_ms'], current['min_ms']):
+                regressions.append(
+                    f"{name} at {int(size):,} rows: median {before:.2f} ms "
+                    f"-> {after:.2f} ms ({after / before - 1:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=list(DEFAULT_SIZES),
+                        help='production records to seed, one run per size')
+    parser.add_argument('--farmers', type=int, default=None,
+                        help=f'farmers to spread them over (default: one '
+                             f'per {ROWS_PER_FARMER} records)')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='timed runs per case')
+    parser.add_argument('--cases', nargs='+', default=None,
+                        help='run only these cases')
+    parser.add_argument('--database-uri', default=None,
+                        help='database to use instead of SQLite files; '
+                             'it is dropped and re-created')
+    parser.add_argument('--output', default=None,
+                        help='write the results here as JSON')
+    parser.add_argument('--baseline', default=None,
+                        help='results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='slow-down allowed, as a fraction')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='slow-down in ms ignored however large the '
+                             'fraction, to keep fast cases from flapping')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='teafarm-bench-')
+    results = {str(rows): run_size(rows, args, workdir)
+               for rows in args.sizes}
+    report = {'environment': environment(), 'repeat': args.repeat,
+              'results': results}
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+            output.write('\n')
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as stored:
+            baseline = json.load(stored)
+        regressions = compare(results, baseline['results'],
+                              args.tolerance, args.min_delta_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
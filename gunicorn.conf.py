@@ -0,0 +1,55 @@
+"""
+Gunicorn settings for TeaFarm Pro.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden on the command line or through
+GUNICORN_CMD_ARGS.
+"""
+
+import glob
+import multiprocessing
+import os
+import tempfile
+
+bind = os.getenv('TEAFARM_BIND', '0.0.0.0:5004')
+workers = int(os.getenv('TEAFARM_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+# Build and warm up the app once in the master, then fork
+preload_app = True
+
+# Workers write their Prometheus samples here so that /metrics adds up
+# all of them. Samples from a previous run must not be counted, and the
+# variable has to be set before the app imports prometheus_client. The
+# directory may be one the operator shares with other files, so only
+# the sample files (*.db) are removed.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(
+    tempfile.gettempdir(), 'teafarm-prometheus'))
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+for path in glob.glob(os.path.join(os.environ['PROMETHEUS_MULTIPROC_DIR'],
+                                   '*.db')):
+    os.remove(path)
+
+
+def post_fork(server, worker):
+    """
+    Drop state a worker must not share with the master or its siblings.
+    """
+    from models import db
+    from web_dynamic.services import pdf_jobs
+    from wsgi import app
+
+    # Forget pooled connections inherited from the master without
+    # closing them, as the master's sockets are not ours to close
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    # The rendering pool is created lazily in each worker
+    pdf_jobs._executor = None
+
+
+def child_exit(server, worker):
+    """Stop counting the gauges of a worker that has gone."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
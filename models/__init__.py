@@ -3,10 +3,15 @@
 Initialize the models package
 """
 
+import os
 from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 
+# Alembic revisions that own the schema once they exist
+MIGRATIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
 
 def init_app(app):
     # Bind the SQLAlchemy object to the app
@@ -20,7 +25,12 @@ def init_app(app):
     from .market_value import MarketValue
     from .production import ProductionRecord
     from .expense import Expense
+    from .production_daily_total import ProductionDailyTotal
+    from .revoked_token import RevokedToken
+    from .dashboard_version import DashboardVersion
 
-    # Create all tables (optional, remove if migrations are used)
-    with app.app_context():
-        db.create_all()
+    # Create missing tables only when no migrations manage the schema;
+    # otherwise run `flask db upgrade`. CREATE_ALL forces either way.
+    if app.config.get('CREATE_ALL', not os.path.isdir(MIGRATIONS_DIR)):
+        with app.app_context():
+            db.create_all()
@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+"""
+Module for class DashboardVersion
+"""
+
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models.base_model import db
+
+# Row counting writes whose farmers are unknown, e.g. a bulk UPDATE
+ALL_FARMERS = '*'
+
+
+class DashboardVersion(db.Model):
+    """
+    How many times a farmer's dashboard figures have changed.
+
+    The version is bumped in the transaction that writes the farmer's
+    productions, expenses or inventory, so every worker sees the new
+    version together with the new rows and can tell its cached figures
+    are stale. The ALL_FARMERS row is bumped by writes that may touch
+    any farmer.
+    """
+    __tablename__ = 'dashboard_versions'
+
+    farmer_id = db.Column(db.String(128), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        """Return a string representation of the instance."""
+        return (f"< DashboardVersion(farmer_id={self.farmer_id}, "
+                f"version={self.version}) >")
+
+    @classmethod
+    def current(cls, session, farmer_id):
+        """
+        Return the versions a farmer's cached figures depend on.
+
+        Returns:
+            tuple: The ALL_FARMERS version and the farmer's own.
+        """
+        versions = dict(session.execute(
+            select(cls.farmer_id, cls.version).where(
+                cls.farmer_id.in_((ALL_FARMERS, farmer_id)))).all())
+        return versions.get(ALL_FARMERS, 0), versions.get(farmer_id, 0)
+
+    @classmethod
+    def bump(cls, session, farmer_ids):
+        """
+        Add one to the version of each farmer, creating missing rows.
+
+        Args:
+            session: The session whose transaction receives the writes.
+            farmer_ids (iterable): The farmers, or ALL_FARMERS.
+        """
+        rows = [{'farmer_id': farmer_id, 'version': 1}
+                for farmer_id in sorted(farmer_ids)]
+        if not rows:
+            return
+
+        table = cls.__table__
+        dialect = session.get_bind().dialect.name
+        if dialect == 'sqlite':
+            statement = sqlite_insert(table)
+            session.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.farmer_id],
+                set_={'version': table.c.version + 1}), rows)
+        elif dialect == 'mysql':
+            statement = mysql_insert(table)
+            session.execute(statement.on_duplicate_key_update(
+                version=table.c.version + 1), rows)
+        else:
+            # Portable, at one UPDATE per farmer
+            update = table.update().values(version=table.c.version + 1)
+            missing = [row for row in rows if session.execute(
+                update.where(table.c.farmer_id == row['farmer_id'])
+            ).rowcount == 0]
+            if missing:
+                session.execute(table.insert(), missing)
@@ -23,10 +23,16 @@ class Employee(BaseModel, UserMixin):
     labour_id = db.Column(db.String(128), db.ForeignKey('labours.id'), nullable=False)
     farmer_id = db.Column(db.String(128), db.ForeignKey('farmers.id'), nullable=False)
 
-    __table_args__ = (db.UniqueConstraint('name', 'phone_number', 'farmer_id', name='unique_employee_name_phone_per_farmer'), )
+    __table_args__ = (
+        db.UniqueConstraint('name', 'phone_number', 'farmer_id', name='unique_employee_name_phone_per_farmer'),
+        # The employee list is paged per farmer by (created_at, id)
+        db.Index('ix_employees_farmer_id_created_at', 'farmer_id', 'created_at'),
+    )
 
     productions = db.relationship('ProductionRecord', back_populates='employee')
-    job_type = db.relationship('Labour', back_populates='employees')
+    # Employee lists eager-load the job type with joinedload
+    job_type = db.relationship('Labour', back_populates='employees',
+                               innerjoin=True)
     farmer = relationship('Farmer', back_populates='employees')
 
     def __init__(self, *args, **kwargs):
@@ -43,6 +49,11 @@ class Employee(BaseModel, UserMixin):
         """Checks the password against the stored hash."""
         return check_password_hash(self.password_hash, password)
 
+    def get_id(self):
+        """Return the session identity: the principal type and the id,
+        so loading the user back is a single primary-key lookup."""
+        return f"employee:{self.id}"
+
     @classmethod
     def get_employees(cls):
         """Method to retrieve all employees"""
@@ -25,8 +25,15 @@ class Expense(BaseModel):
         db.ForeignKey('farmers.id'),
         nullable=False)
 
-    # Relationship with Labour model
-    category = db.relationship('Labour', backref='expenses')
+    # Reports and the dashboard filter by farmer plus a date range
+    __table_args__ = (
+        db.Index('ix_expenses_farmer_id_date', 'farmer_id', 'date'),
+    )
+
+    # Relationship with Labour model; eager-load it with joinedload
+    # where a list shows the category
+    category = db.relationship('Labour', backref='expenses',
+                               innerjoin=True)
 
     def __init__(self, *args, **kwargs):
         """
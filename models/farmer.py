@@ -39,6 +39,11 @@ class Farmer(BaseModel, UserMixin):
         """Checks the password against the stored hash."""
         return check_password_hash(self.password_hash, password)
 
+    def get_id(self):
+        """Return the session identity: the principal type and the id,
+        so loading the user back is a single primary-key lookup."""
+        return f"farmer:{self.id}"
+
     @property
     def is_farmer(self):
         return True
@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+"""
+Index audit for the hot read paths.
+
+Runs EXPLAIN on the queries behind the dashboard, the reports and the
+production views and reports every query that falls back to a full
+table scan.
+"""
+
+from datetime import date, timedelta
+from sqlalchemy import select, func
+from models import db
+from models.employee import Employee
+from models.expense import Expense
+from models.inventory import Inventory
+from models.production import ProductionRecord
+from models.production_daily_total import ProductionDailyTotal
+
+
+def hot_queries(farmer_id='audit', employee_id='audit', today=None):
+    """
+    Return the hot read queries keyed by name.
+
+    The filters mirror what the routes send: a farmer or an employee
+    plus a half-open date range, or a keyset page of a farmer's rows.
+    """
+    today = today or date.today()
+    month_start = today.replace(day=1)
+    year_start = today.replace(month=1, day=1)
+    week_start = today - timedelta(days=today.weekday())
+    tomorrow = today + timedelta(days=1)
+
+    return {
+        'production_by_farmer_and_date': select(
+            ProductionRecord.id, ProductionRecord.weight,
+            ProductionRecord.rate, ProductionRecord.date
+        ).where(
+            ProductionRecord.farmer_id == farmer_id,
+            ProductionRecord.date >= week_start,
+            ProductionRecord.date < tomorrow
+        ),
+        'production_totals_by_farmer': select(
+            func.sum(ProductionRecord.weight)
+        ).where(
+            ProductionRecord.farmer_id == farmer_id,
+            ProductionRecord.date >= year_start,
+            ProductionRecord.date < tomorrow
+        ),
+        'daily_totals_by_farmer_and_date': select(
+            func.sum(ProductionDailyTotal.total_weight)
+        ).where(
+            ProductionDailyTotal.farmer_id == farmer_id,
+            ProductionDailyTotal.date >= month_start,
+            ProductionDailyTotal.date < tomorrow
+        ),
+        'production_by_employee_and_date': select(
+            ProductionRecord.id, ProductionRecord.weight,
+            ProductionRecord.date
+        ).where(
+            ProductionRecord.employee_id == employee_id,
+            ProductionRecord.date >= month_start,
+            ProductionRecord.date < tomorrow
+        ),
+        'expenses_by_farmer_and_date': select(
+            Expense.id, Expense.amount, Expense.date
+        ).where(
+            Expense.farmer_id == farmer_id,
+            Expense.date >= month_start,
+            Expense.date < tomorrow
+        ),
+        'production_page_by_farmer': select(
+            ProductionRecord.id, ProductionRecord.date
+        ).where(
+            ProductionRecord.farmer_id == farmer_id,
+            ProductionRecord.date <= today
+        ).order_by(
+            ProductionRecord.date.desc(), ProductionRecord.id.desc()
+        ).limit(100),
+        'employee_page_by_farmer': select(
+            Employee.id, Employee.created_at
+        ).where(
+            Employee.farmer_id == farmer_id,
+            Employee.created_at <= tomorrow
+        ).order_by(
+            Employee.created_at.desc(), Employee.id.desc()
+        ).limit(100),
+        'inventory_page_by_farmer': select(
+            Inventory.id, Inventory.created_at
+        ).where(
+            Inventory.farmer_id == farmer_id,
+            Inventory.created_at <= tomorrow
+        ).order_by(
+            Inventory.created_at.desc(), Inventory.id.desc()
+        ).limit(100),
+        'expense_totals_by_farmer': select(
+            func.sum(Expense.amount)
+        ).where(
+            Expense.farmer_id == farmer_id,
+            Expense.date >= year_start,
+            Expense.date < tomorrow
+        ),
+    }
+
+
+def explain(statement, session=None):
+    """Return the EXPLAIN rows for a statement as dictionaries."""
+    session = session or db.session
+    connection = session.connection()
+    dialect = connection.dialect
+    sql = str(statement.compile(
+        dialect=dialect, compile_kwargs={'literal_binds': True}))
+    if dialect.name == 'sqlite':
+        sql = 'EXPLAIN QUERY PLAN ' + sql
+    else:
+        sql = 'EXPLAIN ' + sql
+    result = connection.exec_driver_sql(sql)
+    return [dict(row._mapping) for row in result]
+
+
+def is_full_scan(plan, dialect_name):
+    """Tell whether an EXPLAIN plan contains a full table scan."""
+    if dialect_name == 'sqlite':
+        # SQLite reports index lookups as SEARCH and scans as SCAN; a
+        # SELECT without a FROM clause shows up as a constant row scan,
+        # and reading back a subquery's result as a scan of its name
+        details = [str(row.get('detail', '')) for row in plan]
+        subqueries = {detail.split(' ', 1)[1] for detail in details
+                      if detail.startswith(('MATERIALIZE ', 'CO-ROUTINE '))}
+        return any(detail.startswith('SCAN ') and
+                   detail != 'SCAN CONSTANT ROW' and
+                   detail[len('SCAN '):] not in subqueries
+                   for detail in details)
+    # MySQL reports full table and full index scans as ALL and index
+    return any(str(row.get('type', '')).lower() in ('all', 'index')
+               for row in plan)
+
+
+def audit_hot_queries(session=None):
+    """
+    EXPLAIN every hot query and return the names of those that do a
+    full scan, mapped to their plans.
+    """
+    session = session or db.session
+    dialect_name = session.get_bind().dialect.name
+    offenders = {}
+    for name, statement in hot_queries().items():
+        plan = explain(statement, session)
+        if is_full_scan(plan, dialect_name):
+            offenders[name] = plan
+    return offenders
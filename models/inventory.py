@@ -27,6 +27,12 @@ class Inventory(BaseModel):
             nullable=False)
     farmer = db.relationship('Farmer', backref=db.backref('inventories', lazy=True))
 
+    # The inventory list is paged per farmer by (created_at, id)
+    __table_args__ = (
+        db.Index('ix_inventories_farmer_id_created_at',
+                 'farmer_id', 'created_at'),
+    )
+
     def __repr__(self):
         """
         Return a string representation of the Inventory instance.
@@ -52,7 +58,7 @@ class Inventory(BaseModel):
             'id': self.id,
             'item_name': self.item_name,
             'quantity': self.quantity,
-            'date_added': self.date_added.isoformat()
+            'date_added': self.created_at.isoformat()
         }
 
 
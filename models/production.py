@@ -4,6 +4,7 @@ Module for class ProductionRecord
 """
 
 from sqlalchemy import Column, Float, ForeignKey, Date
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from models.base_model import BaseModel, db
 
@@ -28,8 +29,17 @@ class ProductionRecord(BaseModel):
         nullable=False
     )
 
-    # Relationship with the Employee model
-    employee = relationship('Employee', back_populates='productions')
+    # Hot read paths filter by farmer or employee plus a date range
+    __table_args__ = (
+        db.Index('ix_productions_farmer_id_date', 'farmer_id', 'date'),
+        db.Index('ix_productions_employee_id_date', 'employee_id', 'date'),
+    )
+
+    # Relationship with the Employee model. Lists that show the
+    # employee's name eager-load it with joinedload; every record has
+    # one, so the join can be an inner join.
+    employee = relationship('Employee', back_populates='productions',
+                            innerjoin=True)
     farmer = relationship('Farmer', back_populates='production_records')
 
     def __init__(self, *args, **kwargs):
@@ -38,10 +48,12 @@ class ProductionRecord(BaseModel):
         """
         super().__init__(*args, **kwargs)
 
-    @property
+    @hybrid_property
     def amount_paid(self):
         """
-        Calculate amount paid based on weight and rate
+        Calculate amount paid based on weight and rate. On the class it
+        is the SQL expression weight * rate, so money totals can be
+        summed in the database, e.g. func.sum(ProductionRecord.amount_paid).
         """
         return self.weight * self.rate
 
@@ -0,0 +1,292 @@
+#!/usr/bin/python3
+"""
+Module for class ProductionDailyTotal
+"""
+
+from collections import defaultdict
+from datetime import date, datetime
+from sqlalchemy import bindparam, event, func, select, tuple_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from models.base_model import db
+from models.production import ProductionRecord
+
+
+class ProductionDailyTotal(db.Model):
+    """
+    Summed production per farmer, employee and day.
+
+    The table is kept in step with the productions table inside the
+    same transaction, so dashboards and reports can sum a handful of
+    daily rows instead of every weigh-in.
+    """
+    __tablename__ = 'production_daily_totals'
+
+    farmer_id = db.Column(
+        db.String(128),
+        db.ForeignKey('farmers.id'),
+        primary_key=True)
+    employee_id = db.Column(
+        db.String(128),
+        db.ForeignKey('employees.id'),
+        primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    total_weight = db.Column(db.Float, nullable=False, default=0)
+    total_amount = db.Column(db.Float, nullable=False, default=0)
+    record_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Dashboards and reports read a farmer's days across all employees
+    __table_args__ = (
+        db.Index('ix_production_daily_totals_farmer_id_date',
+                 'farmer_id', 'date'),
+    )
+
+    def __repr__(self):
+        """Return a string representation of the instance."""
+        return (
+            f"< ProductionDailyTotal(farmer_id={self.farmer_id}, "
+            f"employee_id={self.employee_id}, date={self.date}, "
+            f"total_weight={self.total_weight}, "
+            f"total_amount={self.total_amount}, "
+            f"record_count={self.record_count}) >")
+
+    @classmethod
+    def apply_deltas(cls, session, deltas):
+        """
+        Add weight, amount and count deltas to the daily totals.
+
+        Args:
+            session: The session whose transaction receives the writes.
+            deltas (dict): Maps (farmer_id, employee_id, date) to a
+                [weight, amount, count] list.
+        """
+        rows = [{
+            'farmer_id': farmer_id,
+            'employee_id': employee_id,
+            'date': day,
+            'total_weight': weight,
+            'total_amount': amount,
+            'record_count': count
+        } for (farmer_id, employee_id, day), (weight, amount, count)
+            in deltas.items() if count or weight or amount]
+        if not rows:
+            return
+
+        table = cls.__table__
+        dialect = session.get_bind().dialect.name
+        if dialect == 'sqlite':
+            statement = sqlite_insert(table)
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.farmer_id, table.c.employee_id,
+                                table.c.date],
+                set_={
+                    'total_weight': table.c.total_weight +
+                    statement.excluded.total_weight,
+                    'total_amount': table.c.total_amount +
+                    statement.excluded.total_amount,
+                    'record_count': table.c.record_count +
+                    statement.excluded.record_count,
+                })
+        elif dialect == 'mysql':
+            statement = mysql_insert(table)
+            statement = statement.on_duplicate_key_update(
+                total_weight=table.c.total_weight +
+                statement.inserted.total_weight,
+                total_amount=table.c.total_amount +
+                statement.inserted.total_amount,
+                record_count=table.c.record_count +
+                statement.inserted.record_count,
+            )
+        if dialect in ('sqlite', 'mysql'):
+            session.execute(statement, rows)
+        else:
+            # Portable, at one UPDATE per day
+            _update_then_insert(session, table, rows)
+
+        # Days whose last record was removed or moved away
+        emptied = [(row['farmer_id'], row['employee_id'], row['date'])
+                   for row in rows if row['record_count'] < 0]
+        if emptied:
+            session.execute(table.delete().where(
+                tuple_(table.c.farmer_id, table.c.employee_id,
+                       table.c.date).in_(emptied),
+                table.c.record_count <= 0))
+
+    @classmethod
+    def add_rows(cls, session, rows):
+        """
+        Fold freshly inserted production rows into the daily totals.
+
+        Use this after inserts that bypass the ORM unit of work, such
+        as executemany bulk inserts.
+
+        Args:
+            session: The session that inserted the rows.
+            rows (list): Dicts with farmer_id, employee_id, date,
+                weight and rate.
+        """
+        deltas = defaultdict(lambda: [0.0, 0.0, 0])
+        for row in rows:
+            _add_delta(deltas, (row['farmer_id'], row['employee_id'],
+                                row['date'], row['weight'], row['rate']), 1)
+        cls.apply_deltas(session, deltas)
+
+    @classmethod
+    def rebuild(cls, batch_size=100):
+        """
+        Recompute every daily total from the productions table.
+
+        Farmers are processed in batches, one transaction per batch, so
+        the rebuild never holds a long lock on the whole table.
+
+        Returns:
+            int: The number of farmers rebuilt.
+        """
+        table = cls.__table__
+        productions = ProductionRecord.__table__
+        rebuilt = 0
+        last_farmer_id = None
+        while True:
+            query = select(productions.c.farmer_id).distinct().order_by(
+                productions.c.farmer_id).limit(batch_size)
+            if last_farmer_id is not None:
+                query = query.where(productions.c.farmer_id > last_farmer_id)
+            farmer_ids = db.session.execute(query).scalars().all()
+            if not farmer_ids:
+                break
+
+            db.session.execute(table.delete().where(
+                table.c.farmer_id.in_(farmer_ids)))
+            db.session.execute(table.insert().from_select(
+                ['farmer_id', 'employee_id', 'date', 'total_weight',
+                 'total_amount', 'record_count'],
+                select(
+                    productions.c.farmer_id,
+                    productions.c.employee_id,
+                    productions.c.date,
+                    func.sum(productions.c.weight),
+                    func.sum(ProductionRecord.amount_paid),
+                    func.count()
+                ).where(
+                    productions.c.farmer_id.in_(farmer_ids)
+                ).group_by(
+                    productions.c.farmer_id,
+                    productions.c.employee_id,
+                    productions.c.date
+                )
+            ))
+            db.session.commit()
+
+            rebuilt += len(farmer_ids)
+            last_farmer_id = farmer_ids[-1]
+
+        # Drop totals of farmers that no longer have any production
+        db.session.execute(table.delete().where(
+            ~table.c.farmer_id.in_(select(productions.c.farmer_id))))
+        db.session.commit()
+        return rebuilt
+
+
+def _as_date(value):
+    """Normalise a date that may have been assigned as a string."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+def _update_then_insert(session, table, rows):
+    """
+    Add deltas to the daily totals without a dialect-specific upsert:
+    update each day's row, and insert the days that had none yet.
+    """
+    key = (table.c.farmer_id, table.c.employee_id, table.c.date)
+    update = table.update().where(
+        *(column == bindparam(f'key_{column.name}') for column in key)
+    ).values(
+        total_weight=table.c.total_weight + bindparam('delta_weight'),
+        total_amount=table.c.total_amount + bindparam('delta_amount'),
+        record_count=table.c.record_count + bindparam('delta_count'),
+    )
+    missing = []
+    for row in rows:
+        result = session.execute(update, {
+            'key_farmer_id': row['farmer_id'],
+            'key_employee_id': row['employee_id'],
+            'key_date': row['date'],
+            'delta_weight': row['total_weight'],
+            'delta_amount': row['total_amount'],
+            'delta_count': row['record_count'],
+        })
+        if result.rowcount == 0:
+            missing.append(row)
+    if missing:
+        session.execute(table.insert(), missing)
+
+
+def _add_delta(deltas, values, sign):
+    """Add (or subtract) one production's contribution to deltas."""
+    farmer_id, employee_id, day, weight, rate = values
+    weight = float(weight)
+    delta = deltas[(farmer_id, employee_id, _as_date(day))]
+    delta[0] += sign * weight
+    delta[1] += sign * weight * float(rate)
+    delta[2] += sign
+
+
+_TRACKED_ATTRIBUTES = ('farmer_id', 'employee_id', 'date', 'weight', 'rate')
+
+
+def _current_values(record):
+    """Values of a production as they will be written."""
+    return tuple(getattr(record, name) for name in _TRACKED_ATTRIBUTES)
+
+
+def _stored_values(session, records):
+    """
+    Values of productions as they are stored in the database, keyed by
+    id. Instances may have been expired by a commit, so their pending
+    changes carry no old values; read them back in a single query.
+    """
+    ids = [record.id for record in records]
+    if not ids:
+        return {}
+    columns = [getattr(ProductionRecord, name)
+               for name in _TRACKED_ATTRIBUTES]
+    rows = session.execute(
+        select(ProductionRecord.id, *columns).where(
+            ProductionRecord.id.in_(ids)))
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
+@event.listens_for(Session, 'before_flush')
+def _update_daily_totals(session, flush_context, instances):
+    """
+    Fold pending production inserts, updates and deletes into the
+    daily totals before they are flushed.
+    """
+    deltas = defaultdict(lambda: [0.0, 0.0, 0])
+    for record in session.new:
+        if isinstance(record, ProductionRecord):
+            _add_delta(deltas, _current_values(record), 1)
+
+    updated = [record for record in session.dirty
+               if isinstance(record, ProductionRecord) and
+               session.is_modified(record, include_collections=False)]
+    deleted = [record for record in session.deleted
+               if isinstance(record, ProductionRecord)]
+    stored = _stored_values(session, updated + deleted)
+    for record in updated:
+        old_values = stored.get(record.id)
+        new_values = _current_values(record)
+        if old_values is not None and old_values != new_values:
+            _add_delta(deltas, old_values, -1)
+            _add_delta(deltas, new_values, 1)
+    for record in deleted:
+        if record.id in stored:
+            _add_delta(deltas, stored[record.id], -1)
+
+    if deltas:
+        ProductionDailyTotal.apply_deltas(session, deltas)
@@ -0,0 +1,24 @@
+#!/usr/bin/python3
+"""
+Module for class RevokedToken
+"""
+
+from models.base_model import db
+
+
+class RevokedToken(db.Model):
+    """
+    A JWT revoked before it expired, keyed by its jti.
+
+    Rows are only needed until the token's own expiry: after that the
+    token is refused anyway, so expired rows can be deleted.
+    """
+    __tablename__ = 'revoked_tokens'
+
+    jti = db.Column(db.String(36), primary_key=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        """Return a string representation of the instance."""
+        return (f"< RevokedToken(jti={self.jti}, "
+                f"expires_at={self.expires_at}) >")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+import pytest
+from datetime import date
+from web_dynamic.app import create_app, db
+from flask_jwt_extended import create_access_token
+from models.production import ProductionRecord
+from models.employee import Employee
+from models.expense import Expense
+from models.farmer import Farmer
+from models.labour import Labour
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create and configure a new app instance for each test."""
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def test_client(test_app):
+    """Fixture to provide a test client for each test."""
+    return test_app.test_client()
+
+
+@pytest.fixture(scope='function')
+def setup_data():
+    """Fixture to set up a farmer with a plucker, productions and an expense."""
+    test_farmer = Farmer(
+        name="John Doe",
+        email="test@user.com",
+        phone_number="123456789",
+        password_hash="hashedpassword"
+    )
+    db.session.add(test_farmer)
+    db.session.commit()
+
+    labour_type = Labour(type="plucking", rate=10.0, farmer_id=test_farmer.id)
+    db.session.add(labour_type)
+    db.session.commit()
+
+    employee = Employee(
+        name="Jane Smith",
+        phone_number="0712345678",
+        password_hash="password",
+        labour_id=labour_type.id,
+        farmer_id=test_farmer.id
+    )
+    db.session.add(employee)
+    db.session.commit()
+
+    for day, weight in ((date(2024, 11, 30), 50.0), (date(2024, 12, 1), 100.0),
+                        (date(2024, 12, 2), 200.0)):
+        db.session.add(ProductionRecord(
+            employee_id=employee.id, weight=weight, rate=10.0, date=day,
+            farmer_id=test_farmer.id))
+    db.session.add(Expense(
+        category_id=labour_type.id, description="Fertilizer Purchase",
+        amount=500.0, date=date(2024, 12, 1), farmer_id=test_farmer.id))
+    db.session.commit()
+
+    return test_farmer, employee
+
+
+def auth_headers(farmer):
+    """Build the authorization header for a farmer."""
+    return {'Authorization': f'Bearer {create_access_token(identity=farmer.id)}'}
+
+
+def test_production_report_by_month(test_client, setup_data):
+    """Test a production report over a date range, bucketed by month."""
+    test_farmer, employee = setup_data
+    response = test_client.post('/api/reports', json={
+        "report_type": "production",
+        "start": "2024-11-01",
+        "end": "2024-12-31",
+        "granularity": "month"
+    }, headers=auth_headers(test_farmer))
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['granularity'] == 'month'
+    assert data['start'] == '2024-11-01'
+    assert data['end'] == '2024-12-31'
+    assert [row[0] for row in data['rows']] == ['2024-11-01', '2024-12-01']
+    assert data['rows'][1][data['columns'].index('weight')] == 300.0
+    assert data['totals'] == {
+        'weight': 350.0, 'amount_paid': 3500.0, 'records': 3}
+
+
+def test_expense_report_by_day(test_client, setup_data):
+    """Test an expense report bucketed by day."""
+    test_farmer, employee = setup_data
+    response = test_client.post('/api/reports', json={
+        "report_type": "expenses",
+        "start": "2024-12-01",
+        "end": "2024-12-02"
+    }, headers=auth_headers(test_farmer))
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['rows'] == [['2024-12-01', 'plucking', 500.0, 1, 500.0]]
+
+
+def test_report_rejects_invalid_arguments(test_client, setup_data):
+    """Test that bad granularities and ranges are rejected."""
+    test_farmer, employee = setup_data
+    for payload in (
+        {"report_type": "production", "start": "2024-12-01",
+         "end": "2024-12-31", "granularity": "fortnight"},
+        {"report_type": "production", "start": "2024-12-31",
+         "end": "2024-12-01"},
+        {"report_type": "production", "start": "2024-12-01"},
+        {"report_type": "production", "time_frame": "yearly"},
+    ):
+        response = test_client.post('/api/reports', json=payload,
+                                    headers=auth_headers(test_farmer))
+        assert response.status_code == 400, payload
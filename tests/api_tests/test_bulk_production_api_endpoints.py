@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+import pytest
+from web_dynamic.app import create_app, db
+from flask_jwt_extended import create_access_token
+from models.production import ProductionRecord
+from models.production_daily_total import ProductionDailyTotal
+from models.employee import Employee
+from models.farmer import Farmer
+from models.labour import Labour
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create and configure a new app instance for each test."""
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def test_client(test_app):
+    """Fixture to provide a test client for each test."""
+    return test_app.test_client()
+
+
+@pytest.fixture(scope='function')
+def setup_data():
+    """Fixture to set up a farmer with two pluckers."""
+    test_farmer = Farmer(
+        name="John Doe",
+        email="test@user.com",
+        phone_number="123456789",
+        password_hash="hashedpassword"
+    )
+    db.session.add(test_farmer)
+    db.session.commit()
+
+    labour_type = Labour(type="plucking", rate=12.0, farmer_id=test_farmer.id)
+    db.session.add(labour_type)
+    db.session.commit()
+
+    employees = [
+        Employee(
+            name=f"Plucker {number}",
+            phone_number=f"071234567{number}",
+            password_hash="password",
+            labour_id=labour_type.id,
+            farmer_id=test_farmer.id
+        )
+        for number in range(2)
+    ]
+    db.session.add_all(employees)
+    db.session.commit()
+
+    return test_farmer, employees
+
+
+def auth_headers(farmer):
+    """Build the authorization header for a farmer."""
+    return {'Authorization': f'Bearer {create_access_token(identity=farmer.id)}'}
+
+
+def test_bulk_create_productions(test_client, setup_data):
+    """Test recording a batch of productions in one request."""
+    test_farmer, employees = setup_data
+    payload = {"productions": [
+        {"employee_id": employees[0].id, "weight": 20.5,
+         "date": "2024-12-01"},
+        {"employee_id": employees[1].id, "weight": 15.0, "rate": 14.0,
+         "date": "2024-12-01"},
+        {"employee_id": employees[0].id, "weight": 18.0,
+         "date": "2024-12-02"},
+    ]}
+
+    response = test_client.post(
+        '/api/productions/bulk',
+        json=payload,
+        headers=auth_headers(test_farmer)
+    )
+
+    assert response.status_code == 201
+    assert response.get_json()['inserted'] == 3
+
+    records = ProductionRecord.query.filter_by(farmer_id=test_farmer.id).all()
+    assert len(records) == 3
+    # Missing rates fall back to the employee's labour rate
+    assert sorted(record.rate for record in records) == [12.0, 12.0, 14.0]
+
+    # The bulk insert is folded into the daily totals
+    totals = ProductionDailyTotal.query.filter_by(
+        farmer_id=test_farmer.id).all()
+    assert len(totals) == 3
+    assert sum(total.total_weight for total in totals) == 53.5
+    assert sum(total.total_amount for total in totals) == 672.0
+
+
+def test_bulk_create_reports_row_errors(test_client, setup_data):
+    """Test that invalid rows are reported and nothing is inserted."""
+    test_farmer, employees = setup_data
+    payload = {"productions": [
+        {"employee_id": employees[0].id, "weight": 20.5,
+         "date": "2024-12-01"},
+        {"employee_id": employees[0].id, "weight": -1,
+         "date": "2024-12-01"},
+        {"employee_id": "unknown", "weight": 10.0, "date": "2024-12-01"},
+        {"employee_id": employees[1].id, "weight": 10.0, "date": "01/12/2024"},
+    ]}
+
+    response = test_client.post(
+        '/api/productions/bulk',
+        json=payload,
+        headers=auth_headers(test_farmer)
+    )
+
+    assert response.status_code == 400
+    errors = response.get_json()['errors']
+    assert [error['index'] for error in errors] == [1, 2, 3]
+    assert ProductionRecord.query.count() == 0
+
+
+def test_bulk_create_rejects_non_finite_numbers(test_client, setup_data):
+    """Test that NaN and Infinity are row errors, not database errors."""
+    test_farmer, employees = setup_data
+    rows = ', '.join(
+        f'{{"employee_id": "{employees[0].id}", {field}, '
+        f'"date": "2024-12-01"}}'
+        for field in ('"weight": NaN', '"weight": Infinity',
+                      '"weight": 10.0, "rate": -Infinity',
+                      '"weight": 10.0, "rate": NaN'))
+
+    response = test_client.post(
+        '/api/productions/bulk',
+        data=f'{{"productions": [{rows}]}}',
+        content_type='application/json',
+        headers=auth_headers(test_farmer)
+    )
+
+    assert response.status_code == 400
+    errors = response.get_json()['errors']
+    assert [error['errors'] for error in errors] == [
+        ["weight must be a positive number"],
+        ["weight must be a positive number"],
+        ["rate must be a positive number"],
+        ["rate must be a positive number"],
+    ]
+    assert ProductionRecord.query.count() == 0
+
+
+def test_bulk_create_rejects_other_farmers_employees(test_client, setup_data):
+    """Test that employees of another farmer cannot be used."""
+    test_farmer, employees = setup_data
+    other_farmer = Farmer(
+        name="Jane Roe",
+        email="other@user.com",
+        phone_number="987654321",
+        password_hash="hashedpassword"
+    )
+    db.session.add(other_farmer)
+    db.session.commit()
+
+    response = test_client.post(
+        '/api/productions/bulk',
+        json={"productions": [{"employee_id": employees[0].id,
+                               "weight": 10.0, "date": "2024-12-01"}]},
+        headers=auth_headers(other_farmer)
+    )
+
+    assert response.status_code == 400
+    assert response.get_json()['errors'][0]['errors'] == ["Employee not found"]
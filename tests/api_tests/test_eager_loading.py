@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+import html
+import pytest
+import re
+from datetime import date
+from web_dynamic.app import create_app, db
+from flask_jwt_extended import create_access_token
+from models.employee import Employee
+from models.expense import Expense
+from models.farmer import Farmer
+from models.labour import Labour
+from models.production import ProductionRecord
+from web_dynamic.services.identity import identity_cache
+from web_dynamic.utils.query_stats import count_queries
+
+TODAY = date.today()
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create and configure a new app instance for each test."""
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    identity_cache.clear()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def farmer_id(test_app):
+    """Fixture to set up a farmer with one labour type."""
+    test_farmer = Farmer(
+        name="John Doe",
+        email="test@user.com",
+        phone_number="123456789",
+        password_hash="hashedpassword"
+    )
+    db.session.add(test_farmer)
+    db.session.commit()
+    db.session.add(Labour(type="plucking", rate=10.0,
+                          farmer_id=test_farmer.id))
+    db.session.commit()
+    return test_farmer.id
+
+
+@pytest.fixture(scope='function')
+def logged_in_client(test_app, farmer_id):
+    """Fixture to provide a client with the farmer signed in."""
+    client = test_app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = f"farmer:{farmer_id}"
+        session['_fresh'] = True
+    return client
+
+
+def add_rows(farmer_id, count):
+    """Give the farmer count more employees, each with a job type, a
+    production and an expense dated today."""
+    start = Employee.query.count()
+    for number in range(start, start + count):
+        # A job type each, so lazy loads could not come from the
+        # identity map
+        labour = Labour(type=f"job {number}", rate=10.0,
+                        farmer_id=farmer_id)
+        db.session.add(labour)
+        db.session.flush()
+        employee = Employee(
+            name=f"Plucker {number}",
+            phone_number=f"07{number:08d}",
+            password_hash="password",
+            labour_id=labour.id,
+            farmer_id=farmer_id
+        )
+        db.session.add(employee)
+        db.session.flush()
+        db.session.add(ProductionRecord(
+            employee_id=employee.id, weight=10.0, rate=10.0, date=TODAY,
+            farmer_id=farmer_id))
+        db.session.add(Expense(
+            category_id=labour.id, description="Fertilizer", amount=100.0,
+            date=TODAY, farmer_id=farmer_id))
+    db.session.commit()
+
+
+def queries_for(farmer_id, request):
+    """Return the statements a request runs with 1 and with 20 rows."""
+    counts = []
+    for count in (1, 19):
+        add_rows(farmer_id, count)
+        # The first request also loads the signed in user
+        request()
+        db.session.remove()
+        with count_queries() as stats:
+            response = request()
+        assert response.status_code == 200
+        counts.append(stats.count)
+    return counts
+
+
+def test_employee_list_query_count(logged_in_client, farmer_id):
+    """Test that job types are loaded with the employees, not per row."""
+    def request():
+        return logged_in_client.get('/farmer/employees/list')
+
+    counts = queries_for(farmer_id, request)
+    assert counts[0] == counts[1]
+    assert "Plucker 19" in request().get_data(as_text=True)
+
+
+def test_view_production_query_count(logged_in_client, farmer_id):
+    """Test that employee names are loaded with the records."""
+    page = logged_in_client.get('/farmer/view_production').get_data(
+        as_text=True)
+    week = html.unescape(re.search(
+        r'name="week"[^>]*>\s*<option[^>]*value="([^"]*)"', page).group(1))
+
+    def request():
+        return logged_in_client.post('/farmer/view_production', data={
+            'filter_by': 'day',
+            'date': TODAY.isoformat(),
+            'year': str(TODAY.year),
+            'month': str(TODAY.month),
+            'week': week,
+        })
+
+    counts = queries_for(farmer_id, request)
+    assert counts[0] == counts[1]
+    assert "Plucker 19" in request().get_data(as_text=True)
+
+
+def test_expense_list_query_count(test_app, farmer_id):
+    """Test that listing expenses runs the same queries for any page
+    size."""
+    client = test_app.test_client()
+    headers = {'Authorization':
+               f'Bearer {create_access_token(identity=farmer_id)}'}
+
+    def request():
+        return client.get('/api/expenses', headers=headers)
+
+    counts = queries_for(farmer_id, request)
+    assert counts[0] == counts[1]
+    assert len(request().get_json()['expenses']) == 20
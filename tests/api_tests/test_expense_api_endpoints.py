@@ -26,6 +26,7 @@ def setup_database(app):
 
     labour_type = Labour(
         type="plucking",
+        rate=10.0,
         farmer_id=test_farmer.id
     )
     db.session.add(labour_type)
@@ -36,13 +37,13 @@ def setup_database(app):
         category_id=labour_type.id,
         description="Test expense 1",
         amount=100.0,
-        date=date.today().strftime('%Y-%m-%d'),
+        date=date.today(),
         farmer_id=test_farmer.id  # Link expense to the test farmer
     )
     expense2 = Expense(
         description="Plucking expense",
         amount=150.0,
-        date=date.today().strftime('%Y-%m-%d'),
+        date=date.today(),
         category_id=labour_type.id,
         farmer_id=test_farmer.id  # Link expense to the test farmer
     )
@@ -72,7 +73,7 @@ def test_get_expenses():
             )
 
             assert response.status_code == 200
-            data = response.get_json()
+            data = response.get_json()['expenses']
             assert isinstance(data, list)
             assert len(data) == 2
 
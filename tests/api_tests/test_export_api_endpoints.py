@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+import csv
+import io
+import json
+import pytest
+from datetime import date
+from web_dynamic.app import create_app, db
+from flask_jwt_extended import create_access_token
+from models.production import ProductionRecord
+from models.expense import Expense
+from models.employee import Employee
+from models.farmer import Farmer
+from models.labour import Labour
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create and configure a new app instance for each test."""
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def test_client(test_app):
+    """Fixture to provide a test client for each test."""
+    return test_app.test_client()
+
+
+@pytest.fixture(scope='function')
+def setup_data():
+    """Fixture to set up two farmers with production and expense history."""
+    farmers = []
+    for number in range(2):
+        farmer = Farmer(
+            name=f"Farmer {number}",
+            email=f"farmer{number}@test.com",
+            phone_number=f"070000000{number}",
+            password_hash="hashedpassword"
+        )
+        db.session.add(farmer)
+        db.session.commit()
+
+        labour = Labour(type="plucking", rate=10.0, farmer_id=farmer.id)
+        db.session.add(labour)
+        db.session.commit()
+
+        employee = Employee(
+            name="Plucker",
+            phone_number="0712345678",
+            password_hash="password",
+            labour_id=labour.id,
+            farmer_id=farmer.id
+        )
+        db.session.add(employee)
+        db.session.commit()
+
+        for day in range(1, 4):
+            db.session.add(ProductionRecord(
+                employee_id=employee.id,
+                weight=10.0 * day,
+                rate=10.0,
+                date=date(2024, 12, day),
+                farmer_id=farmer.id
+            ))
+            db.session.add(Expense(
+                category_id=labour.id,
+                description=f"Expense {day}",
+                amount=100.0 * day,
+                date=date(2024, 12, day),
+                farmer_id=farmer.id
+            ))
+        db.session.commit()
+        farmers.append(farmer)
+
+    return farmers
+
+
+def auth_headers(farmer):
+    """Build the authorization header for a farmer."""
+    return {'Authorization': f'Bearer {create_access_token(identity=farmer.id)}'}
+
+
+def test_export_productions_csv(test_client, setup_data):
+    """Test streaming the farmer's productions as CSV."""
+    farmer = setup_data[0]
+
+    response = test_client.get(
+        '/api/productions/export',
+        headers=auth_headers(farmer)
+    )
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 3
+    assert [row['date'] for row in rows] == \
+        ['2024-12-01', '2024-12-02', '2024-12-03']
+    assert float(rows[2]['amount_paid']) == 300.0
+
+
+def test_export_productions_ndjson_date_range(test_client, setup_data):
+    """Test streaming productions as NDJSON within a date range."""
+    farmer = setup_data[0]
+
+    response = test_client.get(
+        '/api/productions/export?format=ndjson'
+        '&start_date=2024-12-02&end_date=2024-12-03',
+        headers=auth_headers(farmer)
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line)
+             for line in response.get_data(as_text=True).splitlines()]
+    assert [line['weight'] for line in lines] == [20.0, 30.0]
+
+
+def test_export_expenses_is_scoped_to_farmer(test_client, setup_data):
+    """Test that a farmer only exports their own expenses."""
+    farmer = setup_data[1]
+
+    response = test_client.get(
+        '/api/expenses/export?format=ndjson',
+        headers=auth_headers(farmer)
+    )
+
+    assert response.status_code == 200
+    lines = [json.loads(line)
+             for line in response.get_data(as_text=True).splitlines()]
+    assert len(lines) == 3
+    expense_ids = {expense.id for expense in
+                   Expense.query.filter_by(farmer_id=farmer.id)}
+    assert {line['id'] for line in lines} == expense_ids
+
+
+def test_export_rejects_unknown_format(test_client, setup_data):
+    """Test that unsupported formats and bad dates are rejected."""
+    farmer = setup_data[0]
+
+    response = test_client.get(
+        '/api/expenses/export?format=xml',
+        headers=auth_headers(farmer)
+    )
+    assert response.status_code == 400
+
+    response = test_client.get(
+        '/api/productions/export?start_date=12/01/2024',
+        headers=auth_headers(farmer)
+    )
+    assert response.status_code == 400
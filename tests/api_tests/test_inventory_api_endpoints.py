@@ -36,11 +36,13 @@ def setup_data():
 
     inventory1 = Inventory(
         item_name="Fertilizer",
-        quantity=100
+        quantity=100,
+        farmer_id=test_farmer.id
     )
     inventory2 = Inventory(
         item_name="Tea Seeds",
-        quantity=200
+        quantity=200,
+        farmer_id=test_farmer.id
     )
     db.session.add_all([inventory1, inventory2])
     db.session.commit()
@@ -58,7 +60,7 @@ def test_get_inventory(test_client, setup_data):
     )
 
     assert response.status_code == 200
-    data = response.get_json()
+    data = response.get_json()['inventories']
     assert isinstance(data, list)
     assert len(data) == 2
 
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+import pytest
+from web_dynamic.app import create_app, db
+from flask_jwt_extended import create_access_token
+from models.farmer import Farmer
+from models.revoked_token import RevokedToken
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create and configure a new app instance for each test."""
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def test_client(test_app):
+    """Fixture to provide a test client for each test."""
+    return test_app.test_client()
+
+
+@pytest.fixture(scope='function')
+def auth_headers():
+    """Fixture to provide an access token of a new farmer."""
+    test_farmer = Farmer(
+        name="John Doe",
+        email="test@user.com",
+        phone_number="123456789",
+        password_hash="hashedpassword"
+    )
+    db.session.add(test_farmer)
+    db.session.commit()
+    token = create_access_token(identity=test_farmer.id)
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_logout_revokes_token(test_client, auth_headers):
+    """Test that a token is refused after logging out with it."""
+    response = test_client.get('/api/employees', headers=auth_headers)
+    assert response.status_code == 200
+
+    response = test_client.post('/api/logout', headers=auth_headers)
+    assert response.status_code == 200
+    revoked = db.session.execute(db.select(RevokedToken)).scalar_one()
+    assert revoked.expires_at is not None
+
+    response = test_client.get('/api/employees', headers=auth_headers)
+    assert response.status_code == 401
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+import pytest
+from prometheus_client import REGISTRY
+from web_dynamic.app import create_app, db
+from web_dynamic.services import pdf_jobs
+from web_dynamic.services.dashboard import dashboard_cache
+from flask_jwt_extended import create_access_token
+from datetime import date
+from models.expense import Expense
+from models.farmer import Farmer
+from models.labour import Labour
+
+PAYLOAD = {
+    "report_type": "expenses",
+    "start": "2024-12-01",
+    "end": "2024-12-31",
+    "granularity": "month"
+}
+
+
+@pytest.fixture(scope='function')
+def test_app(tmp_path):
+    """Fixture to create an app that renders PDFs inline into tmp_path."""
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['PDF_CACHE_DIR'] = str(tmp_path)
+    app.config['PDF_RENDER_WORKERS'] = 0
+    # Answer /boom with a 500 instead of raising in the test
+    app.config['PROPAGATE_EXCEPTIONS'] = False
+
+    @app.route('/boom')
+    def boom():
+        raise RuntimeError("boom")
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def test_client(test_app):
+    """Fixture to provide a test client for each test."""
+    return test_app.test_client()
+
+
+@pytest.fixture(scope='function')
+def farmer_id():
+    """Fixture to set up a farmer with one expense."""
+    test_farmer = Farmer(
+        name="John Doe",
+        email="test@user.com",
+        phone_number="123456789",
+        password_hash="hashedpassword"
+    )
+    db.session.add(test_farmer)
+    db.session.commit()
+    labour_type = Labour(type="plucking", rate=10.0, farmer_id=test_farmer.id)
+    db.session.add(labour_type)
+    db.session.commit()
+    db.session.add(Expense(
+        category_id=labour_type.id, description="Fertilizer Purchase",
+        amount=500.0, date=date(2024, 12, 1), farmer_id=test_farmer.id))
+    db.session.commit()
+    return test_farmer.id
+
+
+def sample(name, **labels):
+    """Return the current value of a metric, or 0 if it has none yet."""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_request_metrics(test_client):
+    """Test that requests are counted and timed per route."""
+    labels = dict(blueprint='public_bp', route='/', method='GET')
+    requests = sample('teafarm_requests_total', status='200', **labels)
+    timed = sample('teafarm_request_duration_seconds_count', **labels)
+
+    test_client.get('/')
+    test_client.get('/')
+    assert sample('teafarm_requests_total', status='200', **labels) == \
+        requests + 2
+    assert sample('teafarm_request_duration_seconds_count', **labels) == \
+        timed + 2
+
+    errors = sample('teafarm_request_errors_total', blueprint='',
+                    route='/boom', method='GET')
+    test_client.get('/boom')
+    assert sample('teafarm_request_errors_total', blueprint='',
+                  route='/boom', method='GET') == errors + 1
+
+    response = test_client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    assert 'teafarm_request_duration_seconds_bucket{blueprint="public_bp",' \
+        in text
+    assert 'teafarm_db_pool_checked_out' in text
+
+
+def test_cache_and_pdf_metrics(test_client, farmer_id, monkeypatch):
+    """Test that cache lookups and PDF renders are exported."""
+    dashboard_cache.clear()
+    misses = sample('teafarm_cache_misses_total', cache='dashboard')
+    hits = sample('teafarm_cache_hits_total', cache='dashboard')
+    with test_client.session_transaction() as session:
+        session['_user_id'] = f"farmer:{farmer_id}"
+        session['_fresh'] = True
+    test_client.get('/farmer/dashboard')
+    test_client.get('/farmer/dashboard')
+    assert sample('teafarm_cache_misses_total', cache='dashboard') == \
+        misses + 1
+    assert sample('teafarm_cache_hits_total', cache='dashboard') == hits + 1
+
+    monkeypatch.setattr(pdf_jobs, 'render_pdf',
+                        lambda html, path: open(path, 'wb').close())
+    renders = sample('teafarm_pdf_render_seconds_count')
+    headers = {'Authorization':
+               f'Bearer {create_access_token(identity=farmer_id)}'}
+    test_client.post('/api/reports/pdf_jobs', json=PAYLOAD, headers=headers)
+    assert sample('teafarm_pdf_render_seconds_count') == renders + 1
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+import base64
+import json
+import pytest
+from datetime import date, timedelta
+from web_dynamic.app import create_app, db
+from flask_jwt_extended import create_access_token
+from models.production import ProductionRecord
+from models.employee import Employee
+from models.farmer import Farmer
+from models.labour import Labour
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create and configure a new app instance for each test."""
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def test_client(test_app):
+    """Fixture to provide a test client for each test."""
+    return test_app.test_client()
+
+
+@pytest.fixture(scope='function')
+def setup_data():
+    """Fixture to set up a farmer with 25 production records."""
+    test_farmer = Farmer(
+        name="John Doe",
+        email="test@user.com",
+        phone_number="123456789",
+        password_hash="hashedpassword"
+    )
+    db.session.add(test_farmer)
+    db.session.commit()
+
+    labour_type = Labour(type="plucking", rate=10.0, farmer_id=test_farmer.id)
+    db.session.add(labour_type)
+    db.session.commit()
+
+    employee = Employee(
+        name="Plucker",
+        phone_number="0712345678",
+        password_hash="password",
+        labour_id=labour_type.id,
+        farmer_id=test_farmer.id
+    )
+    db.session.add(employee)
+    db.session.commit()
+
+    # Several records share a date so that ties are broken by id
+    for number in range(25):
+        db.session.add(ProductionRecord(
+            employee_id=employee.id,
+            weight=float(number + 1),
+            rate=10.0,
+            date=date(2024, 12, 1) + timedelta(days=number // 3),
+            farmer_id=test_farmer.id
+        ))
+    db.session.commit()
+
+    return test_farmer
+
+
+def auth_headers(farmer):
+    """Build the authorization header for a farmer."""
+    return {'Authorization': f'Bearer {create_access_token(identity=farmer.id)}'}
+
+
+@pytest.mark.parametrize('url', ['/api/productions', '/api/fetch_production_data'])
+def test_pages_cover_all_rows_once(test_client, setup_data, url):
+    """Test walking every page returns each record exactly once, newest first."""
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        query = f'?limit=10&cursor={cursor}' if cursor else '?limit=10'
+        response = test_client.get(url + query, headers=auth_headers(setup_data))
+        assert response.status_code == 200
+        data = response.get_json()
+        seen.extend(data['productions'])
+        pages += 1
+        cursor = data['next_cursor']
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len(seen) == 25
+    assert len({production['id'] for production in seen}) == 25
+    keys = [(production['date'], production['id']) for production in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_invalid_page_arguments(test_client, setup_data):
+    """Test that bad limits and cursors are rejected."""
+    for query in ('?limit=0', '?limit=5000', '?limit=ten', '?cursor=not-a-cursor'):
+        response = test_client.get(
+            '/api/productions' + query,
+            headers=auth_headers(setup_data)
+        )
+        assert response.status_code == 400
+
+
+@pytest.mark.parametrize('url', ['/api/productions', '/api/employees'])
+@pytest.mark.parametrize('payload', [
+    ["2024-01-01", {"a": 1}],
+    ["2024-01-01", ["x"]],
+    [{"a": 1}, "id"],
+    [20240101, "id"],
+    ["yesterday", "id"],
+    ["2024-01-01"],
+    ["2024-01-01", "id", "extra"],
+    {"2024-01-01": 1, "id": 2},
+    "ab",
+])
+def test_tampered_cursors_are_rejected(test_client, setup_data, url, payload):
+    """Test that a cursor not made by the server is a 400, not a query."""
+    cursor = base64.urlsafe_b64encode(
+        json.dumps(payload).encode()).decode().rstrip('=')
+    response = test_client.get(
+        f'{url}?cursor={cursor}',
+        headers=auth_headers(setup_data)
+    )
+    assert response.status_code == 400
+    assert response.get_json()['error'] == "Invalid cursor"
+
+
+def test_employee_list_is_paged(test_client, setup_data):
+    """Test that following next_cursor walks every employee once."""
+    labour_id = Labour.query.filter_by(farmer_id=setup_data.id).one().id
+    for number in range(4):
+        db.session.add(Employee(
+            name=f"Plucker {number}",
+            phone_number=f"071234560{number}",
+            password_hash="password",
+            labour_id=labour_id,
+            farmer_id=setup_data.id
+        ))
+    db.session.commit()
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        query = f'?limit=2&cursor={cursor}' if cursor else '?limit=2'
+        response = test_client.get('/api/employees' + query,
+                                   headers=auth_headers(setup_data))
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data['employees']) <= 2
+        seen.extend(employee['id'] for employee in data['employees'])
+        pages += 1
+        cursor = data['next_cursor']
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len(seen) == 5
+    assert set(seen) == {employee.id for employee in Employee.query.all()}
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+import pytest
+from datetime import date
+from web_dynamic.app import create_app, db
+from flask_jwt_extended import create_access_token
+from models.employee import Employee
+from models.farmer import Farmer
+from models.labour import Labour
+from models.production import ProductionRecord
+from web_dynamic.services.payroll_config import parse_deductions
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create and configure a new app instance for each test."""
+    app = create_app({
+        'PAYROLL_DEDUCTIONS': 'housing_levy=0.015,welfare=0.01'})
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def test_client(test_app):
+    """Fixture to provide a test client for each test."""
+    return test_app.test_client()
+
+
+def make_farmer(number, weigh_ins):
+    """Create a farmer whose pluckers weighed in as given: a list of
+    (plucker name, day, weight, rate)."""
+    farmer = Farmer(name=f"Farmer {number}", email=f"farmer{number}@user.com",
+                    phone_number=f"07000000{number:02d}",
+                    password_hash="hashedpassword")
+    db.session.add(farmer)
+    db.session.flush()
+    labour = Labour(type="plucking", rate=10.0, farmer_id=farmer.id)
+    db.session.add(labour)
+    db.session.flush()
+    employees = {}
+    for name, day, weight, rate in weigh_ins:
+        if name not in employees:
+            employee = Employee(name=name,
+                                phone_number=f"08{number:02d}{len(employees):06d}",
+                                password_hash="password", labour_id=labour.id,
+                                farmer_id=farmer.id)
+            db.session.add(employee)
+            db.session.flush()
+            employees[name] = employee
+        db.session.add(ProductionRecord(
+            employee_id=employees[name].id, weight=weight, rate=rate,
+            date=day, farmer_id=farmer.id))
+    db.session.commit()
+    return farmer, employees
+
+
+@pytest.fixture(scope='function')
+def setup_data(test_app):
+    """Fixture to set up two pluckers and another farmer."""
+    farmer, employees = make_farmer(1, [
+        ("Wanjiku", date(2024, 12, 1), 20.0, 10.0),
+        ("Wanjiku", date(2024, 12, 2), 30.0, 10.0),
+        ("Wanjiku", date(2024, 12, 2), 10.0, 12.0),
+        ("Akinyi", date(2024, 12, 3), 40.0, 10.0),
+        ("Akinyi", date(2024, 12, 9), 99.0, 10.0),
+    ])
+    make_farmer(2, [("Otieno", date(2024, 12, 2), 500.0, 10.0)])
+    return farmer, employees
+
+
+def auth_headers(farmer):
+    """Build the authorization header for a farmer."""
+    return {'Authorization': f'Bearer {create_access_token(identity=farmer.id)}'}
+
+
+def test_payroll_register(test_client, setup_data):
+    """Test gross pay, kgs, days and deductions per plucker."""
+    farmer, employees = setup_data
+    response = test_client.get(
+        '/api/payroll', query_string={'start': '2024-12-01',
+                                      'end': '2024-12-07'},
+        headers=auth_headers(farmer))
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['columns'] == [
+        'employee_id', 'employee', 'phone_number', 'days', 'weigh_ins',
+        'weight', 'gross_pay', 'housing_levy', 'welfare', 'deductions',
+        'net_pay']
+    assert data['deductions'] == {'housing_levy': 0.015, 'welfare': 0.01}
+    assert (data['start'], data['end']) == ('2024-12-01', '2024-12-07')
+
+    rows = [dict(zip(data['columns'], row)) for row in data['rows']]
+    assert [row['employee'] for row in rows] == ["Akinyi", "Wanjiku"]
+    akinyi, wanjiku = rows
+    assert akinyi['employee_id'] == employees["Akinyi"].id
+    assert (wanjiku['days'], wanjiku['weigh_ins'], wanjiku['weight']) == \
+        (2, 3, 60.0)
+    assert wanjiku['gross_pay'] == 620.0
+    assert wanjiku['housing_levy'] == 9.3
+    assert wanjiku['welfare'] == 6.2
+    assert wanjiku['deductions'] == 15.5
+    assert wanjiku['net_pay'] == 604.5
+    assert (akinyi['days'], akinyi['gross_pay'], akinyi['net_pay']) == \
+        (1, 400.0, 390.0)
+
+    assert data['totals']['gross_pay'] == 1020.0
+    assert data['totals']['weigh_ins'] == 4
+    assert data['totals']['net_pay'] == pytest.approx(994.5)
+
+
+def test_payroll_for_an_empty_period(test_client, setup_data):
+    """Test that a period without weigh-ins has an empty register."""
+    farmer, _ = setup_data
+    response = test_client.get(
+        '/api/payroll', query_string={'start': '2025-01-01',
+                                      'end': '2025-01-31'},
+        headers=auth_headers(farmer))
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['rows'] == []
+    assert data['totals']['gross_pay'] == 0
+
+
+def test_payroll_rejects_a_bad_period(test_client, setup_data):
+    """Test that a missing or inverted period is a 400."""
+    farmer, _ = setup_data
+    for query in ({'start': '2024-12-01'},
+                  {'start': '2024-12-07', 'end': '2024-12-01'}):
+        response = test_client.get('/api/payroll', query_string=query,
+                                   headers=auth_headers(farmer))
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+
+
+def test_parse_deductions():
+    """Test the name=fraction deduction settings."""
+    assert parse_deductions('') == {}
+    assert parse_deductions(None) == {}
+    assert parse_deductions('shif=0.0275, nssf = 0.06') == \
+        {'shif': 0.0275, 'nssf': 0.06}
+    assert parse_deductions({'shif': 0.0275}) == {'shif': 0.0275}
+    for value in ('shif', 'shif=lots', '=0.1', 'shif=1.5', 'weight=0.1',
+                  'gross_pay=0.1', 'deductions=0.1', 'net_pay=0.1',
+                  {'shif': 2}):
+        with pytest.raises(ValueError):
+            parse_deductions(value)
+
+
+def test_bad_deductions_fail_at_startup():
+    """Test that a malformed setting stops the app from starting."""
+    with pytest.raises(ValueError):
+        create_app({'PAYROLL_DEDUCTIONS': 'housing_levy=1.5%'})
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+import pytest
+from concurrent.futures import Future
+from datetime import date
+from web_dynamic.app import create_app, db
+from web_dynamic.routes.api import report_api_routes
+from web_dynamic.services import pdf_jobs
+from flask_jwt_extended import create_access_token
+from models.production import ProductionRecord
+from models.employee import Employee
+from models.farmer import Farmer
+from models.labour import Labour
+
+PAYLOAD = {
+    "report_type": "production",
+    "start": "2024-12-01",
+    "end": "2024-12-31",
+    "granularity": "week"
+}
+
+
+@pytest.fixture(scope='function')
+def test_app(tmp_path):
+    """Fixture to create an app that renders PDFs inline into tmp_path."""
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['PDF_CACHE_DIR'] = str(tmp_path)
+    app.config['PDF_RENDER_WORKERS'] = 0
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def test_client(test_app):
+    """Fixture to provide a test client for each test."""
+    return test_app.test_client()
+
+
+@pytest.fixture(scope='function')
+def renders(monkeypatch):
+    """Fixture replacing WeasyPrint with a renderer that counts calls."""
+    calls = []
+
+    def render_pdf(html, path):
+        calls.append(html)
+        with open(path, 'wb') as pdf_file:
+            pdf_file.write(b'%PDF-1.7 test')
+        return path
+
+    monkeypatch.setattr(pdf_jobs, 'render_pdf', render_pdf)
+    return calls
+
+
+@pytest.fixture(scope='function')
+def setup_data():
+    """Fixture to set up a farmer with one production."""
+    test_farmer = Farmer(
+        name="John Doe",
+        email="test@user.com",
+        phone_number="123456789",
+        password_hash="hashedpassword"
+    )
+    db.session.add(test_farmer)
+    db.session.commit()
+
+    labour_type = Labour(type="plucking", rate=10.0, farmer_id=test_farmer.id)
+    db.session.add(labour_type)
+    db.session.commit()
+
+    employee = Employee(
+        name="Jane Smith",
+        phone_number="0712345678",
+        password_hash="password",
+        labour_id=labour_type.id,
+        farmer_id=test_farmer.id
+    )
+    db.session.add(employee)
+    db.session.commit()
+
+    db.session.add(ProductionRecord(
+        employee_id=employee.id, weight=100.0, rate=10.0,
+        date=date(2024, 12, 2), farmer_id=test_farmer.id))
+    db.session.commit()
+    return test_farmer
+
+
+def auth_headers(farmer_id):
+    """Build the authorization header for a farmer."""
+    return {'Authorization': f'Bearer {create_access_token(identity=farmer_id)}'}
+
+
+def test_pdf_job_is_rendered_once(test_client, setup_data, renders):
+    """Test that a repeated report is served from the PDF cache."""
+    headers = auth_headers(setup_data.id)
+
+    response = test_client.post('/api/reports/pdf_jobs', json=PAYLOAD,
+                                headers=headers)
+    assert response.status_code == 200
+    job = response.get_json()
+    assert job['status'] == 'done'
+    assert len(job['job_id']) == 64
+
+    response = test_client.post('/api/reports/pdf_jobs', json=PAYLOAD,
+                                headers=headers)
+    assert response.get_json()['job_id'] == job['job_id']
+    assert len(renders) == 1
+
+    response = test_client.get(job['download_url'], headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    assert response.data == b'%PDF-1.7 test'
+
+    # The legacy ?pdf flag serves the cached file directly
+    response = test_client.post('/api/reports?pdf', json=PAYLOAD,
+                                headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    assert len(renders) == 1
+
+
+def test_pending_pdf_job(test_client, setup_data, renders, monkeypatch):
+    """Test polling a job that is still rendering."""
+    future = Future()
+    monkeypatch.setattr(pdf_jobs, '_submit', lambda html, path: future)
+    headers = auth_headers(setup_data.id)
+
+    response = test_client.post('/api/reports/pdf_jobs', json=PAYLOAD,
+                                headers=headers)
+    assert response.status_code == 202
+    job = response.get_json()
+
+    response = test_client.get(job['status_url'], headers=headers)
+    assert response.status_code == 202
+    assert response.get_json()['status'] == 'pending'
+    assert test_client.get(job['download_url'],
+                           headers=headers).status_code == 409
+
+    # Other farmers cannot see the job
+    assert test_client.get(job['status_url'], headers=auth_headers(
+        'someone-else')).status_code == 404
+
+    future.set_exception(RuntimeError("Pango is missing"))
+    response = test_client.get(job['status_url'], headers=headers)
+    assert response.status_code == 200
+    assert response.get_json() == dict(
+        job, status='failed', error='RuntimeError: Pango is missing')
+
+
+def test_failed_pdf_job_is_retried(test_client, setup_data, renders,
+                                   monkeypatch):
+    """Test that submitting a failed report again re-renders it."""
+    headers = auth_headers(setup_data.id)
+    render_pdf = pdf_jobs.render_pdf
+
+    def broken_render(html, path):
+        raise OSError("cannot load library")
+
+    monkeypatch.setattr(pdf_jobs, 'render_pdf', broken_render)
+    job = test_client.post('/api/reports/pdf_jobs', json=PAYLOAD,
+                           headers=headers).get_json()
+    assert job['status'] == 'failed'
+
+    monkeypatch.setattr(pdf_jobs, 'render_pdf', render_pdf)
+    job = test_client.post('/api/reports/pdf_jobs', json=PAYLOAD,
+                           headers=headers).get_json()
+    assert job['status'] == 'done'
+    assert len(renders) == 1
+
+
+def test_unknown_pdf_jobs(test_client, setup_data, tmp_path):
+    """Test that unknown and malformed job ids are not found, and that
+    polling does not create the farmer's cache directory."""
+    headers = auth_headers(setup_data.id)
+    for job_id in ('0' * 64, '..%2F..%2Fetc'):
+        for url in (f'/api/reports/pdf_jobs/{job_id}',
+                    f'/api/reports/pdf_jobs/{job_id}/pdf'):
+            response = test_client.get(url, headers=headers)
+            assert response.status_code == 404
+    assert not (tmp_path / setup_data.id).exists()
+
+
+def test_pdf_pruned_before_download(test_client, setup_data, renders,
+                                   monkeypatch):
+    """Test that a PDF pruned after its job was checked is not found."""
+    headers = auth_headers(setup_data.id)
+    job = test_client.post('/api/reports/pdf_jobs', json=PAYLOAD,
+                           headers=headers).get_json()
+    assert job['status'] == 'done'
+
+    def status_then_prune(farmer_id, job_id):
+        status = pdf_jobs.job_status(farmer_id, job_id)
+        pdf_jobs.prune_cache(max_age=-1)
+        return status
+
+    monkeypatch.setattr(report_api_routes, 'job_status', status_then_prune)
+    response = test_client.get(job['download_url'], headers=headers)
+    assert response.status_code == 404
+    assert response.get_json() == {"error": "Job not found"}
+
+
+@pytest.mark.parametrize('report_type', ['production', 'expenses'])
+def test_report_totals_span_the_table(test_app, report_type):
+    """Test that the totals row spans exactly the columns shown."""
+    from flask import render_template
+    from web_dynamic.services.reporting import REPORT_QUERIES, TOTAL_COLUMNS
+
+    columns = [column.name for column in REPORT_QUERIES[report_type](
+        'farmer', date(2024, 12, 1), date(2025, 1, 1), 'week',
+        'sqlite').selected_columns]
+    report = {
+        'report_type': report_type, 'granularity': 'week',
+        'start': '2024-12-01', 'end': '2024-12-31', 'columns': columns,
+        'rows': [], 'buckets': {},
+        'totals': dict.fromkeys(TOTAL_COLUMNS[report_type], 0),
+    }
+    with test_app.test_request_context():
+        page = render_template('report_template.html', report=report)
+
+    shown = len([column for column in columns if column != 'employee_id'])
+    assert page.count('<th>') == shown
+    assert f'colspan="{shown}"' in page
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import pytest
 import uuid
+from datetime import date
 from web_dynamic.app import create_app, db
 from models.production import ProductionRecord
 from flask_jwt_extended import create_access_token
@@ -25,6 +26,7 @@ def setup_database(app):
 
     labour_type = Labour(
         type="plucking",
+        rate=10.0,
         farmer_id=test_farmer.id)
     db.session.add(labour_type)
     db.session.commit()
@@ -34,7 +36,7 @@ def setup_database(app):
         name="Test Employee",
         email="test@employee.com",
         phone_number="1234567890",
-        job_type_id=labour_type.id,
+        labour_id=labour_type.id,
         password_hash="password",
         farmer_id=test_farmer.id
     )
@@ -42,11 +44,11 @@ def setup_database(app):
     db.session.commit()
 
     production = ProductionRecord(
-        id=uuid.uuid4(),  # Generate UUID for id
+        id=str(uuid.uuid4()),  # Generate UUID for id
         employee_id=test_user.id,
         weight=100.0,
         rate=10.0,
-        date="2024-12-01",
+        date=date(2024, 12, 1),
         farmer_id=test_farmer.id
     )
     db.session.add(production)
@@ -68,7 +70,7 @@ def test_get_productions():
     with app.app_context():
         test_user, test_farmer, production = setup_database(app)
 
-        access_token = create_access_token(identity=test_user.id)
+        access_token = create_access_token(identity=test_farmer.id)
 
         with app.test_client() as client:
             response = client.get(
@@ -77,7 +79,7 @@ def test_get_productions():
             )
 
             assert response.status_code == 200
-            data = response.get_json()
+            data = response.get_json()['productions']
             assert isinstance(data, list)
             assert len(data) == 1
             assert data[0]['date'] == "2024-12-01"
@@ -192,13 +194,31 @@ def test_delete_production():
 
 
 def test_total_production():
-    """Test calculating total production within a date range."""
+    """Test calculating the farmer's total production within a date
+    range, leaving out other farmers' records."""
     app = create_app()
     app.config['TESTING'] = True
 
     with app.app_context():
         test_user, test_farmer, production = setup_database(app)
-        access_token = create_access_token(identity=test_user.id)
+        access_token = create_access_token(identity=test_farmer.id)
+
+        other_farmer = Farmer(
+            name="Jane Roe",
+            email="other@user.com",
+            phone_number="987654321",
+            password_hash="hashedpassword"
+        )
+        db.session.add(other_farmer)
+        db.session.commit()
+        db.session.add(ProductionRecord(
+            employee_id=test_user.id,
+            weight=500.0,
+            rate=10.0,
+            date=date(2024, 12, 2),
+            farmer_id=other_farmer.id
+        ))
+        db.session.commit()
 
         payload = {
             "start_date": "2024-12-01",
@@ -215,3 +235,4 @@ def test_total_production():
             assert response.status_code == 200
             data = response.get_json()
             assert data['total_production'] == 100.0
+            assert data['total_amount_paid'] == 1000.0
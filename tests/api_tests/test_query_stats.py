@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+import logging
+import pytest
+from flask import Flask, jsonify
+from models import db, init_app
+from models.farmer import Farmer
+from web_dynamic.utils import query_stats
+from web_dynamic.utils.query_stats import assert_max_queries,\
+    current_query_stats, statement_shape
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create an app with a route that loads farmers one by
+    one."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    app.config['N_PLUS_ONE_THRESHOLD'] = 3
+    app.config['QUERY_COUNT_THRESHOLD'] = 10
+    init_app(app)
+    query_stats.init_app(app)
+
+    @app.route('/farmers/<int:count>')
+    def farmers(count):
+        ids = [farmer.id for farmer in Farmer.query.all()]
+        names = [db.session.execute(
+            db.select(Farmer.name).where(Farmer.id == farmer_id)).scalar()
+            for farmer_id in ids[:count]]
+        stats = current_query_stats()
+        return jsonify({'names': names, 'queries': stats.count})
+
+    with app.app_context():
+        db.create_all()
+        for number in range(12):
+            db.session.add(Farmer(
+                name=f"Farmer {number}",
+                email=f"farmer{number}@user.com",
+                phone_number=f"1234567{number:02d}",
+                password_hash="hashedpassword"))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_statement_shape():
+    """Test that statements differing only in parameters share a shape."""
+    assert statement_shape("SELECT a\n  FROM t WHERE id IN (?, ?, ?)") == \
+        statement_shape("SELECT a FROM t WHERE id IN (?)")
+    assert statement_shape("SELECT a FROM t WHERE id = %s") != \
+        statement_shape("SELECT b FROM t WHERE id = %s")
+
+
+def test_counts_queries_per_request(test_app):
+    """Test that each request counts only its own statements."""
+    client = test_app.test_client()
+    assert client.get('/farmers/2').get_json()['queries'] == 3
+    assert client.get('/farmers/0').get_json()['queries'] == 1
+
+
+def test_flags_n_plus_one(test_app, caplog):
+    """Test that a statement repeated per row is logged with its route."""
+    client = test_app.test_client()
+    with caplog.at_level(logging.WARNING):
+        client.get('/farmers/2')
+    assert 'N+1' not in caplog.text
+
+    with caplog.at_level(logging.WARNING):
+        client.get('/farmers/12')
+    assert 'Likely N+1 in GET farmers: ran 12 times: SELECT farmers.name' \
+        in caplog.text
+    assert 'GET farmers ran 13 queries' in caplog.text
+
+
+def test_assert_max_queries(test_app):
+    """Test that the helper fails with the statements that ran."""
+    client = test_app.test_client()
+    with assert_max_queries(3):
+        client.get('/farmers/2')
+
+    with pytest.raises(AssertionError) as error:
+        with assert_max_queries(3):
+            client.get('/farmers/5')
+    assert 'ran 6' in str(error.value)
+    assert '5 x SELECT farmers.name' in str(error.value)
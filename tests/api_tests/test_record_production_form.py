@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import func, select
+from web_dynamic.app import create_app, db
+from models.employee import Employee
+from models.farmer import Farmer
+from models.labour import Labour
+from models.market_value import MarketValue
+from models.production import ProductionRecord
+from models.production_daily_total import ProductionDailyTotal
+from web_dynamic.services.identity import identity_cache
+from web_dynamic.utils.query_stats import assert_max_queries
+
+TODAY = date.today()
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create and configure a new app instance for each test."""
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    identity_cache.clear()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def make_farmer(number, employees):
+    """Create a farmer with a plucking labour type and employees."""
+    farmer = Farmer(name=f"Farmer {number}", email=f"farmer{number}@user.com",
+                    phone_number=f"07000000{number:02d}",
+                    password_hash="hashedpassword")
+    db.session.add(farmer)
+    db.session.flush()
+    labour = Labour(type="plucking", rate=10.0, farmer_id=farmer.id)
+    db.session.add(labour)
+    db.session.flush()
+    employee_ids = []
+    for index in range(employees):
+        employee = Employee(name=f"Plucker {number}-{index}",
+                            phone_number=f"08{number:04d}{index:04d}",
+                            password_hash="password", labour_id=labour.id,
+                            farmer_id=farmer.id)
+        db.session.add(employee)
+        db.session.flush()
+        employee_ids.append(employee.id)
+    db.session.commit()
+    return farmer.id, employee_ids
+
+
+@pytest.fixture(scope='function')
+def sheet(test_app):
+    """A signed in farmer with 300 pluckers, and another farmer."""
+    farmer_id, employee_ids = make_farmer(1, 300)
+    _, other_ids = make_farmer(2, 1)
+    db.session.add(MarketValue(date=TODAY - timedelta(days=3),
+                               price_per_kg=21.0))
+    db.session.add(MarketValue(date=TODAY - timedelta(days=1),
+                               price_per_kg=23.5))
+    db.session.commit()
+    client = test_app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = f"farmer:{farmer_id}"
+        session['_fresh'] = True
+    return client, farmer_id, employee_ids, other_ids
+
+
+def muster(employee_ids):
+    """Form data for one weigh-in per employee."""
+    data = {'plucking_date': TODAY.isoformat()}
+    for index, employee_id in enumerate(employee_ids):
+        data[f'productions-{index}-employee_id'] = employee_id
+        data[f'productions-{index}-weight'] = str(10 + index % 7)
+        data[f'productions-{index}-rate'] = '12.5'
+    return data
+
+
+def test_record_production_defaults_to_latest_price(sheet):
+    """Test that the form offers the farmer's employees and the most
+    recent market price."""
+    client, _, _, other_ids = sheet
+    page = client.get('/farmer/record_production').get_data(as_text=True)
+    assert 'value="23.5"' in page
+    assert 'Plucker 1-299' in page
+    assert other_ids[0] not in page
+
+
+def test_record_production_inserts_a_sheet_in_few_queries(sheet):
+    """Test that a 300-row muster sheet costs a handful of queries."""
+    client, farmer_id, employee_ids, _ = sheet
+    client.get('/farmer/record_production')
+    db.session.remove()
+
+    # Employees, the weigh-ins, the daily totals and the dashboard version
+    with assert_max_queries(4):
+        response = client.post('/farmer/record_production',
+                               data=muster(employee_ids))
+    assert response.status_code == 302
+
+    weighed = db.session.scalar(select(func.sum(ProductionRecord.weight))
+                                .where(ProductionRecord.farmer_id ==
+                                       farmer_id))
+    expected = sum(10 + index % 7 for index in range(300))
+    assert db.session.scalar(select(func.count()).select_from(
+        ProductionRecord)) == 300
+    assert weighed == expected
+    assert db.session.scalar(select(func.sum(
+        ProductionDailyTotal.total_amount))) == pytest.approx(expected * 12.5)
+
+
+def test_record_production_rejects_other_farmers_employees(sheet):
+    """Test that a row naming another farmer's employee fails the whole
+    sheet."""
+    client, _, employee_ids, other_ids = sheet
+    response = client.post('/farmer/record_production',
+                           data=muster(employee_ids[:2] + other_ids))
+    assert response.status_code == 200
+    assert 'Not a valid choice' in response.get_data(as_text=True)
+    assert db.session.scalar(select(func.count()).select_from(
+        ProductionRecord)) == 0
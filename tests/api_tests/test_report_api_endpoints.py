@@ -26,10 +26,12 @@ def setup_database(app):
     # Add labour categories
     plucking_labour = Labour(
         type="plucking",
+        rate=10.0,
         farmer_id=test_farmer.id
     )
     weeding_labour = Labour(
         type="weeding",
+        rate=10.0,
         farmer_id=test_farmer.id
     )
     db.session.add(plucking_labour)
@@ -40,7 +42,7 @@ def setup_database(app):
         name="Jane Smith",
         email="employee@test.com",
         phone_number="9876543210",
-        job_type_id=plucking_labour.id,
+        labour_id=plucking_labour.id,
         password_hash="hashedpassword",
         farmer_id=test_farmer.id
     )
@@ -88,25 +90,27 @@ def test_total_production_report():
         access_token = create_access_token(identity=test_farmer.id)
 
         payload = {
-            "start_date": "2024-12-01",
-            "end_date": "2024-12-02"
+            "report_type": "production",
+            "start": "2024-12-01",
+            "end": "2024-12-02",
+            "granularity": "month"
         }
 
         with app.test_client() as client:
             response = client.post(
-                '/api/reports/total_production',
+                '/api/reports',
                 json=payload,
                 headers={'Authorization': f'Bearer {access_token}'}
             )
 
             assert response.status_code == 200
             data = response.get_json()
-            assert data['total_weight'] == 300.0
-            assert data['total_income'] == 4500.0  # 100*15 + 200*15
+            assert data['totals'] == {
+                'weight': 300.0, 'amount_paid': 3000.0, 'records': 2}
 
 
 def test_employee_performance_report():
-    """Test generating an employee-specific performance report."""
+    """Test generating an employee's daily production for a date range."""
     app = create_app()
     app.config['TESTING'] = True
 
@@ -115,23 +119,27 @@ def test_employee_performance_report():
         access_token = create_access_token(identity=test_farmer.id)
 
         payload = {
-            "employee_id": test_employee.id,
-            "start_date": "2024-12-01",
-            "end_date": "2024-12-02"
+            "report_type": "production",
+            "start": "2024-12-01",
+            "end": "2024-12-02",
+            "granularity": "day"
         }
 
         with app.test_client() as client:
             response = client.post(
-                '/api/reports/employee_performance',
+                '/api/reports',
                 json=payload,
                 headers={'Authorization': f'Bearer {access_token}'}
             )
 
             assert response.status_code == 200
             data = response.get_json()
-            assert data['employee_name'] == "Jane Smith"
-            assert data['total_weight'] == 300.0
-            assert data['total_income'] == 4500.0
+            rows = [dict(zip(data['columns'], row)) for row in data['rows']]
+            assert [row['employee_id'] for row in rows] == \
+                [test_employee.id] * 2
+            assert rows[0]['employee'] == "Jane Smith"
+            assert [row['weight'] for row in rows] == [100.0, 200.0]
+            assert [row['amount_paid'] for row in rows] == [1000.0, 2000.0]
 
 
 def test_expense_report():
@@ -144,49 +152,19 @@ def test_expense_report():
         access_token = create_access_token(identity=test_farmer.id)
 
         payload = {
-            "start_date": "2024-12-01",
-            "end_date": "2024-12-02"
-        }
-
-        with app.test_client() as client:
-            response = client.post(
-                '/api/reports/expenses',
-                json=payload,
-                headers={'Authorization': f'Bearer {access_token}'}
-            )
-
-            assert response.status_code == 200
-            data = response.get_json()
-            assert data['total_expenses'] == 500.0
-            assert len(data['details']) == 1
-            assert data['details'][0]['description'] == "Fertilizer Purchase"
-            assert data['details'][0]['amount'] == 500.0
-
-
-def test_combined_report():
-    """Test generating a combined report for production and expenses."""
-    app = create_app()
-    app.config['TESTING'] = True
-
-    with app.app_context():
-        test_farmer, test_employee, productions, expense, *_ = setup_database(app)
-        access_token = create_access_token(identity=test_farmer.id)
-
-        payload = {
-            "start_date": "2024-12-01",
-            "end_date": "2024-12-02"
+            "report_type": "expenses",
+            "start": "2024-12-01",
+            "end": "2024-12-02"
         }
 
         with app.test_client() as client:
             response = client.post(
-                '/api/reports/combined',
+                '/api/reports',
                 json=payload,
                 headers={'Authorization': f'Bearer {access_token}'}
             )
 
             assert response.status_code == 200
             data = response.get_json()
-            assert data['total_production'] == 300.0
-            assert data['total_income'] == 4500.0
-            assert data['total_expenses'] == 500.0
-            assert data['net_profit'] == 4000.0
+            assert data['totals'] == {'amount': 500.0, 'records': 1}
+            assert data['rows'] == [['2024-12-01', 'weeding', 500.0, 1, 500.0]]
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+import json
+import logging
+import pytest
+from web_dynamic.app import create_app, db
+from web_dynamic.services import pdf_jobs
+from web_dynamic.utils.request_timing import logger, server_timing
+from flask_jwt_extended import create_access_token
+from datetime import date
+from models.employee import Employee
+from models.farmer import Farmer
+from models.labour import Labour
+from models.production import ProductionRecord
+
+PAYLOAD = {
+    "report_type": "production",
+    "start": "2024-12-01",
+    "end": "2024-12-31",
+    "granularity": "week"
+}
+
+
+@pytest.fixture(scope='function')
+def test_app(tmp_path):
+    """Fixture to create an app that renders PDFs inline into tmp_path."""
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['PDF_CACHE_DIR'] = str(tmp_path)
+    app.config['PDF_RENDER_WORKERS'] = 0
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def test_client(test_app):
+    """Fixture to provide a test client for each test."""
+    return test_app.test_client()
+
+
+@pytest.fixture(scope='function')
+def farmer_id():
+    """Fixture to set up a farmer with one production."""
+    test_farmer = Farmer(
+        name="John Doe",
+        email="test@user.com",
+        phone_number="123456789",
+        password_hash="hashedpassword"
+    )
+    db.session.add(test_farmer)
+    db.session.commit()
+    labour_type = Labour(type="plucking", rate=10.0, farmer_id=test_farmer.id)
+    db.session.add(labour_type)
+    db.session.commit()
+    employee = Employee(
+        name="Jane Smith",
+        phone_number="0712345678",
+        password_hash="password",
+        labour_id=labour_type.id,
+        farmer_id=test_farmer.id
+    )
+    db.session.add(employee)
+    db.session.commit()
+    db.session.add(ProductionRecord(
+        employee_id=employee.id, weight=100.0, rate=10.0,
+        date=date(2024, 12, 2), farmer_id=test_farmer.id))
+    db.session.commit()
+    return test_farmer.id
+
+
+@pytest.fixture(scope='function')
+def request_logs():
+    """Fixture collecting the JSON lines of the request logger."""
+    lines = []
+
+    class Collect(logging.Handler):
+        def emit(self, record):
+            lines.append(json.loads(record.getMessage()))
+
+    handler = Collect()
+    logger.addHandler(handler)
+    level = logger.level
+    logger.setLevel(logging.INFO)
+    yield lines
+    logger.removeHandler(handler)
+    logger.setLevel(level)
+
+
+def spans(response):
+    """Parse a Server-Timing header into a dict of durations."""
+    durations = {}
+    for entry in response.headers['Server-Timing'].split(', '):
+        name, duration = entry.split(';')[:2]
+        durations[name] = float(duration.split('=')[1])
+    return durations
+
+
+def test_server_timing_header():
+    """Test that empty spans are left out but db is always sent."""
+    header = server_timing({'auth': 1.25, 'db': 0.0, 'render': 0.0}, 5.0, 0)
+    assert header == 'auth;dur=1.2, db;dur=0.0;desc="0 queries", ' \
+        'total;dur=5.0'
+
+
+def test_dashboard_timing(test_client, farmer_id, request_logs):
+    """Test that a page reports auth, db and render spans and logs a
+    JSON line."""
+    with test_client.session_transaction() as session:
+        session['_user_id'] = f"farmer:{farmer_id}"
+        session['_fresh'] = True
+
+    response = test_client.get('/farmer/dashboard')
+    assert response.status_code == 200
+    timing = spans(response)
+    assert {'auth', 'db', 'render', 'total'} <= set(timing)
+    assert timing['render'] <= timing['total']
+
+    line = request_logs[-1]
+    assert line['route'] == '/farmer/dashboard'
+    assert line['status'] == 200
+    assert line['bytes'] == len(response.data)
+    assert line['queries'] >= 1
+    assert set(line['timings_ms']) == {'auth', 'db', 'render', 'serialize',
+                                       'pdf'}
+
+
+def test_api_timing(test_client, farmer_id, request_logs, monkeypatch):
+    """Test that API calls report auth, serialize and pdf spans."""
+    monkeypatch.setattr(pdf_jobs, 'render_pdf',
+                        lambda html, path: open(path, 'wb').close())
+    headers = {'Authorization':
+               f'Bearer {create_access_token(identity=farmer_id)}'}
+
+    response = test_client.post('/api/reports', json=PAYLOAD, headers=headers)
+    assert response.status_code == 200
+    assert {'auth', 'db', 'serialize'} <= set(spans(response))
+
+    response = test_client.post('/api/reports/pdf_jobs', json=PAYLOAD,
+                                headers=headers)
+    assert response.status_code == 200
+    assert {'auth', 'render', 'pdf'} <= set(spans(response))
+    assert request_logs[-1]['route'] == '/api/reports/pdf_jobs'
+
+    response = test_client.get('/api/employees',
+                               headers={'Authorization': 'Bearer bad'})
+    assert 'total' in spans(response)
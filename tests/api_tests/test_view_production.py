@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+import html
+import pytest
+import re
+from datetime import date, timedelta
+from web_dynamic.app import create_app, db
+from models.employee import Employee
+from models.farmer import Farmer
+from models.labour import Labour
+from models.production import ProductionRecord
+from web_dynamic.routes import farmer_routes
+from web_dynamic.services.identity import identity_cache
+
+TODAY = date.today()
+MONTH_START = TODAY.replace(day=1)
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create and configure a new app instance for each test."""
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['WTF_CSRF_ENABLED'] = False
+    identity_cache.clear()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def make_farmer(number, weights):
+    """Create a farmer whose plucker weighed in once per weight, on
+    consecutive days of the current month, counting back from today."""
+    farmer = Farmer(name=f"Farmer {number}", email=f"farmer{number}@user.com",
+                    phone_number=f"07000000{number:02d}",
+                    password_hash="hashedpassword")
+    db.session.add(farmer)
+    db.session.flush()
+    labour = Labour(type="plucking", rate=10.0, farmer_id=farmer.id)
+    db.session.add(labour)
+    db.session.flush()
+    employee = Employee(name=f"Plucker {number}", phone_number=f"08000000{number:02d}",
+                        password_hash="password", labour_id=labour.id,
+                        farmer_id=farmer.id)
+    db.session.add(employee)
+    db.session.flush()
+    for offset, weight in enumerate(weights):
+        day = max(TODAY - timedelta(days=offset), MONTH_START)
+        db.session.add(ProductionRecord(
+            employee_id=employee.id, weight=weight, rate=10.0, date=day,
+            farmer_id=farmer.id))
+    db.session.commit()
+    return farmer.id
+
+
+@pytest.fixture(scope='function')
+def client(test_app):
+    """A client signed in as a farmer with five weigh-ins this month,
+    next to another farmer with weigh-ins of their own."""
+    farmer_id = make_farmer(1, [10.0, 20.0, 30.0, 40.0, 50.0])
+    make_farmer(2, [1000.0, 2000.0])
+    client = test_app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = f"farmer:{farmer_id}"
+        session['_fresh'] = True
+    return client
+
+
+def filter_data(client, filter_by):
+    page = client.get('/farmer/view_production').get_data(as_text=True)
+    week = html.unescape(re.search(
+        r'name="week"[^>]*>\s*<option[^>]*value="([^"]*)"', page).group(1))
+    return {
+        'filter_by': filter_by,
+        'date': TODAY.isoformat(),
+        'year': str(TODAY.year),
+        'month': str(TODAY.month),
+        'week': week,
+    }
+
+
+def test_view_production_totals_are_scoped_to_the_farmer(client):
+    """Test that the month's totals cover the signed in farmer only."""
+    page = client.post('/farmer/view_production',
+                       data=filter_data(client, 'month')).get_data(
+        as_text=True)
+    assert "Total Weight: 150.0 Kgs" in page
+    assert "Total Amount Paid: Kshs. 1500.0" in page
+    assert "Showing 5 of 5 records" in page
+    assert "Plucker 2" not in page
+
+
+def test_view_production_pages_through_records(client, monkeypatch):
+    """Test that the table is paged and the Next link keeps the filter."""
+    monkeypatch.setattr(farmer_routes, 'PRODUCTION_PAGE_SIZE', 2)
+    page = client.post('/farmer/view_production',
+                       data=filter_data(client, 'year')).get_data(
+        as_text=True)
+    assert "Total Weight: 150.0 Kgs" in page
+    assert "Showing 2 of 5 records" in page
+
+    seen = page.count("<td>Plucker 1</td>")
+    while True:
+        link = re.search(r'href="([^"]*cursor=[^"]*)">Next', page)
+        if link is None:
+            break
+        page = client.get(html.unescape(link.group(1))).get_data(
+            as_text=True)
+        assert "Total Weight: 150.0 Kgs" in page
+        assert ">First<" in page
+        seen += page.count("<td>Plucker 1</td>")
+    assert seen == 5
+
+
+def test_view_production_rejects_a_bad_cursor(client):
+    """Test that a tampered cursor is reported, not a server error."""
+    data = dict(filter_data(client, 'year'), cursor='not-a-cursor')
+    response = client.get('/farmer/view_production', query_string=data)
+    assert response.status_code == 200
+    assert "Invalid date format" in response.get_data(as_text=True)
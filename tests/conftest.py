@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""
+Point the suite at an in-memory SQLite database unless a test database
+is configured. Settings are read when web_dynamic.config is imported,
+so this has to run before any test module imports the app.
+"""
+import os
+
+os.environ.setdefault('TEAFARM_DATABASE_URI', 'sqlite://')
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import pytest
+from flask import Flask
+from models import db, init_app
+from models.index_audit import audit_hot_queries, explain, hot_queries
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create an app bound to an in-memory SQLite database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_hot_queries_use_an_index(test_app):
+    """Every hot query should be answered by an index search."""
+    assert audit_hot_queries() == {}
+
+
+def test_audit_reports_full_scans(test_app):
+    """Dropping an index should make the audit flag the query."""
+    db.session.execute(db.text('DROP INDEX ix_expenses_farmer_id_date'))
+
+    offenders = audit_hot_queries()
+
+    assert 'expenses_by_farmer_and_date' in offenders
+    assert 'expense_totals_by_farmer' in offenders
+    assert 'production_by_farmer_and_date' not in offenders
+
+
+def test_explain_returns_plan_rows(test_app):
+    """EXPLAIN should return the plan for the wrapped statement."""
+    plan = explain(hot_queries()['production_by_farmer_and_date'])
+
+    assert plan
+    assert any('ix_productions_farmer_id_date' in row['detail'] for row in plan)
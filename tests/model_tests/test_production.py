@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+import pytest
+from datetime import date
+from flask import Flask
+from sqlalchemy import func, select
+from models import db, init_app
+from models.employee import Employee
+from models.farmer import Farmer
+from models.labour import Labour
+from models.production import ProductionRecord
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create an app bound to an in-memory SQLite database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def productions(test_app):
+    """Fixture to set up a plucker with three weigh-ins."""
+    farmer = Farmer(
+        name="John Doe",
+        email="test@user.com",
+        phone_number="123456789",
+        password_hash="hashedpassword"
+    )
+    db.session.add(farmer)
+    db.session.commit()
+
+    labour = Labour(type="plucking", rate=10.0, farmer_id=farmer.id)
+    db.session.add(labour)
+    db.session.commit()
+
+    employee = Employee(
+        name="Jane Smith",
+        phone_number="0712345678",
+        password_hash="password",
+        labour_id=labour.id,
+        farmer_id=farmer.id
+    )
+    db.session.add(employee)
+    db.session.commit()
+
+    records = [
+        ProductionRecord(employee_id=employee.id, farmer_id=farmer.id,
+                         weight=weight, rate=rate, date=date(2024, 12, day))
+        for day, weight, rate in ((1, 20.0, 10.0), (2, 30.5, 12.0),
+                                  (3, 15.0, 11.0))
+    ]
+    db.session.add_all(records)
+    db.session.commit()
+    return records
+
+
+def test_amount_paid_on_a_record(productions):
+    """Test that a loaded record computes its amount in Python."""
+    assert [record.amount_paid for record in productions] == \
+        [200.0, 366.0, 165.0]
+    assert productions[1].to_dict()['amount_paid'] == 366.0
+
+
+def test_amount_paid_is_summed_in_sql(productions):
+    """Test that the class attribute is the weight * rate expression."""
+    statement = select(func.sum(ProductionRecord.amount_paid)).where(
+        ProductionRecord.date >= date(2024, 12, 2))
+    assert 'productions.weight * productions.rate' in str(statement)
+    assert db.session.scalar(statement) == pytest.approx(531.0)
+
+    dearest = db.session.scalars(select(ProductionRecord).where(
+        ProductionRecord.amount_paid > 300)).all()
+    assert [record.date.day for record in dearest] == [2]
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+import pytest
+from datetime import date
+from flask import Flask
+from models import db, init_app
+from models.employee import Employee
+from models.farmer import Farmer
+from models.labour import Labour
+from models.production import ProductionRecord
+from models.production_daily_total import ProductionDailyTotal
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create an app bound to an in-memory SQLite database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def setup_data(test_app):
+    """Fixture to set up a farmer with two employees."""
+    farmer = Farmer(
+        name="John Doe",
+        email="test@user.com",
+        phone_number="123456789",
+        password_hash="hashedpassword"
+    )
+    db.session.add(farmer)
+    db.session.commit()
+
+    labour = Labour(type="plucking", rate=10.0, farmer_id=farmer.id)
+    db.session.add(labour)
+    db.session.commit()
+
+    employees = [
+        Employee(
+            name=f"Plucker {number}",
+            phone_number=f"071234567{number}",
+            password_hash="password",
+            labour_id=labour.id,
+            farmer_id=farmer.id
+        )
+        for number in range(2)
+    ]
+    db.session.add_all(employees)
+    db.session.commit()
+    return farmer, employees
+
+
+def totals():
+    """Return the daily totals keyed by (employee_id, date)."""
+    return {
+        (total.employee_id, total.date):
+            (total.total_weight, total.total_amount, total.record_count)
+        for total in ProductionDailyTotal.query.all()
+    }
+
+
+def add_production(farmer, employee, weight, day, rate=10.0):
+    """Record one production through the ORM."""
+    production = ProductionRecord(
+        employee_id=employee.id, farmer_id=farmer.id,
+        weight=weight, rate=rate, date=day)
+    db.session.add(production)
+    db.session.commit()
+    return production
+
+
+def test_insert_accumulates_totals(setup_data):
+    """Productions on the same day are summed into one row."""
+    farmer, employees = setup_data
+    add_production(farmer, employees[0], 10.0, date(2024, 12, 1))
+    add_production(farmer, employees[0], 5.0, date(2024, 12, 1), rate=12.0)
+
+    assert totals() == {
+        (employees[0].id, date(2024, 12, 1)): (15.0, 160.0, 2)
+    }
+
+
+
+def test_totals_without_a_native_upsert(setup_data, monkeypatch):
+    """Other databases update the day's row, or insert it if missing."""
+    farmer, employees = setup_data
+    monkeypatch.setattr(db.engine.dialect, 'name', 'postgresql')
+    production = add_production(farmer, employees[0], 10.0,
+                                date(2024, 12, 1))
+    add_production(farmer, employees[0], 5.0, date(2024, 12, 1), rate=12.0)
+    add_production(farmer, employees[1], 3.0, date(2024, 12, 1))
+    assert totals() == {
+        (employees[0].id, date(2024, 12, 1)): (15.0, 160.0, 2),
+        (employees[1].id, date(2024, 12, 1)): (3.0, 30.0, 1)
+    }
+
+    db.session.delete(production)
+    production = add_production(farmer, employees[1], 1.0,
+                                date(2024, 12, 2))
+    assert totals() == {
+        (employees[0].id, date(2024, 12, 1)): (5.0, 60.0, 1),
+        (employees[1].id, date(2024, 12, 1)): (3.0, 30.0, 1),
+        (employees[1].id, date(2024, 12, 2)): (1.0, 10.0, 1)
+    }
+
+def test_update_moves_totals(setup_data):
+    """Changing weight, date or employee moves the contribution."""
+    farmer, employees = setup_data
+    production = add_production(farmer, employees[0], 10.0, date(2024, 12, 1))
+    add_production(farmer, employees[0], 4.0, date(2024, 12, 1))
+
+    production.weight = 20.0
+    db.session.commit()
+    assert totals() == {
+        (employees[0].id, date(2024, 12, 1)): (24.0, 240.0, 2)
+    }
+
+    production.date = date(2024, 12, 2)
+    production.employee_id = employees[1].id
+    db.session.commit()
+    assert totals() == {
+        (employees[0].id, date(2024, 12, 1)): (4.0, 40.0, 1),
+        (employees[1].id, date(2024, 12, 2)): (20.0, 200.0, 1)
+    }
+
+
+def test_delete_removes_empty_days(setup_data):
+    """Deleting the last production of a day drops its row."""
+    farmer, employees = setup_data
+    production = add_production(farmer, employees[0], 10.0, date(2024, 12, 1))
+    add_production(farmer, employees[1], 3.0, date(2024, 12, 1))
+
+    db.session.delete(production)
+    db.session.commit()
+
+    assert totals() == {
+        (employees[1].id, date(2024, 12, 1)): (3.0, 30.0, 1)
+    }
+
+
+def test_rollback_discards_totals(setup_data):
+    """Totals are written in the same transaction as the production."""
+    farmer, employees = setup_data
+    db.session.add(ProductionRecord(
+        employee_id=employees[0].id, farmer_id=farmer.id,
+        weight=10.0, rate=10.0, date=date(2024, 12, 1)))
+    db.session.flush()
+    db.session.rollback()
+
+    assert totals() == {}
+
+
+def test_rebuild_matches_incremental_totals(setup_data):
+    """A rebuild recomputes the same totals from the productions."""
+    farmer, employees = setup_data
+    for day in range(1, 4):
+        add_production(farmer, employees[day % 2], 2.0 * day,
+                       date(2024, 12, day))
+    expected = totals()
+
+    db.session.execute(ProductionDailyTotal.__table__.delete())
+    db.session.commit()
+    assert ProductionDailyTotal.rebuild(batch_size=1) == 1
+
+    assert totals() == expected
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+import pytest
+from datetime import date
+from flask import Flask
+from models import db, init_app
+from models.employee import Employee
+from models.expense import Expense
+from models.farmer import Farmer
+from models.inventory import Inventory
+from models.labour import Labour
+from models.production import ProductionRecord
+from models.index_audit import explain, is_full_scan
+from models.dashboard_version import ALL_FARMERS, DashboardVersion
+from sqlalchemy import insert, update
+from web_dynamic.services import dashboard
+from web_dynamic.services.dashboard import DashboardCache, dashboard_cache,\
+    dashboard_totals_query, get_cached_dashboard_totals,\
+    get_dashboard_totals, period_bounds
+
+TODAY = date(2024, 12, 15)
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create an app bound to an in-memory SQLite database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    init_app(app)
+    dashboard_cache.clear()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def make_farmer(number):
+    """Create a farmer with one plucker."""
+    farmer = Farmer(
+        name=f"Farmer {number}",
+        email=f"farmer{number}@user.com",
+        phone_number=f"12345678{number}",
+        password_hash="hashedpassword"
+    )
+    db.session.add(farmer)
+    db.session.commit()
+    labour = Labour(type="plucking", rate=10.0, farmer_id=farmer.id)
+    db.session.add(labour)
+    db.session.commit()
+    employee = Employee(
+        name=f"Plucker {number}",
+        phone_number=f"07123456{number}",
+        password_hash="password",
+        labour_id=labour.id,
+        farmer_id=farmer.id
+    )
+    db.session.add(employee)
+    db.session.commit()
+    return farmer, labour, employee
+
+
+def test_period_bounds_roll_over_the_year():
+    """December's month range ends on the first of next January."""
+    assert period_bounds(date(2024, 12, 31)) == (
+        date(2024, 12, 1), date(2025, 1, 1),
+        date(2024, 1, 1), date(2025, 1, 1))
+
+
+def test_dashboard_totals(test_app):
+    """Month and year figures are split and scoped to the farmer."""
+    farmer, labour, employee = make_farmer(1)
+    other_farmer, other_labour, other_employee = make_farmer(2)
+
+    for day, weight in ((date(2024, 12, 1), 10.0),
+                        (date(2024, 12, 31), 5.0),
+                        (date(2024, 3, 2), 7.0),
+                        (date(2023, 12, 31), 100.0)):
+        db.session.add(ProductionRecord(
+            employee_id=employee.id, farmer_id=farmer.id,
+            weight=weight, rate=10.0, date=day))
+    db.session.add(ProductionRecord(
+        employee_id=other_employee.id, farmer_id=other_farmer.id,
+        weight=50.0, rate=10.0, date=date(2024, 12, 2)))
+
+    for day, amount in ((date(2024, 12, 2), 200.0),
+                        (date(2024, 11, 30), 50.0),
+                        (date(2025, 1, 1), 999.0)):
+        db.session.add(Expense(
+            category_id=labour.id, description="Wages",
+            amount=amount, date=day, farmer_id=farmer.id))
+    db.session.add(Expense(
+        category_id=other_labour.id, description="Wages",
+        amount=80.0, date=date(2024, 12, 2), farmer_id=other_farmer.id))
+
+    db.session.add(Inventory(item_name="Fertilizer", quantity=3,
+                             farmer_id=farmer.id))
+    db.session.add(Inventory(item_name="Fertilizer", quantity=9,
+                             farmer_id=other_farmer.id))
+    db.session.commit()
+
+    assert get_dashboard_totals(farmer.id, TODAY) == {
+        'total_expenses': 200.0,
+        'total_expenses_year': 250.0,
+        'total_tea_produced': 15.0,
+        'total_tea_produced_year': 22.0,
+        'total_inventory_balance': 3
+    }
+
+
+def test_dashboard_totals_without_data(test_app):
+    """A farmer without records sees zeros rather than None."""
+    farmer, labour, employee = make_farmer(1)
+
+    totals = get_dashboard_totals(farmer.id, TODAY)
+
+    assert set(totals.values()) == {0}
+
+
+def test_dashboard_query_uses_indexes(test_app):
+    """No part of the dashboard query falls back to a table scan."""
+    plan = explain(dashboard_totals_query('audit', TODAY))
+
+    assert not is_full_scan(plan, 'sqlite')
+
+
+def test_dashboard_query_reads_each_table_once(test_app):
+    """The month and year sums share one pass over each table."""
+    details = [row['detail'] for row in
+               explain(dashboard_totals_query('audit', TODAY))]
+
+    for table in ('expenses', 'production_daily_totals'):
+        assert len([detail for detail in details
+                    if detail.startswith(f'SEARCH {table} ')]) == 1
+    assert not any(detail.startswith('SCAN expenses') or
+                   detail.startswith('SCAN production_daily_totals')
+                   for detail in details)
+
+
+def test_cache_serves_hits_until_the_ttl_runs_out():
+    """Entries are served until they expire."""
+    now = [0.0]
+    cache = DashboardCache(clock=lambda: now[0])
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'total_expenses': len(calls)}
+
+    assert cache.get('farmer', compute, ttl=60, max_entries=10) == \
+        {'total_expenses': 1}
+    assert cache.get('farmer', compute, ttl=60, max_entries=10) == \
+        {'total_expenses': 1}
+    now[0] = 61.0
+    assert cache.get('farmer', compute, ttl=60, max_entries=10) == \
+        {'total_expenses': 2}
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 2
+
+
+def test_cache_evicts_the_least_recently_used_farmer():
+    """The cache never holds more than max_entries farmers."""
+    cache = DashboardCache()
+    for farmer_id in ('a', 'b', 'a', 'c'):
+        cache.get(farmer_id, dict, ttl=60, max_entries=2)
+
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['evictions'] == 1
+    cache.get('a', dict, ttl=60, max_entries=2)
+    assert cache.stats()['hits'] == 2
+
+
+def test_commits_invalidate_the_farmers_written_to(test_app):
+    """A committed write refreshes only that farmer's figures."""
+    farmer, labour, employee = make_farmer(1)
+    other_farmer, other_labour, other_employee = make_farmer(2)
+    today = date.today()
+
+    assert get_cached_dashboard_totals(farmer.id)['total_expenses'] == 0
+    assert get_cached_dashboard_totals(other_farmer.id)['total_expenses'] == 0
+
+    db.session.add(Expense(category_id=labour.id, description="Wages",
+                           amount=40.0, date=today, farmer_id=farmer.id))
+    db.session.commit()
+
+    assert get_cached_dashboard_totals(farmer.id)['total_expenses'] == 40.0
+    get_cached_dashboard_totals(other_farmer.id)
+    assert dashboard_cache.stats()['hits'] == 1
+
+
+def test_rollbacks_and_bulk_inserts(test_app):
+    """Rolled back writes keep the entry; bulk inserts drop it."""
+    farmer, labour, employee = make_farmer(1)
+    today = date.today()
+    get_cached_dashboard_totals(farmer.id)
+
+    db.session.add(Inventory(item_name="Fertilizer", quantity=3,
+                             farmer_id=farmer.id))
+    db.session.flush()
+    db.session.rollback()
+    get_cached_dashboard_totals(farmer.id)
+    assert dashboard_cache.stats()['hits'] == 1
+
+    db.session.execute(insert(ProductionRecord), [{
+        'id': 'bulk-1', 'employee_id': employee.id, 'farmer_id': farmer.id,
+        'weight': 5.0, 'rate': 10.0, 'date': today}])
+    db.session.commit()
+    get_cached_dashboard_totals(farmer.id)
+    assert dashboard_cache.stats()['misses'] == 2
+
+
+def test_writes_through_another_worker_show_up(test_app, monkeypatch):
+    """A commit invalidates the figures cached by every worker."""
+    farmer, labour, employee = make_farmer(1)
+    other_worker = DashboardCache()
+    with monkeypatch.context() as patch:
+        patch.setattr(dashboard, 'dashboard_cache', other_worker)
+        assert get_cached_dashboard_totals(farmer.id)['total_expenses'] == 0
+        get_cached_dashboard_totals(farmer.id)
+    assert other_worker.stats()['hits'] == 1
+
+    # This worker's commit never reaches the other worker's cache
+    db.session.add(Expense(category_id=labour.id, description="Wages",
+                           amount=40.0, date=date.today(),
+                           farmer_id=farmer.id))
+    db.session.commit()
+    assert DashboardVersion.current(db.session, farmer.id) == (0, 1)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(dashboard, 'dashboard_cache', other_worker)
+        assert get_cached_dashboard_totals(farmer.id)['total_expenses'] == \
+            40.0
+
+    # A bulk UPDATE may touch any farmer
+    db.session.execute(update(Expense).values(amount=50.0))
+    db.session.commit()
+    with monkeypatch.context() as patch:
+        patch.setattr(dashboard, 'dashboard_cache', other_worker)
+        assert get_cached_dashboard_totals(farmer.id)['total_expenses'] == \
+            50.0
+    assert other_worker.stats()['misses'] == 3
+    assert other_worker.stats()['invalidations'] == 0
+    assert db.session.get(DashboardVersion, ALL_FARMERS).version == 1
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+import pytest
+from flask import Flask
+from models import db, init_app
+from models.employee import Employee
+from models.farmer import Farmer
+from models.labour import Labour
+from sqlalchemy import update
+from web_dynamic.services.identity import identity_cache, load_principal,\
+    parse_identity
+from web_dynamic.utils.query_stats import count_queries
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create an app bound to an in-memory SQLite database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    init_app(app)
+    identity_cache.clear()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def users(test_app):
+    """Fixture to set up a farmer and one of their employees."""
+    farmer = Farmer(
+        name="John Doe",
+        email="test@user.com",
+        phone_number="123456789",
+        password_hash="hashedpassword"
+    )
+    db.session.add(farmer)
+    db.session.commit()
+    labour = Labour(type="plucking", rate=10.0, farmer_id=farmer.id)
+    db.session.add(labour)
+    db.session.commit()
+    employee = Employee(
+        name="Jane Smith",
+        phone_number="0712345678",
+        password_hash="password",
+        labour_id=labour.id,
+        farmer_id=farmer.id
+    )
+    db.session.add(employee)
+    db.session.commit()
+    return farmer.get_id(), employee.get_id()
+
+
+def fresh_load(user_id):
+    """Load a user in a new session, as a new request would, and return
+    it with the statements run."""
+    db.session.remove()
+    with count_queries() as stats:
+        user = load_principal(user_id)
+    return user, list(stats.statements.elements())
+
+
+def test_parse_identity():
+    """Test that identities name the principal type."""
+    assert parse_identity('farmer:abc') == ('farmer', 'abc')
+    assert parse_identity('employee:abc') == ('employee', 'abc')
+    assert parse_identity('abc') is None
+    assert parse_identity('admin:abc') is None
+
+
+def test_one_query_then_cached(users):
+    """Test that a user costs one lookup, then none while cached."""
+    farmer_id, employee_id = users
+    farmer, statements = fresh_load(farmer_id)
+    assert isinstance(farmer, Farmer)
+    assert len(statements) == 1
+    assert 'employees' not in statements[0]
+
+    farmer, statements = fresh_load(farmer_id)
+    assert statements == []
+    assert farmer.get_id() == farmer_id
+    assert farmer in db.session
+    # Relationships still load through the current session
+    assert [employee.name for employee in farmer.employees] == ["Jane Smith"]
+
+    employee, statements = fresh_load(employee_id)
+    assert isinstance(employee, Employee)
+    assert len(statements) == 1
+
+
+def test_legacy_identity(users):
+    """Test that bare ids from older sessions still load."""
+    farmer_id, employee_id = users
+    assert isinstance(fresh_load(farmer_id.split(':')[1])[0], Farmer)
+    assert isinstance(fresh_load(employee_id.split(':')[1])[0], Employee)
+    assert fresh_load('farmer:missing')[0] is None
+
+
+def test_profile_change_invalidates(users):
+    """Test that a committed change to the user is seen at once."""
+    farmer_id = users[0]
+    fresh_load(farmer_id)
+
+    farmer = fresh_load(farmer_id)[0]
+    farmer.name = "John Kamau"
+    farmer.set_password("new password")
+    db.session.commit()
+
+    farmer, statements = fresh_load(farmer_id)
+    assert len(statements) == 1
+    assert farmer.name == "John Kamau"
+    assert farmer.check_password("new password")
+
+    # A rolled back change leaves the cache alone
+    farmer.name = "Someone Else"
+    db.session.flush()
+    db.session.rollback()
+    assert fresh_load(farmer_id)[1] == []
+
+
+def test_bulk_update_invalidates(users):
+    """Test that bulk statements, whose rows are unknown, drop every
+    user."""
+    farmer_id, employee_id = users
+    fresh_load(farmer_id)
+    fresh_load(employee_id)
+    db.session.execute(update(Employee).values(name="Renamed"))
+    db.session.commit()
+
+    employee, statements = fresh_load(employee_id)
+    assert len(statements) == 1
+    assert employee.name == "Renamed"
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import pytest
+from datetime import date
+from flask import Flask
+from sqlalchemy import insert, update
+from models import db, init_app
+from models.market_value import MarketValue
+from web_dynamic.services.market_prices import PriceIndex,\
+    get_price_index, latest_price, price_history
+from web_dynamic.utils.query_stats import count_queries
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create an app bound to an in-memory SQLite database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    init_app(app)
+    price_history.clear()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def prices(test_app):
+    """Fixture to set prices on 1, 10 and 20 March."""
+    for day, price in ((1, 20.0), (10, 22.0), (20, 25.0)):
+        db.session.add(MarketValue(date=date(2024, 3, day),
+                                   price_per_kg=price))
+    db.session.commit()
+
+
+def test_price_index_as_of_lookups():
+    """Test that a day gets the last price set on or before it."""
+    index = PriceIndex.from_rows([
+        (date(2024, 3, 1), 20.0),
+        (date(2024, 3, 10), 22.0),
+        (date(2024, 3, 10), 23.0),
+        (date(2024, 3, 20), 25.0),
+    ])
+    assert index.price_on(date(2024, 2, 29)) is None
+    assert index.price_on(date(2024, 3, 1)) == 20.0
+    assert index.price_on(date(2024, 3, 9)) == 20.0
+    # The later of two prices on one day wins
+    assert index.price_on(date(2024, 3, 10)) == 23.0
+    assert index.price_on(date(2025, 1, 1)) == 25.0
+    assert index.latest() == 25.0
+
+
+def test_empty_price_index():
+    """Test that an empty history has no prices."""
+    index = PriceIndex.from_rows([])
+    assert index.price_on(date(2024, 3, 1)) is None
+    assert index.latest() is None
+
+
+def test_prices_are_loaded_once(prices):
+    """Test that lookups after the first are served without a query."""
+    assert latest_price() == 25.0
+    with count_queries() as stats:
+        assert latest_price() == 25.0
+        assert get_price_index().price_on(date(2024, 3, 5)) == 20.0
+    assert stats.count == 0
+    assert price_history.stats()['entries'] == 3
+
+
+def test_committed_prices_invalidate_the_index(prices):
+    """Test that ORM and bulk writes show up once committed."""
+    assert latest_price() == 25.0
+
+    db.session.add(MarketValue(date=date(2024, 3, 25), price_per_kg=27.0))
+    db.session.flush()
+    assert latest_price() == 25.0
+    db.session.commit()
+    assert latest_price() == 27.0
+
+    db.session.execute(insert(MarketValue).values(
+        id='bulk', date=date(2024, 3, 30), price_per_kg=30.0))
+    db.session.commit()
+    assert latest_price() == 30.0
+
+    db.session.execute(update(MarketValue).values(price_per_kg=1.0))
+    db.session.rollback()
+    assert latest_price() == 30.0
+    assert get_price_index().price_on(date(2024, 3, 12)) == 22.0
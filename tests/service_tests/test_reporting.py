@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+import pytest
+from datetime import date, timedelta
+from flask import Flask
+from sqlalchemy import event
+from models import db, init_app
+from models.employee import Employee
+from models.expense import Expense
+from models.farmer import Farmer
+from models.labour import Labour
+from models.production import ProductionRecord
+from web_dynamic.services.reporting import bucket_label, build_report,\
+    parse_report_range
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create an app bound to an in-memory SQLite database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def setup_data(test_app):
+    """Fixture to set up a farmer with a plucker and a weeder."""
+    farmer = Farmer(
+        name="John Doe",
+        email="test@user.com",
+        phone_number="123456789",
+        password_hash="hashedpassword"
+    )
+    db.session.add(farmer)
+    db.session.commit()
+
+    plucking = Labour(type="plucking", rate=10.0, farmer_id=farmer.id)
+    weeding = Labour(type="weeding", rate=300.0, farmer_id=farmer.id)
+    db.session.add_all([plucking, weeding])
+    db.session.commit()
+
+    plucker = Employee(name="Amina", phone_number="0712345670",
+                       password_hash="password", labour_id=plucking.id,
+                       farmer_id=farmer.id)
+    weeder = Employee(name="Baraka", phone_number="0712345671",
+                      password_hash="password", labour_id=weeding.id,
+                      farmer_id=farmer.id)
+    db.session.add_all([plucker, weeder])
+    db.session.commit()
+    return farmer, (plucking, weeding), (plucker, weeder)
+
+
+def add_production(farmer, employee, day, weight, rate=10.0):
+    """Record one production."""
+    db.session.add(ProductionRecord(
+        employee_id=employee.id, farmer_id=farmer.id,
+        weight=weight, rate=rate, date=day))
+
+
+def test_parse_report_range():
+    """The inclusive end becomes an exclusive bound."""
+    assert parse_report_range('2024-01-01', '2024-01-31') == \
+        (date(2024, 1, 1), date(2024, 2, 1))
+    with pytest.raises(ValueError):
+        parse_report_range('2024-02-01', '2024-01-01')
+    with pytest.raises(ValueError):
+        parse_report_range('01/01/2024', '2024-01-31')
+    with pytest.raises(ValueError):
+        parse_report_range('2020-01-01', '2024-01-31')
+
+
+def test_bucket_labels():
+    """Buckets are named after their ISO week, month or season."""
+    assert bucket_label('2024-12-30', 'week') == '2025-W01'
+    assert bucket_label('2024-12-01', 'month') == '2024-12'
+    assert bucket_label('2024-03-01', 'season') == '2024 long rains'
+    assert bucket_label('2024-12-02', 'day') == '2024-12-02'
+
+
+@pytest.mark.parametrize('granularity, expected', [
+    ('day', ['2024-12-28', '2024-12-29', '2024-12-30', '2025-01-02']),
+    # ISO weeks start on Monday; 2024-12-30 opens 2025-W01
+    ('week', ['2024-12-23', '2024-12-30']),
+    ('month', ['2024-12-01', '2025-01-01']),
+    ('season', ['2024-10-01', '2025-01-01']),
+])
+def test_production_buckets(setup_data, granularity, expected):
+    """Production is grouped into the requested buckets."""
+    farmer, labours, (plucker, weeder) = setup_data
+    for day in (date(2024, 12, 28), date(2024, 12, 29),
+                date(2024, 12, 30), date(2025, 1, 2)):
+        add_production(farmer, plucker, day, 10.0)
+    db.session.commit()
+
+    report = build_report('production', farmer.id, date(2024, 12, 1),
+                          date(2025, 2, 1), granularity)
+
+    assert [row[0] for row in report['rows']] == expected
+    assert report['totals'] == {
+        'weight': 40.0, 'amount_paid': 400.0, 'records': 4}
+
+
+def test_production_report_groups_by_employee(setup_data):
+    """Each bucket holds one row per employee and labour type."""
+    farmer, labours, (plucker, weeder) = setup_data
+    add_production(farmer, plucker, date(2024, 3, 4), 10.0)
+    add_production(farmer, plucker, date(2024, 3, 5), 20.0)
+    add_production(farmer, weeder, date(2024, 3, 5), 1.0, rate=300.0)
+    # Outside the range
+    add_production(farmer, plucker, date(2024, 2, 29), 99.0)
+    db.session.commit()
+
+    report = build_report('production', farmer.id, date(2024, 3, 1),
+                          date(2024, 4, 1), 'month')
+
+    assert report['columns'] == [
+        'bucket', 'employee_id', 'employee', 'labour_type', 'weight',
+        'amount_paid', 'records', 'avg_weight']
+    assert report['rows'] == [
+        ['2024-03-01', plucker.id, 'Amina', 'plucking', 30.0, 300.0, 2, 15.0],
+        ['2024-03-01', weeder.id, 'Baraka', 'weeding', 1.0, 300.0, 1, 1.0],
+    ]
+    assert report['buckets'] == {'2024-03-01': '2024-03'}
+
+
+def test_expense_report(setup_data):
+    """Expenses are summed, counted and averaged per category."""
+    farmer, (plucking, weeding), employees = setup_data
+    for day, amount, labour in ((date(2024, 6, 3), 100.0, weeding),
+                                (date(2024, 7, 9), 300.0, weeding),
+                                (date(2024, 8, 1), 50.0, plucking)):
+        db.session.add(Expense(category_id=labour.id, description="Wages",
+                               amount=amount, date=day, farmer_id=farmer.id))
+    db.session.commit()
+
+    report = build_report('expenses', farmer.id, date(2024, 1, 1),
+                          date(2025, 1, 1), 'season')
+
+    assert report['rows'] == [
+        ['2024-06-01', 'plucking', 50.0, 1, 50.0],
+        ['2024-06-01', 'weeding', 400.0, 2, 200.0],
+    ]
+    assert report['totals'] == {'amount': 450.0, 'records': 3}
+
+
+def test_year_long_report_runs_one_query(setup_data):
+    """A year of daily weigh-ins is reported with a single SELECT."""
+    farmer, labours, (plucker, weeder) = setup_data
+    for offset in range(365):
+        add_production(farmer, plucker, date(2024, 1, 1) +
+                       timedelta(days=offset), 10.0)
+    db.session.commit()
+    farmer_id = farmer.id
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        report = build_report('production', farmer_id, date(2024, 1, 1),
+                              date(2025, 1, 1), 'week')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+
+    assert len(statements) == 1
+    assert len(report['rows']) == 53
+    assert report['totals']['records'] == 365
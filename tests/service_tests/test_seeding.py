@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+import pytest
+from datetime import date
+from flask import Flask
+from sqlalchemy import func, select
+from models import db, init_app
+from models.expense import Expense
+from models.farmer import Farmer
+from models.market_value import MarketValue
+from models.production import ProductionRecord
+from models.production_daily_total import ProductionDailyTotal
+from web_dynamic.commands import seed
+from web_dynamic.services.seeding import SEED_PASSWORD, seasonal_yield,\
+    seed_farms
+
+END = date(2024, 12, 31)
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create an app bound to an in-memory SQLite database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    init_app(app)
+    app.cli.add_command(seed)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def snapshot():
+    """The seeded weigh-ins and prices, in a stable order."""
+    productions = db.session.execute(select(
+        ProductionRecord.id, ProductionRecord.employee_id,
+        ProductionRecord.weight, ProductionRecord.date).order_by(
+        ProductionRecord.id)).all()
+    prices = db.session.execute(select(
+        MarketValue.date, MarketValue.price_per_kg).order_by(
+        MarketValue.date)).all()
+    return productions, prices
+
+
+def test_seed_is_deterministic(test_app):
+    """Test that the same seed and end day give the same rows."""
+    seed_farms(farmers=2, pluckers=3, days=30, seed=7, end=END)
+    first = snapshot()
+    db.drop_all()
+    db.create_all()
+    seed_farms(farmers=2, pluckers=3, days=30, seed=7, end=END)
+    assert snapshot() == first
+    db.drop_all()
+    db.create_all()
+    seed_farms(farmers=2, pluckers=3, days=30, seed=8, end=END)
+    assert snapshot() != first
+
+
+def test_seed_writes_consistent_data(test_app):
+    """Test the row counts, daily totals and wages of a seeded farm."""
+    counts = seed_farms(farmers=3, pluckers=10, days=28, end=END)
+    assert counts['farmers'] == 3
+    assert counts['market_values'] == 28
+    assert counts['productions'] == db.session.scalar(
+        select(func.count()).select_from(ProductionRecord))
+    # Four weeks of six working days, at most one weigh-in a plucker
+    assert 0 < counts['productions'] <= 3 * 10 * 24
+
+    weighed = db.session.scalar(select(func.sum(ProductionRecord.weight)))
+    totalled = db.session.scalar(
+        select(func.sum(ProductionDailyTotal.total_weight)))
+    assert totalled == pytest.approx(weighed)
+
+    # Wages are paid on Saturdays; the last one is 28 December
+    earned = db.session.scalar(select(
+        func.sum(ProductionRecord.weight * ProductionRecord.rate)).where(
+        ProductionRecord.date <= date(2024, 12, 28)))
+    paid = db.session.scalar(select(func.sum(Expense.amount)).where(
+        Expense.description == 'Plucking wages'))
+    assert paid == pytest.approx(earned, abs=0.05)
+    assert db.session.scalar(select(func.min(ProductionRecord.date))) >= \
+        date(2024, 12, 4)
+
+    farmer = db.session.scalar(select(Farmer).where(
+        Farmer.email == 'farmer0@seed.teafarm.test'))
+    assert farmer.check_password(SEED_PASSWORD)
+
+
+def test_seed_yields_follow_the_seasons(test_app):
+    """Test that flush months weigh more than the troughs."""
+    assert seasonal_yield(date(2024, 5, 10)) > 1.25
+    assert seasonal_yield(date(2024, 8, 10)) < 0.75
+    seed_farms(farmers=2, pluckers=10, days=366, end=END)
+
+    def mean_weight(month):
+        return db.session.scalar(select(
+            func.avg(ProductionRecord.weight)).where(
+            func.strftime('%m', ProductionRecord.date) == month))
+
+    assert mean_weight('05') > 1.4 * mean_weight('08')
+
+
+def test_seed_command_refuses_to_seed_twice(test_app):
+    """Test the CLI command, and that re-running it needs --reset."""
+    runner = test_app.test_cli_runner()
+    arguments = ['seed', '--farmers', '2', '--pluckers', '2', '--days', '7',
+                 '--end', '2024-12-31']
+    result = runner.invoke(args=arguments)
+    assert result.exit_code == 0, result.output
+    assert 'Seeded' in result.output
+
+    result = runner.invoke(args=arguments)
+    assert result.exit_code == 1
+    assert '--reset' in result.output
+
+    result = runner.invoke(args=arguments + ['--reset'])
+    assert result.exit_code == 0, result.output
+    assert db.session.scalar(select(func.count()).select_from(Farmer)) == 2
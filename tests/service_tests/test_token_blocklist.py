@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+import pytest
+import time
+from flask import Flask
+from models import db, init_app
+from models.revoked_token import RevokedToken
+from web_dynamic.services.token_blocklist import BloomFilter,\
+    DatabaseBackend, MemoryStore, RedisBackend, TokenBlocklist, make_backend
+
+
+class FakeClock:
+    """A clock the tests move by hand."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(scope='function')
+def test_app():
+    """Fixture to create an app bound to an in-memory SQLite database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test that every added key is found and most others are not."""
+    bloom = BloomFilter(capacity=1000)
+    added = [f"jti-{number}" for number in range(1000)]
+    for key in added:
+        bloom.add(key)
+    assert all(key in bloom for key in added)
+    false_positives = sum(f"other-{number}" in bloom
+                          for number in range(10000))
+    assert false_positives < 300
+
+
+def test_memory_store_expires_keys():
+    """Test that the Redis stand-in forgets keys after their TTL."""
+    clock = FakeClock()
+    store = MemoryStore(clock=clock)
+    store.set('teafarm:revoked:a', 1, ex=10)
+    store.set('other', 1)
+    assert store.exists('teafarm:revoked:a') == 1
+    assert list(store.scan_iter(match='teafarm:revoked:*')) == [
+        'teafarm:revoked:a']
+    clock.now += 10
+    assert store.exists('teafarm:revoked:a') == 0
+    assert store.get('other') == 1
+
+
+def test_database_backend_expires_and_prunes(test_app):
+    """Test that expired rows are ignored, then pruned."""
+    backend = DatabaseBackend()
+    now = time.time()
+    backend.add('expired', now - 1)
+    backend.add('live', now + 3600)
+    assert backend.contains('live')
+    assert not backend.contains('expired')
+    assert backend.live_jtis() == ['live']
+    # Adding a token prunes the rows that have already expired
+    assert db.session.get(RevokedToken, 'expired') is None
+    assert backend.prune() == 0
+
+
+def test_unknown_backend():
+    """Test that a misspelt backend is rejected."""
+    with pytest.raises(ValueError):
+        make_backend({'JWT_BLOCKLIST_BACKEND': 'memcached'})
+
+
+@pytest.mark.parametrize('backend_name', ['database', 'memory'])
+def test_revoke_until_expiry(test_app, backend_name):
+    """Test that a revoked token stays revoked until its exp."""
+    test_app.config['JWT_BLOCKLIST_BACKEND'] = backend_name
+    blocklist = TokenBlocklist(test_app)
+    blocklist.revoke('jti-1', time.time() + 3600)
+    assert blocklist.is_revoked('jti-1')
+    assert not blocklist.is_revoked('jti-2')
+
+    # Tokens that have expired already are not stored at all
+    blocklist.revoke('jti-3', time.time() - 1)
+    assert not blocklist.is_revoked('jti-3')
+
+
+def test_bloom_filter_skips_the_backend(test_app):
+    """Test that tokens never revoked are answered without a lookup."""
+    backend = RedisBackend(MemoryStore())
+    blocklist = TokenBlocklist()
+    blocklist.init_app(test_app, backend=backend)
+    blocklist.revoke('revoked', time.time() + 3600)
+
+    lookups = []
+    contains = backend.contains
+    backend.contains = lambda jti: lookups.append(jti) or contains(jti)
+    assert not any(blocklist.is_revoked(f"jti-{number}")
+                   for number in range(100))
+    assert len(lookups) < 5
+    assert blocklist.is_revoked('revoked')
+    assert lookups[-1] == 'revoked'
+
+
+def test_other_workers_see_logout_after_sync(test_app):
+    """Test that a worker picks up another worker's logout on its next
+    filter rebuild."""
+    store = MemoryStore()
+    worker_a = Flask('worker_a')
+    worker_b = Flask('worker_b')
+    blocklists = []
+    for app in (worker_a, worker_b):
+        blocklist = TokenBlocklist()
+        blocklist.init_app(app, backend=RedisBackend(store))
+        blocklists.append(blocklist)
+    clock = FakeClock()
+    worker_b.extensions['token_blocklist'].clock = clock
+
+    with worker_b.app_context():
+        assert not blocklists[1].is_revoked('jti-1')
+    with worker_a.app_context():
+        blocklists[0].revoke('jti-1', time.time() + 3600)
+    with worker_b.app_context():
+        clock.now += 5
+        assert blocklists[1].is_revoked('jti-1')
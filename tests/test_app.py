@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+import subprocess
+import sys
+import pytest
+from web_dynamic.app import create_app, warm_up, db
+from web_dynamic.config import ProductionConfig, TestingConfig
+
+
+def test_create_app_applies_config():
+    """Test that settings passed to the factory override the defaults."""
+    app = create_app({'SECRET_KEY': 'shared', 'DASHBOARD_CACHE_TTL': 5})
+    assert app.secret_key == 'shared'
+    assert app.config['DASHBOARD_CACHE_TTL'] == 5
+    assert 'api_bp.logout' in app.view_functions
+
+
+def test_workers_share_secret_keys():
+    """Test that two apps built from the same config sign alike."""
+    first = create_app(TestingConfig)
+    second = create_app(TestingConfig)
+    assert first.secret_key == second.secret_key
+    assert (first.config['JWT_SECRET_KEY'] ==
+            second.config['JWT_SECRET_KEY'])
+
+
+def test_production_requires_secret_keys(monkeypatch):
+    """Test that a multi-worker config refuses per-process keys."""
+    monkeypatch.setattr(ProductionConfig, 'SECRET_KEY', None)
+    with pytest.raises(RuntimeError):
+        create_app(ProductionConfig)
+
+
+def test_warm_up():
+    """Test that warm-up fills the template cache and frees the pool."""
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+    warm_up(app)
+    templates = app.jinja_env.list_templates(extensions=['html'])
+    assert len(app.jinja_env.cache) == len(templates)
+
+
+def test_workers_boot_without_numpy():
+    """Test that importing the app leaves NumPy for the payroll."""
+    result = subprocess.run(
+        [sys.executable, '-c',
+         "import sys, web_dynamic.app; print('numpy' in sys.modules)"],
+        capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
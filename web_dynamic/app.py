@@ -5,68 +5,166 @@ Main application file to set up and run the Flask application.
 
 from flask_jwt_extended import JWTManager
 from web_dynamic.routes.api_routes import api_bp
+from web_dynamic.routes.api.production_api_routes import production_bp
+from web_dynamic.routes.api.expense_api_routes import expense_bp
+from web_dynamic.routes.api.inventory_api_routes import inventory_bp
+from web_dynamic.routes.api.report_api_routes import report_bp
+from web_dynamic.routes.farmer_routes import farmer_bp
+from web_dynamic.routes.employee_routes import employee_bp
+from web_dynamic.routes.public_routes import public_bp
+from web_dynamic.commands import register_commands
+from web_dynamic.config import Config
+from web_dynamic.services.identity import load_principal
+from web_dynamic.services.payroll_config import parse_deductions
+from web_dynamic.services.token_blocklist import token_blocklist
+from web_dynamic.utils import metrics, query_stats, request_timing
+from flask_jwt_extended.default_callbacks import default_decode_key_callback
 from flask import Flask, jsonify
 from flask_wtf.csrf import CSRFProtect
 from flask_login import LoginManager
-from flask_sqlalchemy import SQLAlchemy
 import secrets
 from models import db, init_app
-from os import getenv
-from urllib.parse import quote
-from datetime import timedelta
-from flask_migrate import Migrate
-
-app = Flask(__name__, static_folder='../web_static')
-app.secret_key = secrets.token_hex(32)
-
-# Initialize SQLAlchemy
-password = quote(getenv("TEAFARM_MYSQL_PWD", ''))
-# app.config['SQLALCHEMY_DATABASE_URI'] = f'mysql://{user}:{password}@{host}/{database}'
-app.config['SQLALCHEMY_DATABASE_URI'] = (
-    f"mysql+mysqldb://{getenv('TEAFARM_MYSQL_USER')}:{password}@{getenv('TEAFARM_MYSQL_HOST')}/{getenv('TEAFARM_MYSQL_DB')}"
-)
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(minutes=30)
-
-migrate = Migrate(app, db)
-
-# Initialize CSRF protection
-csrf = CSRFProtect(app)
-
-# Register API Blueprint
-app.register_blueprint(api_bp, url_prefix='/api')
-# Disable CSRF protection for API routes
-csrf.exempt(api_bp)
-
-# Initialize JWTManager
-app.config['JWT_SECRET_KEY'] = getenv('JWT_SECRET_KEY' ,secrets.token_hex(32))
-app.config['JWT_TOKEN_LOCATION'] = ['headers']  # Tokens will be passed via headers
-app.config['JWT_BLACKLIST_ENABLED'] = True
-app.config['JWT_BLACKLIST_TOKEN_CHECKS'] = ['access']
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
-app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=30)
-
-jwt = JWTManager(app)
-
-# Blacklist set to store invalidated tokens
-BLACKLIST = set()
-
-# Initialize database
-init_app(app)
-
-# Initialize LoginManager
+
+# Extensions, bound to each app by create_app
+csrf = CSRFProtect()
+jwt = JWTManager()
 login_manager = LoginManager()
-login_manager.init_app(app)
 login_manager.login_view = "public_bp.signin"
 
 
+def create_app(config=None):
+    """
+    Create and configure an instance of the Flask application.
+
+    Args:
+        config: A configuration class from web_dynamic.config, or a
+            mapping of settings applied on top of the base Config.
+
+    Returns:
+        Flask: The configured application.
+    """
+    app = Flask(__name__, static_folder='../web_static')
+    app.config.from_object(Config)
+    if isinstance(config, dict):
+        app.config.update(config)
+    elif config is not None:
+        app.config.from_object(config)
+
+    for key in ('SECRET_KEY', 'JWT_SECRET_KEY'):
+        if not app.config.get(key):
+            if app.config.get('REQUIRE_SECRET_KEYS'):
+                raise RuntimeError(
+                    f"{key} must be set when running several workers")
+            # Only valid inside this process: fine for a dev server
+            app.config[key] = secrets.token_hex(32)
+
+    # Fail at startup, not on every payroll request, on a bad setting
+    app.config['PAYROLL_DEDUCTIONS'] = parse_deductions(
+        app.config.get('PAYROLL_DEDUCTIONS'))
+
+    # Initialize database
+    init_app(app)
+
+    # Count and time the SQL each request runs, and report where each
+    # request spends its time
+    query_stats.init_app(app)
+    request_timing.init_app(app)
+
+    # Serve Prometheus metrics at /metrics
+    metrics.init_app(app)
+
+    # Initialize CSRF protection
+    csrf.init_app(app)
+
+    # Register API Blueprints
+    for blueprint in (api_bp, production_bp, expense_bp, inventory_bp,
+                      report_bp):
+        app.register_blueprint(blueprint, url_prefix='/api')
+        # Disable CSRF protection for API routes
+        csrf.exempt(blueprint)
+
+    # Initialize JWTManager and the revoked token store it checks
+    jwt.init_app(app)
+    token_blocklist.init_app(app)
+
+    # Initialize LoginManager
+    login_manager.init_app(app)
+
+    # Register Blueprints
+    app.register_blueprint(farmer_bp, url_prefix='/farmer')
+    app.register_blueprint(employee_bp, url_prefix='/employee')
+    app.register_blueprint(public_bp)
+
+    # Register CLI commands, including Flask-Migrate's `flask db`
+    register_commands(app)
+
+    return app
+
+
+def warm_up(app):
+    """
+    Do the work of a cold first request ahead of time.
+
+    Meant to run once in the gunicorn master before it forks (with
+    --preload), so every worker starts with compiled templates, a
+    built URL map, configured mappers and SQL already compiled for the
+    hot queries. The connection pool is disposed of afterwards:
+    connections must not be shared across a fork, and each worker
+    opens its own.
+    """
+    from sqlalchemy.exc import SQLAlchemyError
+    from sqlalchemy.orm import configure_mappers
+    from models.index_audit import hot_queries
+    from web_dynamic.services.dashboard import dashboard_totals_query
+
+    # Compile every template into the Jinja cache
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
+
+    # Build the URL matcher
+    with app.test_request_context('/'):
+        pass
+
+    with app.app_context():
+        configure_mappers()
+
+        # Fail fast on a bad database URI, before any worker starts
+        with db.engine.connect() as connection:
+            connection.exec_driver_sql('SELECT 1')
+
+        # Fill the compiled statement cache the workers inherit
+        statements = list(hot_queries().values())
+        statements.append(dashboard_totals_query('warm-up'))
+        try:
+            for statement in statements:
+                db.session.execute(statement).all()
+        except SQLAlchemyError as e:
+            app.logger.warning("Skipped priming the query cache: %s", e)
+        finally:
+            db.session.remove()
+        db.engine.dispose()
+
+
+# Signing key lookup, the first step of verifying a token
+@jwt.decode_key_loader
+def decode_key(jwt_header, jwt_payload):
+    """
+    Return the key that verifies a token, starting the auth span that
+    check_if_token_in_blacklist ends.
+    """
+    request_timing.start_span('auth')
+    return default_decode_key_callback(jwt_header, jwt_payload)
+
 # Token blacklist function
 @jwt.token_in_blocklist_loader
 def check_if_token_in_blacklist(jwt_header, jwt_payload):
     """
     Function to check if a token is in the blacklist.
     """
-    return jwt_payload['jti'] in BLACKLIST
+    try:
+        return token_blocklist.is_revoked(jwt_payload['jti'])
+    finally:
+        request_timing.stop_span('auth')
 
 # Invalid token
 @jwt.invalid_token_loader
@@ -79,25 +177,12 @@ def invalid_token_callback(error):
 # User loader function
 @login_manager.user_loader
 def load_user(user_id):
-    from models.employee import Employee
-    from models.farmer import Farmer
-    # Try to load user as Employee first
-    user = Employee.query.get(user_id)
-    if user:
-        return user
-
-    # If not found as Employee, try Farmer
-    user = Farmer.query.get(user_id)
-    return user
-
-# Register Blueprints
-from web_dynamic.routes.farmer_routes import farmer_bp
-from web_dynamic.routes.employee_routes import employee_bp
-from web_dynamic.routes.public_routes import public_bp
+    """
+    Load the farmer or employee of a session, in one query at most.
+    """
+    with request_timing.span('auth'):
+        return load_principal(user_id)
 
-app.register_blueprint(farmer_bp, url_prefix='/farmer')
-app.register_blueprint(employee_bp, url_prefix='/employee')
-app.register_blueprint(public_bp)
 
 if __name__ == "__main__":
-    app.run(debug=True, host='0.0.0.0', port=5004)
+    create_app().run(debug=True, host='0.0.0.0', port=5004)
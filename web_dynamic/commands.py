@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+"""
+Flask CLI commands for database maintenance.
+"""
+
+import click
+from importlib import import_module
+from flask.cli import with_appcontext
+
+
+class LazyGroup(click.Group):
+    """
+    A command group whose subcommands are imported on first use.
+
+    Flask-Migrate pulls in Alembic, which is by far the slowest import
+    of the app; web workers never run `flask db`, so they should not
+    pay for it.
+    """
+
+    def __init__(self, *args, import_name, setup=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._import_name = import_name
+        self._setup = setup
+        self._group = None
+
+    def _load(self):
+        """Import the real group, running the setup hook first."""
+        if self._group is None:
+            if self._setup is not None:
+                self._setup()
+            module_name, attribute = self._import_name.split(':')
+            self._group = getattr(import_module(module_name), attribute)
+        return self._group
+
+    def list_commands(self, ctx):
+        return self._load().list_commands(ctx)
+
+    def get_command(self, ctx, cmd_name):
+        return self._load().get_command(ctx, cmd_name)
+
+
+@click.command('audit-indexes')
+@with_appcontext
+def audit_indexes():
+    """Fail if any hot query does a full table scan."""
+    from models.index_audit import audit_hot_queries
+
+    offenders = audit_hot_queries()
+    if not offenders:
+        click.echo('All hot queries use an index.')
+        return
+
+    for name, plan in offenders.items():
+        click.echo(f'Full scan in {name}:', err=True)
+        for row in plan:
+            click.echo(f'    {row}', err=True)
+    raise SystemExit(1)
+
+
+@click.command('rebuild-daily-totals')
+@click.option('--batch-size', default=100, show_default=True,
+              help='Farmers recomputed per transaction.')
+@with_appcontext
+def rebuild_daily_totals(batch_size):
+    """Recompute the daily production totals from scratch."""
+    from models.production_daily_total import ProductionDailyTotal
+
+    rebuilt = ProductionDailyTotal.rebuild(batch_size=batch_size)
+    click.echo(f'Rebuilt daily production totals for {rebuilt} farmers.')
+
+
+@click.command('prune-pdf-cache')
+@click.option('--max-age-days', default=30, show_default=True,
+              help='Remove rendered reports older than this.')
+@with_appcontext
+def prune_pdf_cache(max_age_days):
+    """Delete old rendered PDF reports."""
+    from web_dynamic.services.pdf_jobs import prune_cache
+
+    removed = prune_cache(max_age_days * 24 * 3600)
+    click.echo(f'Removed {removed} cached report files.')
+
+
+@click.command('prune-revoked-tokens')
+@with_appcontext
+def prune_revoked_tokens():
+    """Delete logged out tokens that have expired anyway."""
+    from web_dynamic.services.token_blocklist import token_blocklist
+
+    removed = token_blocklist.prune()
+    click.echo(f'Removed {removed} expired revoked tokens.')
+
+
+@click.command('seed')
+@click.option('--scale', type=click.Choice(['small', 'medium', 'large']),
+              default='small', show_default=True,
+              help='Preset farmer, plucker and day counts.')
+@click.option('--farmers', type=int, help='Farmers to create.')
+@click.option('--pluckers', type=int, help='Pluckers per farmer.')
+@click.option('--days', type=int, help='Days of data, ending yesterday.')
+@click.option('--seed', 'seed_value', default=42, show_default=True,
+              help='Random seed; the same seed gives the same data.')
+@click.option('--end', type=click.DateTime(formats=['%Y-%m-%d']),
+              help='Last day covered instead of yesterday.')
+@click.option('--password', default=None,
+              help='Password of the seeded users.')
+@click.option('--batch-size', default=10000, show_default=True,
+              help='Rows inserted per statement.')
+@click.option('--reset', is_flag=True,
+              help='Drop and re-create every table first.')
+@with_appcontext
+def seed(scale, farmers, pluckers, days, seed_value, end, password,
+         batch_size, reset):
+    """Fill the database with synthetic farm data."""
+    import time
+    from models import db
+    from web_dynamic.services.seeding import SCALES, SEED_PASSWORD,\
+        seed_farms
+
+    if reset:
+        db.drop_all()
+        db.create_all()
+
+    sizes = dict(SCALES[scale])
+    for name, value in (('farmers', farmers), ('pluckers', pluckers),
+                        ('days', days)):
+        if value is not None:
+            sizes[name] = value
+
+    started = time.perf_counter()
+    try:
+        counts = seed_farms(
+            seed=seed_value, end=end.date() if end else None,
+            password=password or SEED_PASSWORD, batch_size=batch_size,
+            progress=lambda message: click.echo(
+                f'[{time.perf_counter() - started:7.1f}s] {message}'),
+            **sizes)
+    except ValueError as e:
+        raise click.ClickException(f'{e} Pass --reset to start over.')
+    click.echo(f'Seeded {sum(counts.values())} rows in '
+               f'{time.perf_counter() - started:.1f}s.')
+
+
+def register_commands(app):
+    """Attach the maintenance commands to the app CLI."""
+    from models import db
+
+    def init_migrate():
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+    app.cli.add_command(LazyGroup(
+        'db', help='Perform database migrations.',
+        import_name='flask_migrate.cli:db', setup=init_migrate))
+    app.cli.add_command(audit_indexes)
+    app.cli.add_command(rebuild_daily_totals)
+    app.cli.add_command(prune_pdf_cache)
+    app.cli.add_command(prune_revoked_tokens)
+    app.cli.add_command(seed)
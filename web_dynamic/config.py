@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+"""
+Configuration classes for the Flask application.
+
+Settings are read from the environment when this module is imported.
+Pass one of these classes (or a mapping of overrides) to create_app.
+"""
+
+from datetime import timedelta
+from os import getenv
+from urllib.parse import quote
+
+
+def _database_uri():
+    """Build the database URI from the environment."""
+    password = quote(getenv("TEAFARM_MYSQL_PWD", ''))
+    return getenv('TEAFARM_DATABASE_URI') or (
+        f"mysql+mysqldb://{getenv('TEAFARM_MYSQL_USER')}:{password}"
+        f"@{getenv('TEAFARM_MYSQL_HOST')}/{getenv('TEAFARM_MYSQL_DB')}"
+    )
+
+
+class Config:
+    """Base configuration, shared by every environment."""
+    # Signing keys must be the same in every worker; create_app
+    # generates throwaway keys only when these are unset
+    SECRET_KEY = getenv('TEAFARM_SECRET_KEY')
+    JWT_SECRET_KEY = getenv('JWT_SECRET_KEY')
+
+    SQLALCHEMY_DATABASE_URI = _database_uri()
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    PERMANENT_SESSION_LIFETIME = timedelta(minutes=30)
+
+    JWT_TOKEN_LOCATION = ['headers']  # Tokens will be passed via headers
+    JWT_BLACKLIST_ENABLED = True
+    JWT_BLACKLIST_TOKEN_CHECKS = ['access']
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+
+    # Where logged out tokens are kept until they expire: 'database',
+    # 'redis' (needs JWT_BLOCKLIST_REDIS_URL) or the per-process 'memory'
+    JWT_BLOCKLIST_BACKEND = getenv('TEAFARM_JWT_BLOCKLIST_BACKEND', 'database')
+    JWT_BLOCKLIST_REDIS_URL = getenv('TEAFARM_REDIS_URL')
+    # Seconds a worker may miss a logout made through another worker
+    JWT_BLOCKLIST_SYNC_INTERVAL = int(
+        getenv('TEAFARM_JWT_BLOCKLIST_SYNC_INTERVAL', 5))
+
+    # Write one JSON line per request to the teafarm.requests logger
+    REQUEST_LOG = getenv('TEAFARM_REQUEST_LOG', '1') != '0'
+
+    # Serve Prometheus metrics at /metrics
+    METRICS_ENABLED = getenv('TEAFARM_METRICS', '1') != '0'
+
+    # Requests logged for running too many or too slow queries, and
+    # how often one statement may repeat before it is flagged as N+1
+    QUERY_COUNT_THRESHOLD = int(getenv('TEAFARM_QUERY_COUNT_THRESHOLD', 50))
+    QUERY_TIME_THRESHOLD_MS = int(
+        getenv('TEAFARM_QUERY_TIME_THRESHOLD_MS', 200))
+    N_PLUS_ONE_THRESHOLD = int(getenv('TEAFARM_N_PLUS_ONE_THRESHOLD', 5))
+
+    # Per-worker cache of the dashboard figures; writes through any
+    # worker invalidate it through the dashboard_versions table
+    DASHBOARD_CACHE_TTL = int(getenv('TEAFARM_DASHBOARD_CACHE_TTL', 300))
+    DASHBOARD_CACHE_SIZE = int(getenv('TEAFARM_DASHBOARD_CACHE_SIZE', 10000))
+
+    # Per-worker cache of the logged in users
+    IDENTITY_CACHE_TTL = int(getenv('TEAFARM_IDENTITY_CACHE_TTL', 60))
+    IDENTITY_CACHE_SIZE = int(getenv('TEAFARM_IDENTITY_CACHE_SIZE', 10000))
+
+    # Per-worker copy of the market price history
+    MARKET_PRICE_CACHE_TTL = int(getenv('TEAFARM_MARKET_PRICE_CACHE_TTL', 300))
+
+    # Deductions taken off gross pay on the payroll register, as
+    # comma separated name=fraction pairs, e.g. "housing_levy=0.015";
+    # create_app parses them into a dict and rejects a malformed value
+    PAYROLL_DEDUCTIONS = getenv('TEAFARM_PAYROLL_DEDUCTIONS', '')
+
+    # Rendered PDF reports and the processes that render them
+    PDF_CACHE_DIR = getenv('TEAFARM_PDF_CACHE_DIR')
+    PDF_RENDER_WORKERS = int(getenv('TEAFARM_PDF_RENDER_WORKERS', 2))
+
+
+class ProductionConfig(Config):
+    """Configuration for multi-worker deployments."""
+    # Refuse to start with per-process keys, which break sessions and
+    # tokens as soon as a request lands on another worker
+    REQUIRE_SECRET_KEYS = True
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_pre_ping': True,
+        'pool_recycle': 3600,
+    }
+
+
+class TestingConfig(Config):
+    """Configuration for the test suite: an in-memory SQLite database."""
+    TESTING = True
+    SECRET_KEY = 'testing'
+    JWT_SECRET_KEY = 'testing'
+    SQLALCHEMY_DATABASE_URI = getenv('TEAFARM_TEST_DATABASE_URI', 'sqlite://')
+    WTF_CSRF_ENABLED = False
+    PDF_RENDER_WORKERS = 0
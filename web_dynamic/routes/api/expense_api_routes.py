@@ -7,9 +7,13 @@ expenses, including creating, reading, updating, and deleting expenses.
 """
 
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select
 from models.expense import Expense
 from models import db
+from web_dynamic.utils.export import EXPORT_FORMATS, export_response,\
+    parse_date_range
+from web_dynamic.utils.pagination import get_page_args, keyset_paginate
 import traceback
 from datetime import date
 
@@ -20,20 +24,74 @@ expense_bp = Blueprint('expense_bp', __name__)
 @jwt_required()
 def get_expenses():
     """
-    Retrieve a list of all expenses.
+    Retrieve one page of the farmer's expenses, newest first.
+
+    Query parameters:
+        limit: Page size (default 100, at most 1000).
+        cursor: The next_cursor of the previous page.
 
     Returns:
-        JSON: A list of expense records or an error message.
+        JSON: A page of expense records and the cursor of the next
+        page, or an error message.
     """
     try:
-        expenses = Expense.query.all()
-        result = [expense.to_dict() for expense in expenses]
-        return jsonify(result), 200
+        limit, cursor = get_page_args(request.args, Expense.date)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        query = Expense.query.filter_by(farmer_id=get_jwt_identity())
+        expenses, next_cursor = keyset_paginate(
+            query, Expense.date, Expense.id, limit, cursor)
+        return jsonify({
+            "expenses": [expense.to_dict() for expense in expenses],
+            "next_cursor": next_cursor
+        }), 200
     except Exception as e:
         traceback.print_exc()
         return jsonify({"error": f"Failed to fetch expenses: {str(e)}"}), 500
 
 
+@expense_bp.route('/expenses/export', methods=['GET'])
+@jwt_required()
+def export_expenses():
+    """
+    Stream the farmer's expense history as CSV or NDJSON.
+
+    Query parameters:
+        format: "csv" (default) or "ndjson".
+        start_date, end_date: Optional inclusive bounds (YYYY-MM-DD).
+
+    Returns:
+        A streamed file download or an error message.
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify(
+            {"error": f"Format must be one of {sorted(EXPORT_FORMATS)}"}
+        ), 400
+    try:
+        start_date, end_date = parse_date_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    statement = select(
+        Expense.id,
+        Expense.date,
+        Expense.category_id,
+        Expense.description,
+        Expense.amount
+    ).where(
+        Expense.farmer_id == get_jwt_identity()
+    ).order_by(Expense.date, Expense.id)
+    if start_date:
+        statement = statement.where(Expense.date >= start_date)
+    if end_date:
+        statement = statement.where(Expense.date <= end_date)
+
+    return export_response(statement, export_format, 'expenses')
+
+
 @expense_bp.route('/expenses/<id>', methods=['GET'])
 @jwt_required()
 def get_expense(id):
@@ -82,13 +140,20 @@ def create_expense():
     if not all([category_id, amount, farmer_id]):
         return jsonify({"error": "Category ID, amount, and farmer ID are required"}), 400
 
+    # The date defaults to today
+    try:
+        expense_date = date.fromisoformat(data['date']) \
+            if data.get('date') else date.today()
+    except (TypeError, ValueError):
+        return jsonify({"error": "Date must be in YYYY-MM-DD format"}), 400
+
     try:
         new_expense = Expense(
             category_id=category_id,
             description=description,
             amount=amount,
             farmer_id=farmer_id,
-            date=date
+            date=expense_date
         )
         db.session.add(new_expense)
         db.session.commit()
@@ -6,7 +6,8 @@ This module contains the API routes for managing inventory in the TeaFarm Pro ap
 from flask import Blueprint, request, jsonify, abort
 from models import db
 from models.inventory import Inventory
-from flask_jwt_extended import jwt_required
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from web_dynamic.utils.pagination import get_page_args, keyset_paginate
 
 # Create a Blueprint for the inventory API routes
 inventory_bp = Blueprint('inventory_bp', __name__)
@@ -28,7 +29,8 @@ def create_inventory():
     # Create the inventory item
     item_name = data['item_name']
     quantity = data['quantity']
-    new_inventory = Inventory(item_name=item_name, quantity=quantity)
+    new_inventory = Inventory(item_name=item_name, quantity=quantity,
+                              farmer_id=get_jwt_identity())
     
     # Add to the session and commit
     db.session.add(new_inventory)
@@ -42,11 +44,25 @@ def create_inventory():
 @jwt_required()
 def get_all_inventories():
     """
-    Get all inventory items.
+    Get one page of the farmer's inventory items, newest first.
+
+    Query parameters:
+        limit: Page size (default 100, at most 1000).
+        cursor: The next_cursor of the previous page.
     """
-    inventories = Inventory.query.all()
-    
-    return jsonify([inventory.to_dict() for inventory in inventories]), 200
+    try:
+        limit, cursor = get_page_args(request.args, Inventory.created_at)
+    except ValueError as e:
+        abort(400, description=str(e))
+
+    query = Inventory.query.filter_by(farmer_id=get_jwt_identity())
+    inventories, next_cursor = keyset_paginate(
+        query, Inventory.created_at, Inventory.id, limit, cursor)
+
+    return jsonify({
+        "inventories": [inventory.to_dict() for inventory in inventories],
+        "next_cursor": next_cursor
+    }), 200
 
 
 # Route to get a specific inventory item by ID
@@ -9,32 +9,103 @@ and calculating total production within a specified date range.
 """
 
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert, select
 from models.production import ProductionRecord  # Correct model import
+from models.production_daily_total import ProductionDailyTotal
+from models.employee import Employee
+from models.labour import Labour
 from models import db
+from web_dynamic.utils.export import EXPORT_FORMATS, export_response,\
+    parse_date_range
+from web_dynamic.utils.pagination import get_page_args, keyset_paginate
+from datetime import datetime
+import math
+import uuid
 
 # Initialize Blueprint
 production_bp = Blueprint('production_bp', __name__)
 
+# Upper bound on the rows accepted by one bulk request
+MAX_BULK_ROWS = 10000
+
 @production_bp.route('/productions', methods=['GET'])
 @jwt_required()
 def get_productions():
     """
-    Retrieve a list of all production records.
+    Retrieve one page of the farmer's production records, newest first.
+
+    Query parameters:
+        limit: Page size (default 100, at most 1000).
+        cursor: The next_cursor of the previous page.
 
     Returns:
-        JSON: A list of production records or an error message.
+        JSON: A page of production records and the cursor of the next
+        page, or an error message.
     """
     try:
-        productions = ProductionRecord.query.all()
-        result = [production.to_dict() for production in productions]
-        return jsonify(result), 200
+        limit, cursor = get_page_args(request.args, ProductionRecord.date)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        query = ProductionRecord.query.filter_by(
+            farmer_id=get_jwt_identity())
+        productions, next_cursor = keyset_paginate(
+            query, ProductionRecord.date, ProductionRecord.id,
+            limit, cursor)
+        return jsonify({
+            "productions": [production.to_dict()
+                            for production in productions],
+            "next_cursor": next_cursor
+        }), 200
     except Exception as e:
         return jsonify(
             {"error": f"Failed to fetch productions: {str(e)}"}
         ), 500
 
 
+@production_bp.route('/productions/export', methods=['GET'])
+@jwt_required()
+def export_productions():
+    """
+    Stream the farmer's production history as CSV or NDJSON.
+
+    Query parameters:
+        format: "csv" (default) or "ndjson".
+        start_date, end_date: Optional inclusive bounds (YYYY-MM-DD).
+
+    Returns:
+        A streamed file download or an error message.
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify(
+            {"error": f"Format must be one of {sorted(EXPORT_FORMATS)}"}
+        ), 400
+    try:
+        start_date, end_date = parse_date_range(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    statement = select(
+        ProductionRecord.id,
+        ProductionRecord.date,
+        ProductionRecord.employee_id,
+        ProductionRecord.weight,
+        ProductionRecord.rate,
+        ProductionRecord.amount_paid.label('amount_paid')
+    ).where(
+        ProductionRecord.farmer_id == get_jwt_identity()
+    ).order_by(ProductionRecord.date, ProductionRecord.id)
+    if start_date:
+        statement = statement.where(ProductionRecord.date >= start_date)
+    if end_date:
+        statement = statement.where(ProductionRecord.date <= end_date)
+
+    return export_response(statement, export_format, 'productions')
+
+
 @production_bp.route('/productions/<id>', methods=['GET'])
 @jwt_required()
 def get_production(id):
@@ -86,6 +157,11 @@ def create_production():
             {"error": "Date, weight, rate, employee_id and farmer_id are required"}
         ), 400
 
+    try:
+        date = datetime.strptime(date, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return jsonify({"error": "Date must be in YYYY-MM-DD format"}), 400
+
     try:
         new_production = ProductionRecord(
             date=date, weight=weight, rate=rate, employee_id=employee_id,
@@ -101,6 +177,149 @@ def create_production():
         ), 500
 
 
+def _is_positive_number(value):
+    """Check that a JSON value is a finite number above zero."""
+    return not isinstance(value, bool) and isinstance(value, (int, float)) \
+        and math.isfinite(value) and value > 0
+
+
+def _validate_bulk_row(row):
+    """
+    Validate one row of a bulk production upload.
+
+    Returns:
+        tuple: The cleaned row and a list of error messages.
+    """
+    if not isinstance(row, dict):
+        return None, ["Row must be an object"]
+
+    errors = []
+    employee_id = row.get('employee_id')
+    if not employee_id or not isinstance(employee_id, str):
+        errors.append("employee_id is required")
+
+    # Flask parses NaN and Infinity, which compare false to everything
+    weight = row.get('weight')
+    if not _is_positive_number(weight):
+        errors.append("weight must be a positive number")
+
+    rate = row.get('rate')
+    if rate is not None and not _is_positive_number(rate):
+        errors.append("rate must be a positive number")
+
+    try:
+        production_date = datetime.strptime(
+            str(row.get('date')), '%Y-%m-%d').date()
+    except ValueError:
+        production_date = None
+        errors.append("date must be in YYYY-MM-DD format")
+
+    if errors:
+        return None, errors
+    return {
+        "employee_id": employee_id,
+        "weight": float(weight),
+        "rate": float(rate) if rate is not None else None,
+        "date": production_date
+    }, []
+
+
+@production_bp.route('/productions/bulk', methods=['POST'])
+@jwt_required()
+def create_productions_bulk():
+    """
+    Add a batch of production records in a single transaction.
+
+    The whole batch is validated before anything is written. Rates
+    missing from a row are taken from the employee's labour type, and
+    all employees are resolved with one query.
+
+    Request JSON:
+        {
+            "productions": [
+                {
+                    "date": "<date>",
+                    "weight": <weight>,
+                    "rate": <rate>,  # Optional
+                    "employee_id": <employee_id>
+                },
+                ...
+            ]
+        }
+
+    Returns:
+        JSON: The number of records inserted, or the errors per row.
+    """
+    data = request.get_json(silent=True)
+    rows = data.get('productions') if isinstance(data, dict) else data
+    current_farmer_id = get_jwt_identity()
+
+    if not isinstance(rows, list) or not rows:
+        return jsonify(
+            {"error": "A non-empty list of productions is required"}
+        ), 400
+    if len(rows) > MAX_BULK_ROWS:
+        return jsonify(
+            {"error": f"At most {MAX_BULK_ROWS} productions per request"}
+        ), 413
+
+    cleaned = []
+    errors = []
+    for index, row in enumerate(rows):
+        clean_row, row_errors = _validate_bulk_row(row)
+        if row_errors:
+            errors.append({"index": index, "errors": row_errors})
+        cleaned.append(clean_row)
+
+    try:
+        # Resolve every employee and its labour rate in one query
+        employee_ids = {row['employee_id'] for row in cleaned if row}
+        employee_rates = dict(db.session.execute(
+            select(Employee.id, Labour.rate)
+            .join(Labour, Employee.labour_id == Labour.id)
+            .where(
+                Employee.farmer_id == current_farmer_id,
+                Employee.id.in_(employee_ids)
+            )
+        ).all())
+
+        for index, row in enumerate(cleaned):
+            if row is None:
+                continue
+            if row['employee_id'] not in employee_rates:
+                errors.append({"index": index, "errors": ["Employee not found"]})
+            elif row['rate'] is None:
+                row['rate'] = employee_rates[row['employee_id']]
+
+        if errors:
+            errors.sort(key=lambda error: error['index'])
+            return jsonify({
+                "error": "No productions were recorded",
+                "errors": errors
+            }), 400
+
+        now = datetime.utcnow()
+        values = [
+            dict(row, id=str(uuid.uuid4()), farmer_id=current_farmer_id,
+                 created_at=now, updated_at=now)
+            for row in cleaned
+        ]
+        db.session.execute(insert(ProductionRecord), values)
+        # The bulk insert skips the flush hooks, so fold it in here
+        ProductionDailyTotal.add_rows(db.session, values)
+        db.session.commit()
+
+        return jsonify({
+            "message": "Productions recorded successfully",
+            "inserted": len(values)
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify(
+            {"error": f"Failed to record productions: {str(e)}"}
+        ), 500
+
+
 @production_bp.route('/productions/<id>', methods=['PUT'])
 @jwt_required()
 def update_production(id):
@@ -132,6 +351,11 @@ def update_production(id):
             {"error": "Date, weight, rate, and employee_id are required"}
         ), 400
 
+    try:
+        date = datetime.strptime(date, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return jsonify({"error": "Date must be in YYYY-MM-DD format"}), 400
+
     try:
         production = db.session.get(ProductionRecord, id)
         if not production:
@@ -215,7 +439,7 @@ def get_productions_by_employee(employee_id):
 @jwt_required()
 def get_total_production():
     """
-    Calculate the total production within a given date range.
+    Calculate the farmer's total production within a given date range.
 
     Request JSON:
         {
@@ -224,7 +448,8 @@ def get_total_production():
         }
 
     Returns:
-        JSON: Total production quantity for the given date range.
+        JSON: Total production quantity and amount paid for the given
+        date range.
     """
     data = request.get_json()
     start_date = data.get('start_date')
@@ -236,12 +461,17 @@ def get_total_production():
         ), 400
 
     try:
-        total_production = ProductionRecord.query.filter(
+        total_production, total_amount_paid = db.session.execute(select(
+            db.func.sum(ProductionRecord.weight),
+            db.func.sum(ProductionRecord.amount_paid)
+        ).where(
+            ProductionRecord.farmer_id == get_jwt_identity(),
             ProductionRecord.date >= start_date,
             ProductionRecord.date <= end_date
-        ).with_entities(db.func.sum(ProductionRecord.weight)).scalar()
+        )).one()
 
-        return jsonify({"total_production": total_production}), 200
+        return jsonify({"total_production": total_production,
+                        "total_amount_paid": total_amount_paid}), 200
     except Exception as e:
         return jsonify(
             {"error": f"Failed to calculate total production: {str(e)}"}
@@ -2,166 +2,239 @@
 """
 Routes for generating reports for the farmer dynamically from models
 """
-from flask import Blueprint, request, jsonify, abort, send_file, render_template
+from flask import Blueprint, request, jsonify, abort, send_file,\
+    render_template, url_for, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.production import ProductionRecord
-from models.expense import Expense
+from web_dynamic.services.payroll import build_payroll
+from web_dynamic.services.pdf_jobs import job_pdf_path, job_status,\
+    submit_job
+from web_dynamic.services.reporting import GRANULARITIES, REPORT_TYPES,\
+    build_report, parse_report_range
 import datetime
-from io import BytesIO
-from weasyprint import HTML
 
 # Blueprint setup
 report_bp = Blueprint('report_bp', __name__)
 
 # Allowed values for validation
-ALLOWED_REPORT_TYPES = {'production', 'expenses'}
+ALLOWED_REPORT_TYPES = set(REPORT_TYPES)
 ALLOWED_TIME_FRAMES = {'daily', 'weekly', 'monthly'}
+ALLOWED_GRANULARITIES = set(GRANULARITIES)
 
-# Route: Generate a report based on report type and time frame
+# Template the PDF reports are rendered from
+REPORT_TEMPLATE = 'report_template.html'
+
+# Route: Generate a report based on report type and date range
 @report_bp.route('/reports', methods=['POST'])
 @jwt_required()
 def generate_report():
     """
-    Generate a farm-related report based on report type and time frame.
+    Generate a farm-related report over a date range, bucketed by day,
+    ISO week, month or season.
+
+    The range is given as inclusive `start` and `end` dates, or as a
+    `time_frame` of daily, weekly or monthly ending today.
+
+    Returns:
+        JSON: The report as column names, rows and totals. With the
+        'pdf' query parameter, the PDF if it is already rendered, or
+        else the rendering job that was queued for it.
     """
     current_farmer_id = get_jwt_identity()
+    report, error = report_from_request(current_farmer_id)
+    if error:
+        return error
+
+    # Return the generated report data or PDF
+    if 'pdf' in request.args:  # Check if the 'pdf' query parameter is present
+        job = submit_pdf_job(current_farmer_id, report)
+        if job['status'] == 'done':
+            return send_report_pdf(current_farmer_id, job['job_id'])
+        return job_response(job)
+
+    return jsonify(report), 200
+
+# Route: Queue a report for PDF rendering
+@report_bp.route('/reports/pdf_jobs', methods=['POST'])
+@jwt_required()
+def create_pdf_job():
+    """
+    Queue a report for rendering to PDF. Takes the same body as
+    POST /reports.
+
+    Returns:
+        JSON: The job id and status; 200 if the PDF is already cached,
+        202 while it is being rendered.
+    """
+    current_farmer_id = get_jwt_identity()
+    report, error = report_from_request(current_farmer_id)
+    if error:
+        return error
+    return job_response(submit_pdf_job(current_farmer_id, report))
+
+# Route: Poll a PDF rendering job
+@report_bp.route('/reports/pdf_jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_pdf_job(job_id):
+    """
+    Return the status of a PDF rendering job.
+
+    Returns:
+        JSON: The job id and its status: pending, done or failed.
+    """
+    job = job_status(get_jwt_identity(), job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return job_response(job)
+
+# Route: Download the PDF of a finished job
+@report_bp.route('/reports/pdf_jobs/<job_id>/pdf', methods=['GET'])
+@jwt_required()
+def download_pdf_job(job_id):
+    """
+    Download the PDF rendered by a job.
+
+    Returns:
+        The PDF file, or JSON with the job status if it is not done.
+    """
+    current_farmer_id = get_jwt_identity()
+    job = job_status(current_farmer_id, job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job['status'] != 'done':
+        return jsonify(dict(job, error=job.get(
+            'error', "The report is still being rendered"))), 409
+    return send_report_pdf(current_farmer_id, job_id)
+
+# Route: Payroll register for a pay period
+@report_bp.route('/payroll', methods=['GET'])
+@jwt_required()
+def get_payroll():
+    """
+    Return what each employee earned over a pay period.
+
+    Query parameters:
+        start, end: The inclusive pay period (YYYY-MM-DD).
+
+    Returns:
+        JSON: One row per employee with days worked, weigh-ins, kgs,
+        gross pay, the configured deductions and net pay, plus the
+        totals; or an error message.
+    """
+    try:
+        start, end = parse_report_range(request.args.get('start'),
+                                        request.args.get('end'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    payroll = build_payroll(get_jwt_identity(), start, end,
+                            current_app.config['PAYROLL_DEDUCTIONS'])
+    payroll.update({
+        "start": start.isoformat(),
+        "end": (end - datetime.timedelta(days=1)).isoformat()
+    })
+    return jsonify(payroll), 200
+
+def report_from_request(farmer_id):
+    """
+    Validate the report request body and build the report.
 
+    Returns:
+        tuple: The report and None, or None and the error response.
+    """
     # Validate input data
-    data = request.get_json()
+    data = request.get_json(silent=True)
     if not data:
         abort(400, description="Request body must be JSON.")
 
     report_type = data.get('report_type')
     time_frame = data.get('time_frame')
+    granularity = data.get('granularity', 'day')
 
     # Check if the report_type is valid
     if report_type not in ALLOWED_REPORT_TYPES:
         # Return a 400 error with a message for invalid report_type
-        return jsonify({
+        return None, (jsonify({
             'error': f"Invalid report type '{report_type}'. Supported types are: {ALLOWED_REPORT_TYPES}."
-        }), 400
-
-    # Check if the time_frame is valid
-    if time_frame not in ALLOWED_TIME_FRAMES:
-        # Return a 400 error with a message for invalid time_frame
-        return jsonify({
-            'error': f"Invalid time frame '{time_frame}'. Supported frames are: {ALLOWED_TIME_FRAMES}."
-        }), 400
+        }), 400)
+
+    if granularity not in ALLOWED_GRANULARITIES:
+        return None, (jsonify({
+            'error': f"Invalid granularity '{granularity}'. Supported granularities are: {ALLOWED_GRANULARITIES}."
+        }), 400)
+
+    if time_frame is not None:
+        # Check if the time_frame is valid
+        if time_frame not in ALLOWED_TIME_FRAMES:
+            # Return a 400 error with a message for invalid time_frame
+            return None, (jsonify({
+                'error': f"Invalid time frame '{time_frame}'. Supported frames are: {ALLOWED_TIME_FRAMES}."
+            }), 400)
+        start, end = time_frame_range(time_frame)
+    else:
+        try:
+            start, end = parse_report_range(data.get('start'), data.get('end'))
+        except ValueError as e:
+            return None, (jsonify({'error': str(e)}), 400)
 
     # Generate report data dynamically
-    report_data = generate_report_data(report_type, time_frame, current_farmer_id)
-    if not report_data:
+    report = build_report(report_type, farmer_id, start, end, granularity)
+    if not report['rows']:
         abort(404, description="No data available for the requested report.")
 
-    # Return the generated report data or PDF
-    if 'pdf' in request.args:  # Check if the 'pdf' query parameter is present
-        return generate_pdf_report(report_data, report_type, time_frame)
-
-    return jsonify({
+    report.update({
         "report_type": report_type,
-        "time_frame": time_frame,
-        "data": report_data
-    }), 200
+        "granularity": granularity,
+        "start": start.isoformat(),
+        "end": (end - datetime.timedelta(days=1)).isoformat()
+    })
+    return report, None
 
-def generate_report_data(report_type, time_frame, farmer_id):
+def time_frame_range(time_frame):
     """
-    Generate report data based on report type and time frame.
-    """
-    if report_type == 'production':
-        return generate_production_report(time_frame, farmer_id)
-    elif report_type == 'expenses':
-        return generate_expense_report(time_frame, farmer_id)
-    return None
-
-def generate_production_report(time_frame, farmer_id):
-    """
-    Generate a production report dynamically based on the time frame.
+    Return the half-open date range of a time frame ending today.
     """
     today = datetime.date.today()
-    report_data = []
-
     if time_frame == 'daily':
-        productions = ProductionRecord.query.filter_by(farmer_id=farmer_id, date=today).all()
+        start_date = today
     elif time_frame == 'weekly':
         start_date = today - datetime.timedelta(days=today.weekday())  # Start of the week (Monday)
-        productions = ProductionRecord.query.filter(
-            ProductionRecord.farmer_id == farmer_id,
-            ProductionRecord.date.between(start_date, today)
-        ).all()
-    elif time_frame == 'monthly':
-        start_date = today.replace(day=1)
-        productions = ProductionRecord.query.filter(
-            ProductionRecord.farmer_id == farmer_id,
-            ProductionRecord.date.between(start_date, today)
-        ).all()
     else:
-        abort(400, description="Invalid time frame.")
-
-    for production in productions:
-        report_data.append({
-            "date": production.date.isoformat(),
-            "quantity": production.quantity,
-            "employee": production.employee.name  # Ensure production.employee is an instance, not a string.
-        })
-
-    return report_data
+        start_date = today.replace(day=1)
+    return start_date, today + datetime.timedelta(days=1)
 
-def generate_expense_report(time_frame, farmer_id):
+def submit_pdf_job(farmer_id, report):
     """
-    Generate an expense report dynamically based on the time frame.
+    Render the report's HTML and queue it for conversion to PDF.
     """
-    today = datetime.date.today()
-    report_data = []
-
-    if time_frame == 'daily':
-        expenses = Expense.query.filter_by(farmer_id=farmer_id, date=today).all()
-    elif time_frame == 'weekly':
-        start_date = today - datetime.timedelta(days=today.weekday())  # Start of the week (Monday)
-        expenses = Expense.query.filter(
-            Expense.farmer_id == farmer_id,
-            Expense.date.between(start_date, today)
-        ).all()
-    elif time_frame == 'monthly':
-        start_date = today.replace(day=1)
-        expenses = Expense.query.filter(
-            Expense.farmer_id == farmer_id,
-            Expense.date.between(start_date, today)
-        ).all()
-    else:
-        abort(400, description="Invalid time frame.")
+    html_content = render_template(REPORT_TEMPLATE, report=report)
+    return submit_job(farmer_id, REPORT_TEMPLATE, html_content)
 
-    for expense in expenses:
-        report_data.append({
-            "date": expense.date.isoformat(),
-            "amount": expense.amount,
-            "category": expense.category
-        })
-
-    return report_data
-
-def generate_pdf_report(report_data, report_type, time_frame):
+def job_response(job):
     """
-    Generate a PDF report using WeasyPrint and return it as a downloadable file.
+    Return a job's status with links to poll it and download its PDF.
     """
-    # Render the HTML content for the report
-    html_content = render_template(
-        'report_template.html',
-        report_type=report_type,
-        time_frame=time_frame,
-        report_data=report_data
+    body = dict(
+        job,
+        status_url=url_for('report_bp.get_pdf_job', job_id=job['job_id']),
+        download_url=url_for('report_bp.download_pdf_job',
+                             job_id=job['job_id'])
     )
+    return jsonify(body), 202 if job['status'] == 'pending' else 200
 
-    # Convert HTML to PDF using WeasyPrint
-    pdf = HTML(string=html_content).write_pdf()
-
-    # Create a BytesIO buffer to return the PDF as a file
-    buffer = BytesIO(pdf)
-    buffer.seek(0)
-
-    # Send the PDF as a downloadable file
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name=f"{report_type}_{time_frame}_report.pdf",
-        mimetype='application/pdf'
-    )
+def send_report_pdf(farmer_id, job_id):
+    """
+    Send a rendered report as a downloadable file.
+    """
+    pdf_path = job_pdf_path(farmer_id, job_id)
+    try:
+        if pdf_path is not None:
+            return send_file(
+                pdf_path,
+                as_attachment=True,
+                download_name=f"report_{job_id[:12]}.pdf",
+                mimetype='application/pdf'
+            )
+    except FileNotFoundError:
+        pass
+    # The PDF was pruned after its job was found to be done
+    return jsonify({"error": "Job not found"}), 404
@@ -8,6 +8,10 @@ from models.employee import Employee
 from models.labour import Labour
 from models.production import ProductionRecord
 from models import db
+from web_dynamic.services.dashboard import dashboard_cache
+from web_dynamic.services.token_blocklist import token_blocklist
+from web_dynamic.utils.pagination import get_page_args, keyset_paginate
+from datetime import datetime
 
 # Initialize Blueprint
 api_bp = Blueprint('api_bp', __name__)
@@ -238,13 +242,21 @@ def update_employee(employee_id):
 @api_bp.route('/employees', methods=['GET'])
 @jwt_required()
 def get_employees():
-    """Route for fetching all employees of a farmer."""
+    """Route for fetching a page of a farmer's employees, newest first."""
+    try:
+        limit, cursor = get_page_args(request.args, Employee.created_at)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         current_farmer_id = get_jwt_identity()
-        employees = Employee.query.filter_by(farmer_id=current_farmer_id).all()
+        query = Employee.query.filter_by(farmer_id=current_farmer_id)
+        employees, next_cursor = keyset_paginate(
+            query, Employee.created_at, Employee.id, limit, cursor)
 
         return jsonify({
-            "employees": [employee.to_dict() for employee in employees]
+            "employees": [employee.to_dict() for employee in employees],
+            "next_cursor": next_cursor
         }), 200
     except Exception as e:
         return jsonify({"error": f"An unexpected error occurred. {e}"}), 500
@@ -383,6 +395,11 @@ def record_production_data():
         if not data or not data.get('weight') or not data.get('employee_id') or not data.get('date'):
             return jsonify({"error": "Fields 'weight', and 'employee' are required."}), 400
 
+        try:
+            production_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return jsonify({"error": "Field 'date' must be in YYYY-MM-DD format."}), 400
+
         # if rate is not provided, get from employee's job type
         if not data.get('rate'):
             employee = Employee.query.filter_by(id=data['employee_id'], farmer_id=current_farmer_id).first()
@@ -394,7 +411,7 @@ def record_production_data():
             employee_id=data.get('employee_id'),
             weight=data.get('weight'),
             rate=data.get('rate'),
-            date=data.get('date'),
+            date=production_date,
             farmer_id=current_farmer_id
         )
 
@@ -452,13 +469,21 @@ def update_production_data(production_id):
 @api_bp.route('/fetch_production_data', methods=['GET'])
 @jwt_required()
 def fetch_production_data():
-    """Route for fetching production data."""
+    """Route for fetching a page of production data, newest first."""
+    try:
+        limit, cursor = get_page_args(request.args, ProductionRecord.date)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         current_farmer_id = get_jwt_identity()
-        productions = ProductionRecord.query.filter_by(farmer_id=current_farmer_id).all()
+        query = ProductionRecord.query.filter_by(farmer_id=current_farmer_id)
+        productions, next_cursor = keyset_paginate(
+            query, ProductionRecord.date, ProductionRecord.id, limit, cursor)
 
         return jsonify({
-            "productions": [production.to_dict() for production in productions]
+            "productions": [production.to_dict() for production in productions],
+            "next_cursor": next_cursor
         }), 200
     except Exception as e:
         return jsonify({"error": f"An unexpected error occurred. {e}"}), 500
@@ -491,12 +516,18 @@ def logout():
     Logout route for invalidating the current JWT token.
     """
     try:
-        from web_dynamic.app import BLACKLIST
-        jti = get_jwt()['jti']
-        BLACKLIST.add(jti)
+        claims = get_jwt()
+        token_blocklist.revoke(claims['jti'], claims['exp'])
         return jsonify({'message': 'Successfully logged out'}), 200
     # handle 401 error
     except KeyError:
         return jsonify({'message': 'Token is missing'}), 401
     except Exception as e:
-        return jsonify({'error': f'An error occured: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'error': f'An error occured: {str(e)}'}), 500
+
+@api_bp.route('/dashboard/cache_stats', methods=['GET'])
+@jwt_required()
+def dashboard_cache_stats():
+    """Route for the hit, miss and size counters of this worker's
+    dashboard cache."""
+    return jsonify(dashboard_cache.stats()), 200
@@ -27,18 +27,27 @@ from models.expense import Expense
 from models.labour import Labour
 from models.employee import Employee
 from models.production import ProductionRecord
-from models.market_value import MarketValue
+from models.production_daily_total import ProductionDailyTotal
 from models.inventory import Inventory
 from models import db
-from datetime import datetime, timedelta
+from web_dynamic.services.dashboard import get_cached_dashboard_totals
+from web_dynamic.services.market_prices import latest_price
+from web_dynamic.services.reporting import production_totals
+from web_dynamic.utils.pagination import decode_cursor, keyset_paginate
+from datetime import date, datetime, timedelta
 from flask_login import current_user, login_required, login_user, logout_user
 from werkzeug.security import generate_password_hash
-from sqlalchemy import func
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import joinedload
 from math import ceil
+import uuid
 from flask_paginate import Pagination, get_page_parameter
 
 farmer_bp = Blueprint('farmer_bp', __name__)
 
+# Weigh-ins shown per page of the production table
+PRODUCTION_PAGE_SIZE = 100
+
 
 @farmer_bp.route('/', methods=['GET'])
 def index():
@@ -54,46 +63,15 @@ def dashboard():
     current_month = datetime.now().strftime('%Y-%m')
     current_year = datetime.now().strftime('%Y')
 
-    # Calculate total expenses
-    total_expenses = db.session.query(db.func.sum(Expense.amount)).filter(
-        db.func.date_format(Expense.date, '%Y,-%m') == current_month
-    ).scalar() or 0
-
-    # Calculate total tea produced
-    total_tea_produced = db.session.query(
-        db.func.sum(
-            ProductionRecord.weight)).filter(
-        db.func.date_format(
-            ProductionRecord.date,
-            '%Y-%m') == current_month).scalar() or 0
-
-    # Total expenses for the current year
-    total_expenses_year = db.session.query(db.func.sum(Expense.amount)).filter(
-        db.func.date_format(Expense.date, '%Y') == current_year
-    ).scalar() or 0
-
-    # Total tea produced for the current year
-    total_tea_produced_year = db.session.query(
-        db.func.sum(
-            ProductionRecord.weight)).filter(
-        db.func.date_format(
-            ProductionRecord.date,
-            '%Y') == current_year).scalar() or 0
-
-    # Calculate total inventory balance
-    total_inventory_balance = db.session.query(
-        db.func.sum(Inventory.quantity)).scalar() or 0
+    # Month and year totals for this farmer, cached between writes
+    totals = get_cached_dashboard_totals(current_user.id)
 
     return render_template(
         'farmer/farmer_dashboard.html',
         farmer=current_user,
-        total_expenses=total_expenses,
-        total_tea_produced=total_tea_produced,
-        total_inventory_balance=total_inventory_balance,
         current_month=current_month,
         current_year=current_year,
-        total_expenses_year=total_expenses_year,
-        total_tea_produced_year=total_tea_produced_year
+        **totals
     )
 
 
@@ -140,36 +118,36 @@ def assign_task():
 def record_production():
     form = RecordProductionForm()
 
-    # Populate employee choices dynamically in the route
-    employees = Employee.query.all()
-    employee_choices = [(emp.id, emp.name) for emp in employees]
+    # Employee choices for every row of the muster sheet, in one query.
+    # Only the farmer's own employees are offered, so the choice check
+    # of each row also validates ownership without further queries.
+    employees = db.session.execute(
+        select(Employee.id, Employee.name)
+        .where(Employee.farmer_id == current_user.id)
+        .order_by(Employee.name)
+    ).all()
+    employee_choices = [(employee_id, name) for employee_id, name in employees]
     for production_form in form.productions:
         production_form.employee_id.choices = employee_choices
 
     if request.method == 'GET':
-        # Retrieve the most recent rate from MarketValue
-        latest_rate_entry = MarketValue.query.order_by(
-            MarketValue.date.desc()).first()
-        latest_rate = latest_rate_entry.rate if latest_rate_entry else None
-        # Set default rate if exists
-        for production_form in form.productions:
-            if latest_rate is not None:
+        # Default every row to the most recent market price
+        latest_rate = latest_price()
+        if latest_rate is not None:
+            for production_form in form.productions:
                 production_form.rate.data = latest_rate
 
     if form.validate_on_submit():
-        # Loop through each production entry in the form
+        latest_rate = None
+        values = []
+        now = datetime.utcnow()
         for production_entry in form.productions.entries:
-            employee_id = production_entry.employee_id.data
-            weight = production_entry.weight.data
-            rate = production_entry.rate.data or latest_rate
-            date = form.plucking_date.data
-            farmer_id=current_user.id
-
-            # If no rate is provided, use the most recent rate
+            rate = production_entry.rate.data
+            # If no rate is provided, use the most recent market price
             if rate is None:
-                latest_rate_entry = MarketValue.query.order_by(
-                    MarketValue.date.desc()).first()
-                rate = latest_rate_entry.rate if latest_rate_entry else 0
+                if latest_rate is None:
+                    latest_rate = latest_price() or 0
+                rate = latest_rate
 
             # Validate rate
             if rate <= 0:
@@ -181,19 +159,21 @@ def record_production():
                     mode='record',
                     title='Record Production')
 
-            # Fetch employee
-            employee = Employee.query.get(employee_id)
-
-            # Create new ProductionRecord with the rate
-            production = ProductionRecord(
-                employee_id=employee.id,
-                date=date,
-                weight=weight,
-                rate=rate,
-                farmer_id=farmer_id
-            )
-
-            db.session.add(production)
+            values.append({
+                'id': str(uuid.uuid4()),
+                'employee_id': production_entry.employee_id.data,
+                'date': form.plucking_date.data,
+                'weight': production_entry.weight.data,
+                'rate': rate,
+                'farmer_id': current_user.id,
+                'created_at': now,
+                'updated_at': now,
+            })
+
+        # The whole sheet goes in as one executemany INSERT
+        db.session.execute(insert(ProductionRecord), values)
+        # The bulk insert skips the flush hooks, so fold it in here
+        ProductionDailyTotal.add_rows(db.session, values)
         db.session.commit()
         flash('Production recorded successfully!', 'success')
         return redirect(url_for('farmer_bp.record_production'))
@@ -226,10 +206,40 @@ def get_weeks_of_year(year):
 
     return weeks
 
+def production_filter_range(filter_by, selected_date, selected_week,
+                            selected_month, selected_year):
+    """
+    Return the half-open date range [start, end) a production filter
+    covers, or None if the filter is incomplete.
+
+    Raises:
+        ValueError: If the week, month or year is malformed.
+    """
+    if filter_by == 'day' and selected_date is not None:
+        return selected_date, selected_date + timedelta(days=1)
+    if filter_by == 'week' and selected_week:
+        start_of_week, end_of_week = selected_week.strip().split(" to ")
+        start_of_week = datetime.strptime(start_of_week.strip(), '%Y-%m-%d').date()
+        end_of_week = datetime.strptime(end_of_week.strip(), '%Y-%m-%d').date()
+        return start_of_week, end_of_week + timedelta(days=1)
+    if filter_by == 'month' and selected_month and selected_year:
+        start_of_month = date(int(selected_year), int(selected_month), 1)
+        return start_of_month, (start_of_month + timedelta(days=32)).replace(day=1)
+    if filter_by == 'year' and selected_year:
+        year = int(selected_year)
+        return date(year, 1, 1), date(year + 1, 1, 1)
+    return None
+
+
 @farmer_bp.route('/view_production', methods=['GET', 'POST'])
 @login_required
 def view_production():
-    form = ProductionFilterForm()
+    # Pages after the first are links carrying the filter and a cursor
+    paging = request.method == 'GET' and 'filter_by' in request.args
+    if paging:
+        form = ProductionFilterForm(formdata=request.args, meta={'csrf': False})
+    else:
+        form = ProductionFilterForm()
     current_date = datetime.today()
     current_year = current_date.year
     current_month = current_date.month
@@ -246,62 +256,77 @@ def view_production():
     current_week_str = f"{current_week_start.strftime('%Y-%m-%d')} to {current_week_end.strftime('%Y-%m-%d')}"
     default_week = next((week[0] for week in weeks if week[0] == current_week_str), weeks[0][0])
 
-    if request.method == 'GET':
+    if request.method == 'GET' and not paging:
         form.year.process_data(str(current_year))
         form.month.process_data(str(current_month))
         form.week.process_data(default_week)
 
     total_weight = 0
     total_amount = 0
+    record_count = 0
     production_records = []
+    next_cursor = None
+    filter_args = None
 
-    if form.validate_on_submit():
+    submitted = form.validate() if paging else form.validate_on_submit()
+    if submitted:
         selected_date = form.date.data
         filter_by = form.filter_by.data
-        selected_year = form.year.data
-        selected_month = form.month.data
-        selected_week = form.week.data
 
         # Prevent future dates
         if selected_date > datetime.today().date():
             flash("Future dates are not allowed!", "danger")
         else:
-            query = ProductionRecord.query
-
             try:
-                if filter_by == 'day' and selected_date is not None:
-                    production_records = query.filter_by(date=selected_date).all()
-                elif filter_by == 'week' and selected_week:
-                    start_of_week, end_of_week = selected_week.strip().split(" to ")
-                    start_of_week = datetime.strptime(start_of_week.strip(), '%Y-%m-%d').date()
-                    end_of_week = datetime.strptime(end_of_week.strip(), '%Y-%m-%d').date()
-                    production_records = query.filter(
-                        ProductionRecord.date >= start_of_week,
-                        ProductionRecord.date <= end_of_week
-                    ).all()
-                elif filter_by == 'month' and selected_month and selected_year:
-                    production_records = query.filter(
-                        db.extract('month', ProductionRecord.date) == int(selected_month),
-                        db.extract('year', ProductionRecord.date) == int(selected_year)
-                    ).all()
-                elif filter_by == 'year' and selected_year:
-                    production_records = query.filter(
-                        db.extract('year', ProductionRecord.date) == int(selected_year)
-                    ).all()
-                else:
-                    flash("Please select valid filtering criteria.", "danger")
+                date_range = production_filter_range(
+                    filter_by, selected_date, form.week.data,
+                    form.month.data, form.year.data)
+                cursor = None
+                if paging and request.args.get('cursor'):
+                    cursor = decode_cursor(request.args['cursor'],
+                                           ProductionRecord.date)
             except ValueError:
+                date_range = None
                 flash("Invalid date format. Please try again.", "danger")
+            else:
+                if date_range is None:
+                    flash("Please select valid filtering criteria.", "danger")
 
-            total_weight = sum(record.weight for record in production_records)
-            total_amount = sum(record.amount_paid for record in production_records)
+            if date_range is not None:
+                start, end = date_range
+                # Totals come from the daily totals table; only one page
+                # of weigh-ins is loaded, by the (farmer_id, date) index
+                total_weight, total_amount, record_count = production_totals(
+                    current_user.id, start, end)
+                # The table shows every record's employee name
+                query = ProductionRecord.query.options(
+                    joinedload(ProductionRecord.employee)
+                ).filter(
+                    ProductionRecord.farmer_id == current_user.id,
+                    ProductionRecord.date >= start,
+                    ProductionRecord.date < end
+                )
+                production_records, next_cursor = keyset_paginate(
+                    query, ProductionRecord.date, ProductionRecord.id,
+                    PRODUCTION_PAGE_SIZE, cursor)
+                filter_args = {
+                    'filter_by': filter_by,
+                    'date': selected_date.isoformat(),
+                    'week': form.week.data,
+                    'month': form.month.data,
+                    'year': form.year.data,
+                }
 
     return render_template(
         'farmer/view_production.html',
         form=form,
         total_weight=total_weight,
         total_amount=total_amount,
+        record_count=record_count,
         records=production_records,
+        next_cursor=next_cursor,
+        filter_args=filter_args,
+        first_page=not request.args.get('cursor'),
         datetime=datetime,
         mode='view',
         title='View Production'
@@ -434,9 +459,14 @@ def expenses():
 @farmer_bp.route('/employees/list', methods=['GET'])
 @login_required
 def list_employees():
-    """Lists all Employees with their job types"""
-    employees = Employee.query.order_by(Employee.name).all()
-    job_types = Labour.query.all()
+    """Lists the farmer's Employees with their job types"""
+    # Load each job type with its employee rather than once per row
+    employees = Employee.query.options(
+        joinedload(Employee.job_type)
+    ).filter_by(
+        farmer_id=current_user.id
+    ).order_by(Employee.name).all()
+    job_types = Labour.query.filter_by(farmer_id=current_user.id).all()
 
     return render_template(
         'farmer/employee_list.html',
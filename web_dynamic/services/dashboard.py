@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Figures shown on the farmer dashboard.
+
+All five figures come from one round trip. Expenses and production
+are each read once, over the year's half-open date range on the
+indexed date column, in a subquery that sums the year and, by
+conditional aggregation, the month; the two one-row subqueries are
+cross joined. The query is portable between SQLite and MySQL and uses
+the (farmer_id, date) indexes.
+
+The figures are cached per farmer in each worker. A transaction that
+writes a farmer's productions, expenses or inventory also bumps the
+farmer's row in dashboard_versions, and every cache hit checks that
+version (one primary key lookup), so a write made through any worker
+shows up on the next request.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from flask import current_app
+from sqlalchemy import and_, case, event, func, inspect, select, true
+from sqlalchemy.orm import Session
+from models import db
+from models.expense import Expense
+from models.dashboard_version import ALL_FARMERS, DashboardVersion
+from models.inventory import Inventory
+from models.production import ProductionRecord
+from models.production_daily_total import ProductionDailyTotal
+
+
+def period_bounds(today):
+    """
+    Return the half-open month and year ranges that contain today.
+
+    Returns:
+        tuple: month_start, next_month_start, year_start, next_year_start
+    """
+    month_start = today.replace(day=1)
+    if month_start.month == 12:
+        next_month_start = month_start.replace(year=month_start.year + 1,
+                                               month=1)
+    else:
+        next_month_start = month_start.replace(month=month_start.month + 1)
+    year_start = today.replace(month=1, day=1)
+    next_year_start = year_start.replace(year=year_start.year + 1)
+    return month_start, next_month_start, year_start, next_year_start
+
+
+def _month_and_year_sums(value, date_column, farmer_column, farmer_id,
+                         month_start, next_month_start, year_start,
+                         next_year_start):
+    """
+    Build a one-row subquery with the month and year sums of a column,
+    read in a single pass over the year's rows.
+    """
+    in_month = and_(date_column >= month_start,
+                    date_column < next_month_start)
+    return select(
+        func.coalesce(func.sum(case((in_month, value), else_=0)),
+                      0).label('month'),
+        func.coalesce(func.sum(value), 0).label('year'),
+    ).where(
+        farmer_column == farmer_id,
+        date_column >= year_start,
+        date_column < next_year_start
+    ).subquery()
+
+
+def dashboard_totals_query(farmer_id, today=None):
+    """Build the single statement behind the dashboard figures."""
+    bounds = period_bounds(today or date.today())
+    expenses = _month_and_year_sums(
+        Expense.amount, Expense.date, Expense.farmer_id, farmer_id, *bounds)
+    produced = _month_and_year_sums(
+        ProductionDailyTotal.total_weight, ProductionDailyTotal.date,
+        ProductionDailyTotal.farmer_id, farmer_id, *bounds)
+    inventory_balance = select(
+        func.coalesce(func.sum(Inventory.quantity), 0)
+    ).where(Inventory.farmer_id == farmer_id).scalar_subquery()
+
+    # Each subquery is a single aggregate row, so the cross join is too
+    return select(
+        expenses.c.month.label('total_expenses'),
+        expenses.c.year.label('total_expenses_year'),
+        produced.c.month.label('total_tea_produced'),
+        produced.c.year.label('total_tea_produced_year'),
+        inventory_balance.label('total_inventory_balance'),
+    ).select_from(expenses.join(produced, true()))
+
+
+def get_dashboard_totals(farmer_id, today=None):
+    """
+    Compute the dashboard figures of a farmer in a single query.
+
+    Returns:
+        dict: total_expenses, total_expenses_year, total_tea_produced,
+        total_tea_produced_year and total_inventory_balance.
+    """
+    row = db.session.execute(
+        dashboard_totals_query(farmer_id, today)).one()
+    return dict(row._mapping)
+
+
+class DashboardCache:
+    """
+    Per-farmer cache of the dashboard figures.
+
+    Every farmer has a version number that is bumped after a commit
+    that wrote one of their productions, expenses or inventories;
+    entries computed under an older version are treated as misses.
+    The cache lives in the worker process; writes made through another
+    worker are caught by passing the farmer's shared version to get.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def _version(self, farmer_id, shared):
+        """Return the current version of a farmer's figures."""
+        return (self._generation, self._versions.get(farmer_id, 0), shared)
+
+    def get(self, farmer_id, compute, ttl, max_entries, shared=None):
+        """
+        Return the cached figures of a farmer, computing them on a miss.
+
+        Args:
+            farmer_id (str): The farmer whose figures are wanted.
+            compute (callable): Computes the figures from the database.
+            ttl (float): Seconds an entry may be served for.
+            max_entries (int): Entries kept before the least recently
+                used one is dropped.
+            shared: The farmer's version as every worker sees it; an
+                entry computed under another one is a miss.
+        """
+        with self._lock:
+            version = self._version(farmer_id, shared)
+            entry = self._entries.get(farmer_id)
+            if entry is not None and entry[0] == version and \
+                    entry[1] > self._clock():
+                self._entries.move_to_end(farmer_id)
+                self.hits += 1
+                return dict(entry[2])
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            # A write committed while computing makes the value stale
+            if self._version(farmer_id, shared) == version:
+                self._entries[farmer_id] = (version, self._clock() + ttl,
+                                            value)
+                self._entries.move_to_end(farmer_id)
+                while len(self._entries) > max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return dict(value)
+
+    def invalidate(self, farmer_ids=None):
+        """
+        Bump the version of some farmers, or of everyone when
+        farmer_ids is None.
+        """
+        with self._lock:
+            if farmer_ids is None:
+                self._generation += 1
+                self._entries.clear()
+                self.invalidations += 1
+                return
+            for farmer_id in farmer_ids:
+                self._versions[farmer_id] = \
+                    self._versions.get(farmer_id, 0) + 1
+                self._entries.pop(farmer_id, None)
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._generation += 1
+            self.hits = self.misses = 0
+            self.invalidations = self.evictions = 0
+
+    def stats(self):
+        """Return the hit, miss and size counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'invalidations': self.invalidations,
+                'evictions': self.evictions,
+                'entries': len(self._entries)
+            }
+
+
+dashboard_cache = DashboardCache()
+
+# Default seconds an entry is served for and entries kept per worker
+DEFAULT_CACHE_TTL = 300
+DEFAULT_CACHE_SIZE = 10000
+
+
+def get_cached_dashboard_totals(farmer_id):
+    """
+    Return the dashboard figures of a farmer from the cache, computing
+    them with get_dashboard_totals on a miss or after the farmer's shared
+    version has moved on.
+    """
+    return dashboard_cache.get(
+        farmer_id,
+        lambda: get_dashboard_totals(farmer_id),
+        ttl=current_app.config.get('DASHBOARD_CACHE_TTL', DEFAULT_CACHE_TTL),
+        max_entries=current_app.config.get('DASHBOARD_CACHE_SIZE',
+                                           DEFAULT_CACHE_SIZE),
+        shared=DashboardVersion.current(db.session, farmer_id))
+
+
+# Models whose writes change the dashboard figures
+_DASHBOARD_MODELS = (Expense, Inventory, ProductionRecord)
+
+
+def _pending(session):
+    """Farmers written to in the current transaction of a session."""
+    return session.info.setdefault('dashboard_farmer_ids', set())
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_flushed_farmers(session, flush_context, instances):
+    """Remember the farmers whose dashboard rows were flushed."""
+    for instance in list(session.new) + list(session.dirty) + \
+            list(session.deleted):
+        if isinstance(instance, _DASHBOARD_MODELS):
+            history = inspect(instance).attrs.farmer_id.history
+            _pending(session).update(
+                farmer_id for farmer_id in
+                [instance.farmer_id, *history.deleted] if farmer_id)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_executed_farmers(orm_execute_state):
+    """Remember the farmers of bulk statements that skip the flush."""
+    is_dml = orm_execute_state.is_insert or orm_execute_state.is_update or \
+        orm_execute_state.is_delete
+    mapper = orm_execute_state.bind_mapper
+    if not is_dml or mapper is None or \
+            not issubclass(mapper.class_, _DASHBOARD_MODELS):
+        return
+    parameters = orm_execute_state.parameters
+    if isinstance(parameters, dict):
+        parameters = [parameters]
+    farmer_ids = {row.get('farmer_id') for row in parameters or ()}
+    if orm_execute_state.is_insert and None not in farmer_ids:
+        _pending(orm_execute_state.session).update(farmer_ids)
+    else:
+        _pending(orm_execute_state.session).add(ALL_FARMERS)
+
+
+@event.listens_for(Session, 'before_commit')
+def _bump_shared_versions(session):
+    """
+    Bump the shared version of every farmer written to, in the same
+    transaction as the writes.
+    """
+    # Writes still pending are only collected when they are flushed
+    session.flush()
+    farmer_ids = session.info.get('dashboard_farmer_ids')
+    if not farmer_ids:
+        return
+    DashboardVersion.bump(session, [ALL_FARMERS] if ALL_FARMERS in farmer_ids
+                          else farmer_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_farmers(session):
+    """Bump the cached figures of every farmer written to."""
+    farmer_ids = session.info.pop('dashboard_farmer_ids', None)
+    if not farmer_ids:
+        return
+    if ALL_FARMERS in farmer_ids:
+        dashboard_cache.invalidate()
+    else:
+        dashboard_cache.invalidate(farmer_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back_farmers(session):
+    """Nothing was written, so nothing needs invalidating."""
+    session.info.pop('dashboard_farmer_ids', None)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Loading the logged in user for Flask-Login.
+
+Session identities name the principal type, as in "farmer:<id>" or
+"employee:<id>" (see get_id on both models), so a request costs one
+primary-key lookup instead of trying both tables. Sessions issued
+before identities were prefixed still hold a bare id; those fall back
+to looking in both tables until the user signs in again.
+
+Loaded users are also kept in a short-TTL per-worker cache, so most
+requests cost no query at all. An entry is dropped when a transaction
+that changes or deletes that farmer or employee commits, e.g. a
+profile edit or a new password. Changes made through another worker
+show up once the entry's TTL runs out.
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from models import db
+from models.employee import Employee
+from models.farmer import Farmer
+
+PRINCIPALS = {
+    'farmer': Farmer,
+    'employee': Employee,
+}
+
+# Default seconds a user is served from the cache and entries kept
+DEFAULT_IDENTITY_TTL = 60
+DEFAULT_IDENTITY_CACHE_SIZE = 10000
+
+
+def parse_identity(user_id):
+    """
+    Split a session identity into the principal type and the id.
+
+    Returns:
+        tuple: The type and the id, or None for a legacy bare id.
+    """
+    kind, separator, principal_id = (user_id or '').partition(':')
+    if not separator or kind not in PRINCIPALS or not principal_id:
+        return None
+    return kind, principal_id
+
+
+class IdentityCache:
+    """
+    Per-worker cache of loaded users, keyed by (type, id).
+
+    Entries are pickled snapshots of the row, so a cached user is never
+    shared between sessions or threads; every hit is merged into the
+    current session without a query. Each key has a version number
+    bumped on invalidation, so a load that raced with a committed
+    change is not stored.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _version(self, key):
+        return (self._generation, self._versions.get(key, 0))
+
+    def get(self, key, load, ttl, max_entries):
+        """
+        Return the cached snapshot of a user, loading it on a miss.
+
+        Args:
+            key (tuple): The principal type and id.
+            load (callable): Returns the pickled user, or None if there
+                is no such user. Missing users are not cached.
+            ttl (float): Seconds an entry may be served for.
+            max_entries (int): Entries kept before the least recently
+                used one is dropped.
+        """
+        with self._lock:
+            version = self._version(key)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version and \
+                    entry[1] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        value = load()
+
+        with self._lock:
+            if value is not None and self._version(key) == version:
+                self._entries[key] = (version, self._clock() + ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, keys=None):
+        """Drop some users, or every user when keys is None."""
+        with self._lock:
+            if keys is None:
+                self._generation += 1
+                self._entries.clear()
+                return
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._generation += 1
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """Return the hit, miss and size counters."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': len(self._entries)}
+
+
+identity_cache = IdentityCache()
+
+
+def _snapshot(model, principal_id):
+    """Load a user and return it pickled, or None if it does not exist."""
+    user = db.session.get(model, principal_id)
+    return pickle.dumps(user) if user is not None else None
+
+
+def load_principal(user_id):
+    """
+    Return the farmer or employee a session identity refers to.
+
+    Args:
+        user_id (str): The identity stored by Flask-Login.
+
+    Returns:
+        Farmer or Employee: The user, attached to the current session,
+        or None if it does not exist.
+    """
+    parsed = parse_identity(user_id)
+    if parsed is None:
+        # Sessions from before identities named the principal type
+        return db.session.get(Employee, user_id) or \
+            db.session.get(Farmer, user_id)
+
+    kind, principal_id = parsed
+    snapshot = identity_cache.get(
+        parsed,
+        lambda: _snapshot(PRINCIPALS[kind], principal_id),
+        ttl=current_app.config.get('IDENTITY_CACHE_TTL',
+                                   DEFAULT_IDENTITY_TTL),
+        max_entries=current_app.config.get('IDENTITY_CACHE_SIZE',
+                                           DEFAULT_IDENTITY_CACHE_SIZE))
+    if snapshot is None:
+        return None
+    # Attach the snapshot without going back to the database
+    return db.session.merge(pickle.loads(snapshot), load=False)
+
+
+# Marks a write whose users are unknown, e.g. a bulk UPDATE
+_ALL_USERS = object()
+_KINDS = {model: kind for kind, model in PRINCIPALS.items()}
+
+
+def _pending(session):
+    """Users changed in the current transaction of a session."""
+    return session.info.setdefault('identity_keys', set())
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_flushed_users(session, flush_context, instances):
+    """Remember the farmers and employees changed or deleted."""
+    for instance in list(session.dirty) + list(session.deleted):
+        kind = _KINDS.get(type(instance))
+        identity = inspect(instance).identity
+        if kind is not None and identity is not None:
+            _pending(session).add((kind, identity[0]))
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_executed_users(orm_execute_state):
+    """Bulk updates and deletes skip the flush; drop every user."""
+    mapper = orm_execute_state.bind_mapper
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and \
+            mapper is not None and mapper.class_ in _KINDS:
+        _pending(orm_execute_state.session).add(_ALL_USERS)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_users(session):
+    """Drop the cached copies of the users written to."""
+    keys = session.info.pop('identity_keys', None)
+    if not keys:
+        return
+    if _ALL_USERS in keys:
+        identity_cache.invalidate()
+    else:
+        identity_cache.invalidate(keys)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back_users(session):
+    """Nothing was written, so nothing needs invalidating."""
+    session.info.pop('identity_keys', None)
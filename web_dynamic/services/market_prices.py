@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Market prices in effect on any day.
+
+The whole price history is small (one row a day), so each worker keeps
+a sorted copy of it as two lists: day ordinals and prices per kg. The
+price in effect on a day is the last one set on or before it, found by
+binary search.
+
+The copy is reloaded, with one query, after a transaction that writes
+to market_values commits. Prices written through another worker show
+up once the copy's TTL runs out.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from models import db
+from models.market_value import MarketValue
+
+# Default seconds a worker serves its copy of the price history for
+DEFAULT_PRICE_TTL = 300
+
+
+class PriceIndex:
+    """
+    A price history, sorted by day. Where a day has several prices,
+    the last one written wins.
+    """
+
+    def __init__(self, days, prices):
+        self.days = list(days)
+        self.prices = list(prices)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build the index from (date, price_per_kg) rows in date order."""
+        rows = list(rows)
+        return cls([day.toordinal() for day, _ in rows],
+                   [price for _, price in rows])
+
+    def __len__(self):
+        return len(self.days)
+
+    def price_on(self, day):
+        """
+        Return the price in effect on a day, or None before the first
+        price was set.
+        """
+        position = bisect_right(self.days, day.toordinal()) - 1
+        return self.prices[position] if position >= 0 else None
+
+    def latest(self):
+        """Return the most recent price, or None if there is none."""
+        return self.prices[-1] if self.prices else None
+
+
+class PriceHistory:
+    """
+    Per-worker copy of the price index.
+
+    A version number is bumped when a write to market_values commits;
+    a copy loaded under an older version, or older than its TTL, is
+    loaded again.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._version = 0
+        self._entry = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, load, ttl):
+        """
+        Return the price index, loading it on a miss.
+
+        Args:
+            load (callable): Returns a fresh PriceIndex.
+            ttl (float): Seconds a loaded index may be served for.
+        """
+        with self._lock:
+            version = self._version
+            entry = self._entry
+            if entry is not None and entry[0] == version and \
+                    entry[1] > self._clock():
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        index = load()
+
+        with self._lock:
+            # A price committed while loading makes the index stale
+            if self._version == version:
+                self._entry = (version, self._clock() + ttl, index)
+        return index
+
+    def invalidate(self):
+        """Reload the index on its next use."""
+        with self._lock:
+            self._version += 1
+            self._entry = None
+
+    def clear(self):
+        """Drop the index and reset the counters."""
+        with self._lock:
+            self._version += 1
+            self._entry = None
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """Return the hit, miss and size counters."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': len(self._entry[2]) if self._entry else 0}
+
+
+price_history = PriceHistory()
+
+
+def load_price_index():
+    """Read the whole price history in one query."""
+    return PriceIndex.from_rows(db.session.execute(
+        select(MarketValue.date, MarketValue.price_per_kg)
+        .order_by(MarketValue.date, MarketValue.created_at)))
+
+
+def get_price_index():
+    """Return this worker's copy of the price index."""
+    return price_history.get(
+        load_price_index,
+        ttl=current_app.config.get('MARKET_PRICE_CACHE_TTL',
+                                   DEFAULT_PRICE_TTL))
+
+
+def latest_price():
+    """Return the most recent market price per kg, or None."""
+    return get_price_index().latest()
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_flushed_prices(session, flush_context, instances):
+    """Remember that a price was added, changed or removed."""
+    for instance in list(session.new) + list(session.dirty) + \
+            list(session.deleted):
+        if isinstance(instance, MarketValue):
+            session.info['market_prices_written'] = True
+            return
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_executed_prices(orm_execute_state):
+    """Bulk statements skip the flush; look at their target table."""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or
+            orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    table = getattr(orm_execute_state.statement, 'table', None)
+    if (mapper is not None and mapper.class_ is MarketValue) or \
+            table is MarketValue.__table__:
+        orm_execute_state.session.info['market_prices_written'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_prices(session):
+    """Reload the index once the new prices are visible."""
+    if session.info.pop('market_prices_written', False):
+        price_history.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back_prices(session):
+    """Nothing was written, so nothing needs invalidating."""
+    session.info.pop('market_prices_written', None)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Payroll register for a pay period.
+
+What a plucker earns is the sum of weight × rate over their weigh-ins,
+which the daily totals table already holds per employee and day. One
+GROUP BY over the period's daily rows gives each employee's gross pay,
+kilograms, days worked and weigh-ins; the deductions and net pay are
+then worked out for every employee at once on NumPy arrays. A month
+for thousands of pluckers comes back as one row per plucker instead of
+one per weigh-in.
+
+NumPy is imported on the first payroll request rather than when a
+worker boots.
+"""
+
+from sqlalchemy import func, select
+from models import db
+from models.employee import Employee
+from models.production_daily_total import ProductionDailyTotal
+from web_dynamic.services.payroll_config import LEADING_COLUMNS,\
+    TRAILING_COLUMNS, parse_deductions
+
+# Columns summed over all employees
+TOTAL_COLUMNS = ('days', 'weigh_ins', 'weight', 'gross_pay', 'deductions',
+                 'net_pay')
+
+
+def payroll_query(farmer_id, start, end):
+    """
+    Build the per-employee earnings over the half-open range
+    [start, end), in employee name order.
+    """
+    return select(
+        Employee.id.label('employee_id'),
+        Employee.name.label('employee'),
+        Employee.phone_number,
+        func.count().label('days'),
+        func.sum(ProductionDailyTotal.record_count).label('weigh_ins'),
+        func.sum(ProductionDailyTotal.total_weight).label('weight'),
+        func.sum(ProductionDailyTotal.total_amount).label('gross_pay'),
+    ).join(
+        Employee, Employee.id == ProductionDailyTotal.employee_id
+    ).where(
+        ProductionDailyTotal.farmer_id == farmer_id,
+        ProductionDailyTotal.date >= start,
+        ProductionDailyTotal.date < end,
+        ProductionDailyTotal.record_count > 0
+    ).group_by(
+        Employee.id, Employee.name, Employee.phone_number
+    ).order_by(
+        Employee.name, Employee.id
+    )
+
+
+def apply_deductions(gross, deductions):
+    """
+    Work out every employee's deductions and net pay.
+
+    Args:
+        gross (numpy.ndarray): Gross pay per employee.
+        deductions (dict): Fraction of gross pay taken per deduction.
+
+    Returns:
+        dict: An array per deduction, the total deducted and the net
+        pay, each rounded to the cent.
+    """
+    import numpy as np
+
+    fractions = np.fromiter(deductions.values(), dtype=np.float64,
+                            count=len(deductions))
+    taken = np.round(np.outer(gross, fractions), 2)
+    figures = {name: taken[:, index]
+               for index, name in enumerate(deductions)}
+    figures['deductions'] = np.round(taken.sum(axis=1), 2)
+    figures['net_pay'] = np.round(gross - figures['deductions'], 2)
+    return figures
+
+
+def build_payroll(farmer_id, start, end, deductions=None):
+    """
+    Build a farmer's payroll register as a compact columnar series.
+
+    Args:
+        farmer_id (str): The farmer whose employees are paid.
+        start (date): The first day of the pay period.
+        end (date): The day after the last day of the pay period.
+        deductions (dict): Fraction of gross pay taken per deduction.
+
+    Returns:
+        dict: The column names, one list of values per employee in
+        name order, the totals and the deductions applied.
+    """
+    import numpy as np
+
+    deductions = parse_deductions(deductions or {})
+    rows = db.session.execute(payroll_query(farmer_id, start, end)).all()
+
+    # One array per column of the query
+    register = {name: np.array(values) for name, values in zip(
+        LEADING_COLUMNS, zip(*rows) if rows else [()] * len(LEADING_COLUMNS))}
+    for name in ('days', 'weigh_ins'):
+        register[name] = register[name].astype(np.int64)
+    for name in ('weight', 'gross_pay'):
+        # MySQL returns DECIMAL for sums of floats
+        register[name] = np.round(register[name].astype(np.float64), 2)
+    register.update(apply_deductions(register['gross_pay'], deductions))
+
+    columns = list(LEADING_COLUMNS) + list(deductions) + \
+        list(TRAILING_COLUMNS)
+    totals = {name: register[name].sum().round(2).item()
+              for name in TOTAL_COLUMNS}
+    return {
+        'columns': columns,
+        'rows': [list(row) for row in zip(
+            *(register[name].tolist() for name in columns))],
+        'totals': totals,
+        'deductions': deductions,
+    }
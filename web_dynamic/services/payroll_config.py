@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Payroll deduction settings.
+
+create_app parses the deductions when a worker boots, so this module
+stays free of NumPy; the register itself is built in payroll.py.
+"""
+
+# Columns of the register, before and after the deductions
+LEADING_COLUMNS = ('employee_id', 'employee', 'phone_number', 'days',
+                   'weigh_ins', 'weight', 'gross_pay')
+TRAILING_COLUMNS = ('deductions', 'net_pay')
+
+
+def parse_deductions(value):
+    """
+    Parse deductions given as comma separated name=fraction pairs, or
+    check a mapping of them.
+
+    Returns:
+        dict: The fraction of gross pay taken for each deduction.
+
+    Raises:
+        ValueError: If a pair is malformed, a fraction is not between
+        0 and 1, or a name is already a column of the register.
+    """
+    if isinstance(value, dict):
+        pairs = value.items()
+    else:
+        pairs = []
+        for pair in filter(None, (part.strip() for part in
+                                  (value or '').split(','))):
+            name, sep, fraction = pair.partition('=')
+            if not sep:
+                raise ValueError(
+                    f"Deductions must be name=fraction pairs, got '{pair}'")
+            pairs.append((name.strip(), fraction))
+
+    deductions = {}
+    reserved = set(LEADING_COLUMNS) | set(TRAILING_COLUMNS)
+    for name, given in pairs:
+        try:
+            fraction = float(given)
+        except (TypeError, ValueError):
+            fraction = None
+        if not name or fraction is None or not 0 <= fraction <= 1:
+            raise ValueError(
+                f"Deductions must be name=fraction pairs with a fraction "
+                f"between 0 and 1, got '{name}={given}'")
+        if name in reserved:
+            raise ValueError(
+                f"'{name}' is a column of the payroll register and "
+                f"cannot name a deduction")
+        deductions[name] = fraction
+    return deductions
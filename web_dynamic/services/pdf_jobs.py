@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Background PDF rendering with a content-addressed cache.
+
+WeasyPrint takes seconds of CPU for a month of data, so reports are
+rendered in a process pool instead of on the request thread. A job is
+identified by the SHA-256 of the template name and the rendered HTML,
+which is a pure function of (template, report data): submitting the
+same report twice returns the same job, and a finished PDF is served
+from disk without rendering again.
+
+Job state lives next to the PDFs in a per-farmer directory, so every
+worker process can answer a poll:
+
+    <job_id>.pdf      the finished report
+    <job_id>.pending  rendering has been queued
+    <job_id>.error    rendering failed; holds the message
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from flask import current_app
+from web_dynamic.utils.metrics import PDF_RENDER_DURATION
+from web_dynamic.utils.request_timing import span
+
+# Default number of rendering processes per worker; 0 renders inline
+DEFAULT_RENDER_WORKERS = 2
+# Seconds after which a job still pending is considered lost
+DEFAULT_JOB_TIMEOUT = 600
+
+_JOB_ID = re.compile(r'^[0-9a-f]{64}$')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def job_key(template_name, html):
+    """Return the content address of a rendered report."""
+    digest = hashlib.sha256()
+    digest.update(template_name.encode())
+    digest.update(b'\0')
+    digest.update(html.encode())
+    return digest.hexdigest()
+
+
+def render_pdf(html, path):
+    """
+    Render HTML to a PDF file. Runs in a pool process.
+
+    The PDF is written to a temporary file first and moved into place,
+    so readers never see a partial file.
+    """
+    from weasyprint import HTML
+
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            HTML(string=html).write_pdf(tmp_file)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+def _timed_render(html, path):
+    """Render a PDF and return how many seconds it took."""
+    started = time.perf_counter()
+    render_pdf(html, path)
+    return time.perf_counter() - started
+
+
+def _cache_root():
+    """Return the directory holding every farmer's PDFs."""
+    return current_app.config.get('PDF_CACHE_DIR') or os.path.join(
+        current_app.instance_path, 'pdf_cache')
+
+
+def _cache_dir(farmer_id):
+    """
+    Return the PDF directory of a farmer. It is created by submit_job;
+    lookups treat a missing directory as a job that does not exist.
+    """
+    return os.path.join(_cache_root(), farmer_id)
+
+
+def _paths(farmer_id, job_id):
+    """Return the pdf, pending and error paths of a job."""
+    base = os.path.join(_cache_dir(farmer_id), job_id)
+    return base + '.pdf', base + '.pending', base + '.error'
+
+
+def _get_executor():
+    """
+    Return this process's rendering pool, creating it on first use so
+    that it is never inherited across a fork.
+    """
+    global _executor
+    workers = current_app.config.get('PDF_RENDER_WORKERS',
+                                      DEFAULT_RENDER_WORKERS)
+    if workers <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            # Importing the pool pulls in multiprocessing; do it on demand
+            from concurrent.futures import ProcessPoolExecutor
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        return _executor
+
+
+def _submit(html, pdf_path):
+    """Queue a render, or run it inline when the pool is disabled."""
+    executor = _get_executor()
+    if executor is not None:
+        return executor.submit(_timed_render, html, pdf_path)
+    future = Future()
+    try:
+        future.set_result(_timed_render(html, pdf_path))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def _finish(pending_path, error_path):
+    """Build the callback that records how a render ended."""
+    def callback(future):
+        error = future.exception()
+        if error is not None:
+            with open(error_path, 'w') as error_file:
+                error_file.write(f"{type(error).__name__}: {error}")
+        else:
+            PDF_RENDER_DURATION.observe(future.result())
+        try:
+            os.unlink(pending_path)
+        except FileNotFoundError:
+            pass
+    return callback
+
+
+def job_status(farmer_id, job_id):
+    """
+    Return the state of a job, or None if it is unknown.
+
+    Returns:
+        dict: The job id, its status (pending, done or failed) and the
+        error message of a failed job.
+    """
+    if not _JOB_ID.match(job_id or ''):
+        return None
+    pdf_path, pending_path, error_path = _paths(farmer_id, job_id)
+    if os.path.exists(pdf_path):
+        return {'job_id': job_id, 'status': 'done'}
+    if os.path.exists(error_path):
+        with open(error_path) as error_file:
+            return {'job_id': job_id, 'status': 'failed',
+                    'error': error_file.read()}
+    try:
+        queued_at = os.path.getmtime(pending_path)
+    except FileNotFoundError:
+        return None
+    timeout = current_app.config.get('PDF_JOB_TIMEOUT', DEFAULT_JOB_TIMEOUT)
+    if time.time() - queued_at > timeout:
+        return {'job_id': job_id, 'status': 'failed',
+                'error': 'Rendering did not finish in time'}
+    return {'job_id': job_id, 'status': 'pending'}
+
+
+def submit_job(farmer_id, template_name, html):
+    """
+    Queue a report for rendering unless it is cached or already queued.
+
+    Returns:
+        dict: The job status, as returned by job_status.
+    """
+    job_id = job_key(template_name, html)
+    status = job_status(farmer_id, job_id)
+    # Failed and lost jobs are queued again
+    if status is not None and status['status'] != 'failed':
+        return status
+
+    os.makedirs(_cache_dir(farmer_id), exist_ok=True)
+    pdf_path, pending_path, error_path = _paths(farmer_id, job_id)
+    for stale_path in (error_path, pending_path):
+        try:
+            os.unlink(stale_path)
+        except FileNotFoundError:
+            pass
+    open(pending_path, 'w').close()
+
+    with span('pdf'):
+        future = _submit(html, pdf_path)
+    future.add_done_callback(_finish(pending_path, error_path))
+    return job_status(farmer_id, job_id)
+
+
+def job_pdf_path(farmer_id, job_id):
+    """Return the path of a finished PDF, or None if it is not ready."""
+    if not _JOB_ID.match(job_id or ''):
+        return None
+    pdf_path = _paths(farmer_id, job_id)[0]
+    return pdf_path if os.path.exists(pdf_path) else None
+
+
+def prune_cache(max_age):
+    """
+    Delete cached PDFs and job files older than max_age seconds.
+
+    Returns:
+        int: The number of files removed.
+    """
+    cutoff = time.time() - max_age
+    removed = 0
+    for directory, _, names in os.walk(_cache_root()):
+        for name in names:
+            path = os.path.join(directory, name)
+            if os.path.getmtime(path) < cutoff:
+                os.unlink(path)
+                removed += 1
+    return removed
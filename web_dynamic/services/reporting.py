@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Bucketed production and expense reports.
+
+A report covers an arbitrary date range and groups it by day, ISO
+week, month or tea season. The grouping runs in the database as a
+single GROUP BY, so a year of weigh-ins comes back as one compact
+series of rows instead of one dict per record. Production is read from
+the daily totals table.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from sqlalchemy import case, cast, func, select
+from models import db
+from models.employee import Employee
+from models.expense import Expense
+from models.labour import Labour
+from models.production_daily_total import ProductionDailyTotal
+
+REPORT_TYPES = ('production', 'expenses')
+GRANULARITIES = ('day', 'week', 'month', 'season')
+
+# Tea seasons, keyed by the month they start in. A season's bucket is
+# the first day of its starting month.
+SEASONS = {
+    1: 'dry',
+    3: 'long rains',
+    6: 'cool dry',
+    10: 'short rains',
+}
+
+# Longest range a report may cover
+MAX_REPORT_DAYS = 3 * 366
+
+
+def _season_start_month(month):
+    """SQL CASE mapping a month number to the month its season starts."""
+    starts = sorted(SEASONS)
+    whens = []
+    for index, start in enumerate(starts):
+        end = starts[index + 1] if index + 1 < len(starts) else 13
+        whens.append((month < end, start))
+    return case(*whens)
+
+
+def bucket_expression(date_column, granularity, dialect_name):
+    """
+    Build the expression naming the bucket a date falls in, as the
+    ISO date of the bucket's first day.
+
+    Raises:
+        ValueError: If the granularity is unknown.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(
+            f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+    if dialect_name == 'sqlite':
+        if granularity == 'day':
+            return func.date(date_column)
+        if granularity == 'week':
+            # Forward to Sunday, then back to that week's Monday
+            return func.date(date_column, 'weekday 0', '-6 days')
+        if granularity == 'month':
+            return func.date(date_column, 'start of month')
+        month = cast(func.strftime('%m', date_column), db.Integer)
+        return func.printf('%s-%02d-01', func.strftime('%Y', date_column),
+                           _season_start_month(month))
+
+    if granularity == 'day':
+        return func.date_format(date_column, '%Y-%m-%d')
+    if granularity == 'week':
+        # WEEKDAY() counts from Monday = 0
+        return func.date_format(
+            func.subdate(date_column, func.weekday(date_column)), '%Y-%m-%d')
+    if granularity == 'month':
+        return func.date_format(date_column, '%Y-%m-01')
+    return func.concat(
+        func.year(date_column), '-',
+        func.lpad(_season_start_month(func.month(date_column)), 2, '0'),
+        '-01')
+
+
+def bucket_label(bucket, granularity):
+    """Return a human readable name for a bucket's ISO start date."""
+    start = date.fromisoformat(bucket)
+    if granularity == 'week':
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == 'month':
+        return start.strftime('%Y-%m')
+    if granularity == 'season':
+        return f"{start.year} {SEASONS[start.month]}"
+    return bucket
+
+
+def parse_report_range(start, end):
+    """
+    Parse the inclusive start and end dates of a report.
+
+    Returns:
+        tuple: The start date and the exclusive end date.
+
+    Raises:
+        ValueError: If a date is malformed or the range is invalid.
+    """
+    try:
+        start = date.fromisoformat(start)
+        end = date.fromisoformat(end)
+    except (TypeError, ValueError):
+        raise ValueError("start and end must be dates in YYYY-MM-DD format")
+    if end < start:
+        raise ValueError("end must not be before start")
+    if (end - start).days >= MAX_REPORT_DAYS:
+        raise ValueError(f"A report may cover at most {MAX_REPORT_DAYS} days")
+    return start, end + timedelta(days=1)
+
+
+def production_report_query(farmer_id, start, end, granularity,
+                            dialect_name):
+    """
+    Build the production report: weight, pay and weigh-ins per bucket,
+    employee and labour type, over the half-open range [start, end).
+    """
+    bucket = bucket_expression(ProductionDailyTotal.date, granularity,
+                               dialect_name).label('bucket')
+    weight = func.sum(ProductionDailyTotal.total_weight)
+    records = cast(func.sum(ProductionDailyTotal.record_count), db.Integer)
+    return select(
+        bucket,
+        Employee.id.label('employee_id'),
+        Employee.name.label('employee'),
+        Labour.type.label('labour_type'),
+        weight.label('weight'),
+        func.sum(ProductionDailyTotal.total_amount).label('amount_paid'),
+        records.label('records'),
+        (weight / records).label('avg_weight'),
+    ).join(
+        Employee, Employee.id == ProductionDailyTotal.employee_id
+    ).outerjoin(
+        Labour, Labour.id == Employee.labour_id
+    ).where(
+        ProductionDailyTotal.farmer_id == farmer_id,
+        ProductionDailyTotal.date >= start,
+        ProductionDailyTotal.date < end
+    ).group_by(
+        bucket, Employee.id, Employee.name, Labour.type
+    ).order_by(
+        bucket, Employee.name
+    )
+
+
+def expense_report_query(farmer_id, start, end, granularity, dialect_name):
+    """
+    Build the expense report: total, count and average amount per
+    bucket and category, over the half-open range [start, end).
+    """
+    bucket = bucket_expression(Expense.date, granularity,
+                               dialect_name).label('bucket')
+    return select(
+        bucket,
+        Labour.type.label('category'),
+        func.sum(Expense.amount).label('amount'),
+        func.count(Expense.id).label('records'),
+        func.avg(Expense.amount).label('avg_amount'),
+    ).outerjoin(
+        Labour, Labour.id == Expense.category_id
+    ).where(
+        Expense.farmer_id == farmer_id,
+        Expense.date >= start,
+        Expense.date < end
+    ).group_by(
+        bucket, Labour.type
+    ).order_by(
+        bucket, Labour.type
+    )
+
+
+def production_totals(farmer_id, start, end):
+    """
+    Sum a farmer's production over the half-open range [start, end)
+    from the daily totals, without loading any weigh-in.
+
+    Returns:
+        tuple: The total weight, the amount paid and the number of
+        weigh-ins.
+    """
+    weight, amount, records = db.session.execute(select(
+        func.sum(ProductionDailyTotal.total_weight),
+        func.sum(ProductionDailyTotal.total_amount),
+        func.sum(ProductionDailyTotal.record_count),
+    ).where(
+        ProductionDailyTotal.farmer_id == farmer_id,
+        ProductionDailyTotal.date >= start,
+        ProductionDailyTotal.date < end
+    )).one()
+    return weight or 0, amount or 0, int(records or 0)
+
+
+REPORT_QUERIES = {
+    'production': production_report_query,
+    'expenses': expense_report_query,
+}
+
+# Columns summed over the whole range of each report
+TOTAL_COLUMNS = {
+    'production': ('weight', 'amount_paid', 'records'),
+    'expenses': ('amount', 'records'),
+}
+
+
+def build_report(report_type, farmer_id, start, end, granularity):
+    """
+    Run a report and return it as a compact columnar series.
+
+    Args:
+        report_type (str): 'production' or 'expenses'.
+        farmer_id (str): The farmer the report is for.
+        start (date): The first day covered.
+        end (date): The day after the last day covered.
+        granularity (str): 'day', 'week', 'month' or 'season'.
+
+    Returns:
+        dict: The column names, one list of values per row and the
+        totals over the whole range.
+
+    Raises:
+        ValueError: If the report type or granularity is unknown.
+    """
+    if report_type not in REPORT_QUERIES:
+        raise ValueError(
+            f"report_type must be one of {', '.join(REPORT_TYPES)}")
+    dialect_name = db.session.get_bind().dialect.name
+    statement = REPORT_QUERIES[report_type](
+        farmer_id, start, end, granularity, dialect_name)
+
+    result = db.session.execute(statement)
+    columns = list(result.keys())
+    # MySQL returns DECIMAL for averages and sums of floats
+    rows = [[float(value) if isinstance(value, Decimal) else value
+             for value in row] for row in result]
+
+    totals = {}
+    for name in TOTAL_COLUMNS[report_type]:
+        index = columns.index(name)
+        totals[name] = sum(row[index] for row in rows)
+
+    return {
+        'columns': columns,
+        'rows': rows,
+        'buckets': {row[0]: bucket_label(row[0], granularity)
+                    for row in rows},
+        'totals': totals,
+    }
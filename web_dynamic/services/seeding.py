@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Synthetic farm data for load tests and benchmarks.
+
+seed_farms generates farmers, their labour types, seasonal pluckers and
+other workers, a weigh-in per plucker per working day, weekly wages and
+input purchases as expenses, inventory and daily market prices. The
+data is a pure function of the seed and the last day covered, so two
+runs with the same arguments produce the same rows, ids included.
+
+Yields follow the two Kenyan flushes: a weigh-in is heaviest in the
+long rains (around May) and the short rains (around November) and
+lightest in the dry and cool dry seasons. Market prices move the other
+way, with a random walk on top.
+
+Rows are written with executemany Core inserts in batches, one commit
+per batch, instead of through the ORM unit of work; the daily
+production totals are rebuilt in SQL once the weigh-ins are in.
+
+Every seeded farmer signs in with email "farmer<n>@seed.teafarm.test"
+and the password given (SEED_PASSWORD by default).
+"""
+
+import math
+import random
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import select
+from werkzeug.security import generate_password_hash
+from models import db
+from models.employee import Employee
+from models.expense import Expense
+from models.farmer import Farmer
+from models.inventory import Inventory
+from models.labour import Labour
+from models.market_value import MarketValue
+from models.production import ProductionRecord
+from models.production_daily_total import ProductionDailyTotal
+
+# Farmers, pluckers per farmer and days covered. Roughly 25 thousand,
+# 1 million and 10 million weigh-ins.
+SCALES = {
+    'small': {'farmers': 10, 'pluckers': 10, 'days': 365},
+    'medium': {'farmers': 100, 'pluckers': 20, 'days': 730},
+    'large': {'farmers': 500, 'pluckers': 42, 'days': 730},
+}
+
+SEED_PASSWORD = 'teafarm-seed'
+EMAIL_DOMAIN = 'seed.teafarm.test'
+
+# Labour types other than plucking: description, daily wage in KES
+# and workers per farmer
+DAY_LABOUR = {
+    'pruning': ('Pruning and skiffing', 450.0, 2),
+    'weeding': ('Weeding between rows', 400.0, 2),
+    'fertilizer application': ('Spreading fertilizer', 420.0, 1),
+}
+
+# Inventory items: unit quantity range
+INVENTORY_ITEMS = {
+    'NPK 26:5:5 fertilizer (50kg bags)': (10, 80),
+    'Plucking baskets': (20, 120),
+    'Pruning knives': (5, 30),
+    'Gumboots (pairs)': (10, 60),
+    'Weighing scales': (1, 4),
+}
+
+# Chance a plucker comes to work on a given working day
+ATTENDANCE = 0.9
+# Share of pluckers hired for the flushes only, who work on days of
+# above average yield
+SEASONAL_SHARE = 0.3
+# Day of the year of the peak flush, and how strongly yields swing
+PEAK_DAY = 130
+SEASONAL_SWING = 0.3
+
+DEFAULT_BATCH_SIZE = 10000
+
+
+def seasonal_yield(day):
+    """
+    Return the yield of a day relative to the yearly average.
+
+    Two peaks a year, around mid-May and early November, with troughs
+    in February and August.
+    """
+    angle = 4 * math.pi * (day.timetuple().tm_yday - PEAK_DAY) / 365.25
+    return 1 + SEASONAL_SWING * math.cos(angle)
+
+
+class _Ids:
+    """
+    Reproducible UUIDs that sort in the order they were made.
+
+    The high 48 bits count up and the rest are random, like a UUIDv7
+    with a counter for the clock, so the primary key indexes are
+    appended to instead of being split all over on every insert.
+    """
+
+    def __init__(self, rng):
+        self._rng = rng
+        self._count = 0
+
+    def __call__(self):
+        self._count += 1
+        return str(uuid.UUID(
+            int=self._count << 80 | self._rng.getrandbits(80), version=4))
+
+
+def _stamp(day):
+    """The time a row dated day was written: that evening."""
+    return datetime.combine(day, time(18))
+
+
+def _insert(model, rows, batch_size):
+    """Insert rows, an iterable of dicts, in committed batches."""
+    statement = model.__table__.insert()
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(statement, batch)
+            db.session.commit()
+            count += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(statement, batch)
+        db.session.commit()
+        count += len(batch)
+    return count
+
+
+def seed_farms(farmers, pluckers, days, seed=42, end=None,
+               password=SEED_PASSWORD, batch_size=DEFAULT_BATCH_SIZE,
+               progress=None):
+    """
+    Generate a farm data set and write it to the database.
+
+    Args:
+        farmers (int): Farmers to create.
+        pluckers (int): Pluckers per farmer.
+        days (int): Days of weigh-ins, expenses and prices.
+        seed (int): Seed of the random generator.
+        end (date): The last day covered; yesterday by default.
+        password (str): Password of every seeded farmer and employee.
+        batch_size (int): Rows inserted per statement and transaction.
+        progress (callable): Called with a message after each table.
+
+    Returns:
+        dict: The number of rows written, by table.
+
+    Raises:
+        ValueError: If the database already holds seeded farmers.
+    """
+    progress = progress or (lambda message: None)
+    end = end or date.today() - timedelta(days=1)
+    first_day = end - timedelta(days=days - 1)
+    if db.session.execute(select(Farmer.id).where(
+            Farmer.email == f"farmer0@{EMAIL_DOMAIN}")).first():
+        raise ValueError("The database already holds seeded farmers.")
+
+    rng = random.Random(seed)
+    new_id = _Ids(rng)
+    # One hash for everyone; hashing thousands of passwords would take
+    # longer than inserting millions of weigh-ins
+    password_hash = generate_password_hash(password)
+    joined = _stamp(first_day - timedelta(days=1))
+    counts = {}
+
+    def row(**values):
+        return dict(values, id=new_id(), created_at=values.get(
+            'created_at', joined), updated_at=values.get(
+            'created_at', joined))
+
+    # Farmers, labour types and workers
+    farmer_rows, labour_rows, employee_rows = [], [], []
+    farms = []
+    for number in range(farmers):
+        farmer = row(name=f"Seed Farmer {number}",
+                     email=f"farmer{number}@{EMAIL_DOMAIN}",
+                     phone_number=f"07{number:08d}",
+                     farm_name=f"Seed Estate {number}",
+                     location=rng.choice(('Kericho', 'Nandi', 'Bomet',
+                                          'Nyeri', 'Murang\'a', 'Meru')),
+                     total_acreage=round(rng.uniform(2, 40), 1),
+                     password_hash=password_hash)
+        farmer_rows.append(farmer)
+
+        plucking = row(type='plucking', description='Plucking green leaf',
+                       rate=round(rng.uniform(10, 14), 1),
+                       farmer_id=farmer['id'])
+        labour_rows.append(plucking)
+        day_labour = {}
+        for kind, (description, wage, workers) in DAY_LABOUR.items():
+            labour = row(type=kind, description=description,
+                         rate=round(wage * rng.uniform(0.9, 1.1)),
+                         farmer_id=farmer['id'])
+            labour_rows.append(labour)
+            day_labour[kind] = (labour, workers)
+
+        def worker(index, labour):
+            return row(name=f"Worker {number}-{index}",
+                       phone_number=f"01{number:04d}{index:04d}",
+                       password_hash=password_hash,
+                       labour_id=labour['id'], farmer_id=farmer['id'])
+
+        plucker_rows = []
+        permanent = pluckers - int(pluckers * SEASONAL_SHARE)
+        for index in range(pluckers):
+            plucker = worker(index, plucking)
+            # Some pluckers are faster than others all year round
+            plucker_rows.append((plucker['id'], max(rng.gauss(22, 4), 8),
+                                 index >= permanent))
+            employee_rows.append(plucker)
+        index = pluckers
+        for labour, workers in day_labour.values():
+            for _ in range(workers):
+                employee_rows.append(worker(index, labour))
+                index += 1
+
+        farms.append({'id': farmer['id'], 'plucking': plucking,
+                      'day_labour': day_labour, 'pluckers': plucker_rows})
+
+    counts['farmers'] = _insert(Farmer, farmer_rows, batch_size)
+    counts['labours'] = _insert(Labour, labour_rows, batch_size)
+    counts['employees'] = _insert(Employee, employee_rows, batch_size)
+    progress(f"{counts['farmers']} farmers, {counts['employees']} employees")
+
+    counts['inventories'] = _insert(Inventory, (
+        row(item_name=item, quantity=float(rng.randint(*quantities)),
+            farmer_id=farm['id'])
+        for farm in farms for item, quantities in INVENTORY_ITEMS.items()),
+        batch_size)
+
+    # Weigh-ins. What they earn is paid out as wages on the Saturday
+    # closing the week.
+    wages = defaultdict(float)
+
+    def weigh_ins():
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            if day.weekday() == 6:
+                continue
+            season = seasonal_yield(day)
+            stamp = _stamp(day)
+            payday = day + timedelta(days=5 - day.weekday())
+            for farm in farms:
+                rate = farm['plucking']['rate']
+                for employee_id, pace, seasonal in farm['pluckers']:
+                    if seasonal and season < 1 or rng.random() >= ATTENDANCE:
+                        continue
+                    weight = round(max(
+                        pace * season * rng.lognormvariate(0, 0.15), 1), 1)
+                    wages[farm['id'], payday] += weight * rate
+                    yield {'id': new_id(), 'created_at': stamp,
+                           'updated_at': stamp, 'farmer_id': farm['id'],
+                           'employee_id': employee_id, 'weight': weight,
+                           'rate': rate, 'date': day}
+
+    counts['productions'] = _insert(ProductionRecord, weigh_ins(),
+                                    batch_size)
+    progress(f"{counts['productions']} weigh-ins")
+    ProductionDailyTotal.rebuild()
+    progress("daily production totals rebuilt")
+
+    # Expenses come after the weigh-ins, once the wages are known
+    def expenses():
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            stamp = _stamp(day)
+            for farm in farms:
+                if day.weekday() == 5:
+                    yield row(created_at=stamp, date=day,
+                              farmer_id=farm['id'],
+                              category_id=farm['plucking']['id'],
+                              description='Plucking wages',
+                              amount=round(wages[farm['id'], day], 2))
+                    for kind, (labour, workers) in \
+                            farm['day_labour'].items():
+                        yield row(created_at=stamp, date=day,
+                                  farmer_id=farm['id'],
+                                  category_id=labour['id'],
+                                  description=f"{kind.capitalize()} wages",
+                                  amount=labour['rate'] * workers * 6)
+                if day.day == 1:
+                    labour, workers = farm['day_labour'][
+                        'fertilizer application']
+                    yield row(created_at=stamp, date=day,
+                              farmer_id=farm['id'],
+                              category_id=labour['id'],
+                              description='Fertilizer purchase',
+                              amount=round(rng.uniform(8000, 30000), -2))
+
+    counts['expenses'] = _insert(Expense, expenses(), batch_size)
+    progress(f"{counts['expenses']} expenses")
+
+    counts['market_values'] = _insert(
+        MarketValue, _market_prices(first_day, days, rng, new_id),
+        batch_size)
+    progress(f"{counts['market_values']} market prices")
+    return counts
+
+
+def _market_prices(first_day, days, rng, new_id):
+    """
+    Daily green leaf prices in KES per kg: cheaper in the flush, dearer
+    in the troughs, with a random walk on top. Days that already have
+    a price are skipped.
+    """
+    priced = set(db.session.execute(select(MarketValue.date).where(
+        MarketValue.date >= first_day)).scalars())
+    drift = 0.0
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        drift = max(min(drift + rng.gauss(0, 0.15), 3), -3)
+        if day in priced:
+            continue
+        price = 24 - 6 * (seasonal_yield(day) - 1) + drift
+        stamp = _stamp(day)
+        yield {'id': new_id(), 'created_at': stamp, 'updated_at': stamp,
+               'date': day, 'price_per_kg': round(price, 2)}
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Revoked JWTs, shared by every worker and forgotten once they expire.
+
+A revoked token only has to be remembered until its `exp`: after that
+flask_jwt_extended refuses it anyway. Two backends hold the entries:
+
+    database  the revoked_tokens table, pruned of expired rows
+    redis     keys with a TTL in Redis, or in any client with the same
+              set/exists/scan_iter methods such as MemoryStore below
+
+Almost every request carries a token that was never revoked, so each
+worker keeps a Bloom filter of the revoked jtis. A jti that is not in
+the filter is answered without asking the backend; only possible hits
+are checked. The filter is rebuilt from the backend every
+JWT_BLOCKLIST_SYNC_INTERVAL seconds, which bounds how long a logout
+made through another worker can go unnoticed here. Set the interval to
+0 to ask the backend on every request.
+"""
+
+import fnmatch
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import delete, select
+from models import db
+from models.revoked_token import RevokedToken
+
+BACKENDS = ('database', 'redis', 'memory')
+# Seconds between two rebuilds of a worker's Bloom filter
+DEFAULT_SYNC_INTERVAL = 5
+# Revoked tokens a filter is sized for before its error rate climbs
+DEFAULT_CAPACITY = 10000
+KEY_PREFIX = 'teafarm:revoked:'
+
+
+def _utc_datetime(timestamp):
+    """Convert a Unix timestamp to the naive UTC datetime the DB stores."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+class BloomFilter:
+    """
+    Fixed-size set membership test with false positives but no false
+    negatives: `key in bloom` is False only if the key was never added.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=0.01):
+        self.size = math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        """Yield the bits of a key, by double hashing one digest."""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        for index in range(self.hashes):
+            yield (first + index * second) % self.size
+
+    def add(self, key):
+        """Add a key to the filter."""
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self._bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(key))
+
+
+class MemoryStore:
+    """
+    In-process stand-in for a Redis client, implementing the few
+    commands RedisBackend uses. Entries are not shared between
+    processes: use it for tests and single-process servers.
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def _live(self, name):
+        """Return whether a key exists, dropping it if it has expired."""
+        entry = self._data.get(name)
+        if entry is None:
+            return False
+        if entry[1] is not None and entry[1] <= self._clock():
+            del self._data[name]
+            return False
+        return True
+
+    def set(self, name, value, ex=None):
+        with self._lock:
+            expires = self._clock() + ex if ex is not None else None
+            self._data[name] = (value, expires)
+        return True
+
+    def get(self, name):
+        with self._lock:
+            return self._data[name][0] if self._live(name) else None
+
+    def exists(self, *names):
+        with self._lock:
+            return sum(1 for name in names if self._live(name))
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(1 for name in names
+                       if self._live(name) and self._data.pop(name))
+
+    def scan_iter(self, match='*'):
+        with self._lock:
+            names = [name for name in list(self._data)
+                     if fnmatch.fnmatchcase(name, match) and self._live(name)]
+        return iter(names)
+
+
+class DatabaseBackend:
+    """Revoked tokens in the revoked_tokens table."""
+
+    def add(self, jti, expires_at):
+        """Record a revoked token and drop the rows that have expired."""
+        db.session.merge(RevokedToken(jti=jti,
+                                      expires_at=_utc_datetime(expires_at)))
+        # Logouts are rare, so pruning here keeps the table small
+        # without a scheduled job
+        self._delete_expired()
+        db.session.commit()
+
+    def contains(self, jti):
+        """Return whether a token is revoked and not yet expired."""
+        return db.session.execute(
+            select(RevokedToken.jti).where(
+                RevokedToken.jti == jti,
+                RevokedToken.expires_at > _utc_datetime(time.time()))
+        ).first() is not None
+
+    def live_jtis(self):
+        """Return the jti of every revoked token not yet expired."""
+        return db.session.execute(
+            select(RevokedToken.jti).where(
+                RevokedToken.expires_at > _utc_datetime(time.time()))
+        ).scalars().all()
+
+    def _delete_expired(self):
+        return db.session.execute(
+            delete(RevokedToken).where(
+                RevokedToken.expires_at <= _utc_datetime(time.time()))
+        ).rowcount
+
+    def prune(self):
+        """Delete expired rows and return how many were removed."""
+        removed = self._delete_expired()
+        db.session.commit()
+        return removed
+
+
+class RedisBackend:
+    """Revoked tokens as Redis keys that expire with the token."""
+
+    def __init__(self, client, prefix=KEY_PREFIX):
+        self.client = client
+        self.prefix = prefix
+
+    def add(self, jti, expires_at):
+        """Record a revoked token until its expiry."""
+        ttl = max(1, math.ceil(expires_at - time.time()))
+        self.client.set(self.prefix + jti, 1, ex=ttl)
+
+    def contains(self, jti):
+        """Return whether a token is revoked and not yet expired."""
+        return bool(self.client.exists(self.prefix + jti))
+
+    def live_jtis(self):
+        """Return the jti of every revoked token not yet expired."""
+        jtis = []
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            if isinstance(key, bytes):
+                key = key.decode()
+            jtis.append(key[len(self.prefix):])
+        return jtis
+
+    def prune(self):
+        """Nothing to do: the store expires the keys itself."""
+        return 0
+
+
+def make_backend(config):
+    """
+    Build the backend named by JWT_BLOCKLIST_BACKEND.
+
+    Raises:
+        ValueError: If the backend is unknown.
+        RuntimeError: If the redis backend is chosen without the redis
+            package installed.
+    """
+    name = config.get('JWT_BLOCKLIST_BACKEND', 'database')
+    if name == 'database':
+        return DatabaseBackend()
+    if name == 'memory':
+        return RedisBackend(MemoryStore())
+    if name == 'redis':
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                "JWT_BLOCKLIST_BACKEND = 'redis' needs the redis package")
+        return RedisBackend(
+            redis.Redis.from_url(config['JWT_BLOCKLIST_REDIS_URL']))
+    raise ValueError(
+        f"JWT_BLOCKLIST_BACKEND must be one of {', '.join(BACKENDS)}")
+
+
+class _BlocklistState:
+    """The backend of one app and this worker's filter in front of it."""
+
+    def __init__(self, backend, sync_interval, clock=time.monotonic):
+        self.backend = backend
+        self.sync_interval = sync_interval
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.synced_at = None
+
+    def sync(self):
+        """Rebuild the filter from the backend if it is due."""
+        with self.lock:
+            now = self.clock()
+            if (self.synced_at is not None and
+                    now - self.synced_at < self.sync_interval):
+                return
+            jtis = self.backend.live_jtis()
+            bloom = BloomFilter(max(DEFAULT_CAPACITY, 2 * len(jtis)))
+            for jti in jtis:
+                bloom.add(jti)
+            self.bloom = bloom
+            self.synced_at = now
+
+
+class TokenBlocklist:
+    """
+    Flask extension answering flask_jwt_extended's blocklist check.
+
+    Usage:
+        token_blocklist.init_app(app)
+        token_blocklist.revoke(jti, exp)
+        token_blocklist.is_revoked(jti)
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, backend=None):
+        """Attach a backend, built from the app config by default."""
+        app.extensions['token_blocklist'] = _BlocklistState(
+            backend or make_backend(app.config),
+            app.config.get('JWT_BLOCKLIST_SYNC_INTERVAL',
+                           DEFAULT_SYNC_INTERVAL))
+
+    @staticmethod
+    def _state():
+        return current_app.extensions['token_blocklist']
+
+    def revoke(self, jti, expires_at):
+        """
+        Revoke a token until it expires.
+
+        Args:
+            jti (str): The token's unique id.
+            expires_at (int): The token's `exp` claim, a Unix timestamp.
+        """
+        state = self._state()
+        if expires_at <= time.time():
+            return
+        with state.lock:
+            state.backend.add(jti, expires_at)
+            if state.bloom is not None:
+                state.bloom.add(jti)
+
+    def is_revoked(self, jti):
+        """Return whether a token has been revoked."""
+        state = self._state()
+        if state.sync_interval <= 0:
+            return state.backend.contains(jti)
+        state.sync()
+        if jti not in state.bloom:
+            return False
+        return state.backend.contains(jti)
+
+    def prune(self):
+        """Delete expired entries and return how many were removed."""
+        return self._state().backend.prune()
+
+
+token_blocklist = TokenBlocklist()
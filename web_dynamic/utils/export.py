@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Helpers for streaming query results to the client as CSV or NDJSON.
+
+Rows are read from a server-side cursor in batches and written to the
+response as they arrive, so memory use does not grow with the size of
+the table and the first bytes are sent before the query has finished.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from flask import Response, stream_with_context
+from models import db
+
+# Supported export formats and their MIME types
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows fetched from the cursor per round trip
+EXPORT_BATCH_SIZE = 1000
+
+
+def _serialize(value):
+    """Convert a column value to something CSV and JSON can write."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunk(rows):
+    """Encode a batch of rows as CSV text."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def stream_rows(statement, export_format, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yield the rows of a SELECT as encoded text chunks.
+
+    Args:
+        statement: A Core SELECT whose column labels become the field
+            names.
+        export_format (str): 'csv' or 'ndjson'.
+        batch_size (int): Rows fetched from the cursor per batch.
+    """
+    columns = [column.key for column in statement.selected_columns]
+    if export_format == 'csv':
+        # Send the header before the query runs
+        yield _csv_chunk([columns])
+
+    result = db.session.execute(
+        statement.execution_options(yield_per=batch_size))
+    try:
+        for partition in result.partitions():
+            rows = [[_serialize(value) for value in row]
+                    for row in partition]
+            if export_format == 'csv':
+                yield _csv_chunk(rows)
+            else:
+                yield ''.join(json.dumps(dict(zip(columns, row))) + '\n'
+                              for row in rows)
+    finally:
+        result.close()
+
+
+def export_response(statement, export_format, filename):
+    """
+    Build a streaming download response for a SELECT.
+
+    Args:
+        statement: The Core SELECT to export.
+        export_format (str): 'csv' or 'ndjson'.
+        filename (str): Download name without extension.
+    """
+    return Response(
+        stream_with_context(stream_rows(statement, export_format)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            'Content-Disposition':
+                f'attachment; filename={filename}.{export_format}'
+        }
+    )
+
+
+def parse_date_range(args):
+    """
+    Read optional start_date and end_date (YYYY-MM-DD) query arguments.
+
+    Returns:
+        tuple: The start and end dates, either of which may be None.
+
+    Raises:
+        ValueError: If a date is malformed or the range is inverted.
+    """
+    bounds = []
+    for name in ('start_date', 'end_date'):
+        value = args.get(name)
+        bounds.append(
+            datetime.strptime(value, '%Y-%m-%d').date() if value else None)
+    start_date, end_date = bounds
+    if start_date and end_date and start_date > end_date:
+        raise ValueError("start_date must not be after end_date")
+    return start_date, end_date
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Prometheus metrics, served at /metrics.
+
+Every worker records its own samples. Under gunicorn, set
+PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py does) so that each worker
+writes them to memory-mapped files in that directory; whichever worker
+answers the scrape then adds up the files of all of them, and
+Prometheus sees one coherent view of the whole server. Without it the
+metrics cover the answering process only, which is right for the
+single-process development server.
+
+Metrics:
+    teafarm_request_duration_seconds  histogram by blueprint, route
+                                      and method
+    teafarm_requests_total            counter, also by status
+    teafarm_request_errors_total      counter of 5xx responses
+    teafarm_db_pool_checked_out       connections in use, all workers
+    teafarm_db_pool_overflow          connections past pool_size
+    teafarm_cache_hits_total          counters by cache; the hit ratio
+    teafarm_cache_misses_total        is hits / (hits + misses)
+    teafarm_pdf_render_seconds        histogram of PDF render times
+"""
+
+import os
+import time
+from flask import Response, g, request
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry,\
+    Counter, Gauge, Histogram, generate_latest, multiprocess, REGISTRY
+from models import db
+from web_dynamic.services.dashboard import dashboard_cache
+from web_dynamic.services.identity import identity_cache
+from web_dynamic.services.market_prices import price_history
+
+REQUEST_LABELS = ('blueprint', 'route', 'method')
+
+REQUEST_DURATION = Histogram(
+    'teafarm_request_duration_seconds', 'Time spent handling a request.',
+    REQUEST_LABELS,
+    buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10))
+REQUESTS = Counter(
+    'teafarm_requests', 'Requests handled.', REQUEST_LABELS + ('status',))
+REQUEST_ERRORS = Counter(
+    'teafarm_request_errors', 'Requests answered with a 5xx status.',
+    REQUEST_LABELS)
+POOL_CHECKED_OUT = Gauge(
+    'teafarm_db_pool_checked_out', 'Database connections in use.',
+    multiprocess_mode='livesum')
+POOL_OVERFLOW = Gauge(
+    'teafarm_db_pool_overflow',
+    'Database connections opened beyond the pool size.',
+    multiprocess_mode='livesum')
+CACHE_HITS = Counter(
+    'teafarm_cache_hits', 'Cache lookups answered from the cache.',
+    ('cache',))
+CACHE_MISSES = Counter(
+    'teafarm_cache_misses', 'Cache lookups that had to compute the value.',
+    ('cache',))
+PDF_RENDER_DURATION = Histogram(
+    'teafarm_pdf_render_seconds', 'Time spent rendering a report PDF.',
+    buckets=(.1, .25, .5, 1, 2.5, 5, 10, 30, 60, 120))
+
+# Per-process caches whose hit and miss counts are exported
+CACHES = {
+    'dashboard': dashboard_cache,
+    'identity': identity_cache,
+    'market_prices': price_history,
+}
+# Counts already exported, per cache
+_exported = {}
+
+
+def _sync_cache_counters():
+    """Add what each cache counted since the last call to the counters."""
+    for name, cache in CACHES.items():
+        stats = cache.stats()
+        last_hits, last_misses = _exported.get(name, (0, 0))
+        hits, misses = stats['hits'], stats['misses']
+        # A cache whose counters were reset starts again from zero
+        if hits < last_hits or misses < last_misses:
+            last_hits = last_misses = 0
+        CACHE_HITS.labels(name).inc(hits - last_hits)
+        CACHE_MISSES.labels(name).inc(misses - last_misses)
+        _exported[name] = (hits, misses)
+
+
+def _sync_pool_gauges():
+    """Record the connection pool usage of this process."""
+    pool = db.engine.pool
+    if hasattr(pool, 'checkedout'):
+        POOL_CHECKED_OUT.set(pool.checkedout())
+    if hasattr(pool, 'overflow'):
+        POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+
+
+def _record_request(response):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+    labels = (request.blueprint or '',
+              request.url_rule.rule if request.url_rule else 'unmatched',
+              request.method)
+    REQUEST_DURATION.labels(*labels).observe(time.perf_counter() - started)
+    REQUESTS.labels(*labels, str(response.status_code)).inc()
+    if response.status_code >= 500:
+        REQUEST_ERRORS.labels(*labels).inc()
+    _sync_cache_counters()
+    _sync_pool_gauges()
+    return response
+
+
+def render_metrics():
+    """Return the metrics of every worker in the Prometheus text format."""
+    _sync_cache_counters()
+    _sync_pool_gauges()
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def metrics():
+    """Serve the metrics to a Prometheus scrape."""
+    return Response(render_metrics(), content_type=CONTENT_TYPE_LATEST)
+
+
+def init_app(app):
+    """Record metrics for every request and serve them at /metrics."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    app.before_request(_start_request)
+    app.after_request(_record_request)
+    app.add_url_rule('/metrics', 'metrics', metrics)
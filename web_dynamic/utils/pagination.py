@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Keyset (cursor) pagination for the API list endpoints.
+
+Pages are ordered newest first by a sort column and the primary key.
+The next page starts strictly after the last row of the previous one,
+so a page costs the same whether it is the first or the five
+thousandth. Cursors are opaque to clients.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from sqlalchemy import and_, or_
+
+# Page size used when the client does not send a limit
+DEFAULT_PAGE_SIZE = 100
+# Largest page a client may ask for
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(sort_value, id_value):
+    """Encode the position of a row as an opaque cursor string."""
+    if isinstance(sort_value, (date, datetime)):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, id_value]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort_column):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        # The values go into the WHERE clause, so a tampered cursor
+        # must not get through with anything but a date and an id
+        if not isinstance(payload, list) or len(payload) != 2:
+            raise ValueError
+        sort_value, id_value = payload
+        if not isinstance(sort_value, str) or \
+                not isinstance(id_value, str):
+            raise ValueError
+        python_type = sort_column.type.python_type
+        if python_type in (date, datetime):
+            sort_value = python_type.fromisoformat(sort_value)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    return sort_value, id_value
+
+
+def get_page_args(args, sort_column):
+    """
+    Read the limit and cursor query arguments.
+
+    Returns:
+        tuple: The page size and the decoded cursor (or None).
+
+    Raises:
+        ValueError: If the limit or cursor is invalid.
+    """
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    cursor = args.get('cursor')
+    if cursor:
+        cursor = decode_cursor(cursor, sort_column)
+    return limit, cursor or None
+
+
+def keyset_paginate(query, sort_column, id_column, limit, cursor=None):
+    """
+    Fetch one page of a query ordered by (sort_column, id_column)
+    descending.
+
+    Args:
+        query: The filtered ORM query to page through.
+        sort_column: The column pages are ordered by, e.g. a date.
+        id_column: The primary key, used to break ties.
+        limit (int): The page size.
+        cursor (tuple): The decoded cursor of the previous page.
+
+    Returns:
+        tuple: The rows of the page and the cursor of the next page,
+        which is None on the last page.
+    """
+    if cursor is not None:
+        sort_value, id_value = cursor
+        query = query.filter(or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < id_value)
+        ))
+
+    rows = query.order_by(
+        sort_column.desc(), id_column.desc()
+    ).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
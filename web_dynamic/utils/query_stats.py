@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Per-request SQL statistics and N+1 detection.
+
+Every statement run while a Flask request is being handled is counted
+and timed. When the request ends, it is logged if it ran more than
+QUERY_COUNT_THRESHOLD statements or spent more than
+QUERY_TIME_THRESHOLD_MS in the database. Any statement shape executed
+N_PLUS_ONE_THRESHOLD times or more is also flagged as a likely N+1,
+with the route that ran it. Two statements have the same shape when
+they differ only in their parameters.
+
+For tests, count_queries and assert_max_queries count the statements
+run inside a block, e.g. around a test client call:
+
+    with assert_max_queries(3):
+        client.get('/api/employees', headers=headers)
+"""
+
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_COUNT_THRESHOLD = 50
+DEFAULT_TIME_THRESHOLD_MS = 200
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+
+_WHITESPACE = re.compile(r'\s+')
+# Expanded IN lists and multi-row VALUES differ only in their length
+_PARAMETER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)|'
+                             r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+
+
+def statement_shape(statement):
+    """Return a statement with whitespace and parameter lists folded."""
+    statement = _WHITESPACE.sub(' ', statement).strip()
+    return _PARAMETER_LIST.sub('(?)', statement)
+
+
+class QueryStats:
+    """
+    The statements one request ran, the time they took and the rows
+    they returned. Rows are only known for drivers that report the
+    row count of a SELECT, such as mysqlclient; sqlite3 does not, and
+    rows stays None.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.rows = None
+        self.statements = Counter()
+
+    def record(self, statement, duration, rows=None):
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+        if rows is not None:
+            self.rows = (self.rows or 0) + rows
+
+    def repeated(self, threshold):
+        """
+        Return the SELECT shapes run at least threshold times, with
+        their counts, most repeated first.
+        """
+        shapes = Counter()
+        for statement, count in self.statements.items():
+            shapes[statement_shape(statement)] += count
+        return [(shape, count) for shape, count in shapes.most_common()
+                if count >= threshold and shape.upper().startswith('SELECT')]
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info['query_started'].pop()
+    if has_app_context():
+        rows = None
+        if cursor.rowcount >= 0 and statement[:6].upper() == 'SELECT':
+            rows = cursor.rowcount
+        for stats in g.get('query_stats_stack', ()):
+            stats.record(statement, duration, rows)
+
+
+def _push(stats):
+    g.query_stats_stack = g.get('query_stats_stack', ()) + (stats,)
+
+
+def _pop(stats):
+    g.query_stats_stack = tuple(
+        other for other in g.get('query_stats_stack', ())
+        if other is not stats)
+
+
+def current_query_stats():
+    """Return the statistics of the request being handled, if any."""
+    return g.get('query_stats') if has_app_context() else None
+
+
+def _begin_request():
+    g.query_stats = QueryStats()
+    _push(g.query_stats)
+
+
+def _end_request(exception=None):
+    stats = g.pop('query_stats', None)
+    if stats is None:
+        return
+    _pop(stats)
+    config = current_app.config
+    route = f"{request.method} {request.endpoint or request.path}"
+    duration_ms = stats.duration * 1000
+
+    if stats.count > config.get('QUERY_COUNT_THRESHOLD',
+                                DEFAULT_COUNT_THRESHOLD) or \
+            duration_ms > config.get('QUERY_TIME_THRESHOLD_MS',
+                                     DEFAULT_TIME_THRESHOLD_MS):
+        current_app.logger.warning(
+            "%s ran %d queries in %.1f ms", route, stats.count, duration_ms)
+
+    for shape, count in stats.repeated(config.get(
+            'N_PLUS_ONE_THRESHOLD', DEFAULT_N_PLUS_ONE_THRESHOLD)):
+        current_app.logger.warning(
+            "Likely N+1 in %s: ran %d times: %s", route, count, shape)
+
+
+def init_app(app):
+    """Count the statements of every request the app handles."""
+    app.before_request(_begin_request)
+    app.teardown_request(_end_request)
+
+
+@contextmanager
+def count_queries():
+    """
+    Count the statements run inside the block, including those of any
+    request handled in it. Needs an app context.
+
+    Yields:
+        QueryStats: Filled in as statements run.
+    """
+    stats = QueryStats()
+    _push(stats)
+    try:
+        yield stats
+    finally:
+        _pop(stats)
+
+
+@contextmanager
+def assert_max_queries(limit):
+    """
+    Fail with the statements run if the block runs more than limit.
+
+    Raises:
+        AssertionError: If more than limit statements ran.
+    """
+    with count_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        statements = '\n'.join(
+            f"  {count} x {statement_shape(statement)}"
+            for statement, count in stats.statements.most_common())
+        raise AssertionError(
+            f"Expected at most {limit} queries, ran {stats.count}:\n"
+            f"{statements}")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Server-Timing headers and one structured log line per request.
+
+Each request is split into spans:
+
+    auth       verifying the JWT (signature and blocklist) or loading
+               the Flask-Login user
+    db         time spent in SQL, from query_stats
+    render     rendering Jinja templates
+    serialize  encoding JSON responses
+    pdf        rendering or queueing PDF reports
+
+Spans measure wall time and may overlap: a blocklist lookup counts
+towards both auth and db. The spans are sent to the browser in a
+Server-Timing header (visible in the devtools network panel) and
+written, with the route, status, payload size and rows fetched, as one
+JSON line on the "teafarm.requests" logger.
+"""
+
+import json
+import logging
+import time
+from contextlib import contextmanager
+from flask import g, has_app_context, request, template_rendered,\
+    before_render_template
+from flask.json.provider import DefaultJSONProvider
+from web_dynamic.utils.query_stats import current_query_stats
+
+SPANS = ('auth', 'db', 'render', 'serialize', 'pdf')
+
+logger = logging.getLogger('teafarm.requests')
+
+
+class RequestTimer:
+    """Milliseconds spent in each span of one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = dict.fromkeys(SPANS, 0.0)
+        self._open = {}
+
+    def start(self, name):
+        self._open.setdefault(name, []).append(time.perf_counter())
+
+    def stop(self, name):
+        starts = self._open.get(name)
+        if starts:
+            self.spans[name] += (time.perf_counter() - starts.pop()) * 1000
+
+    def close(self):
+        """Stop the spans left open, e.g. by a token that failed to
+        verify after decoding began."""
+        for name, starts in self._open.items():
+            while starts:
+                self.stop(name)
+
+    def total(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def _timer():
+    return g.get('request_timer') if has_app_context() else None
+
+
+def start_span(name):
+    """Start timing a span of the current request, if there is one."""
+    timer = _timer()
+    if timer is not None:
+        timer.start(name)
+
+
+def stop_span(name):
+    """Stop timing a span of the current request."""
+    timer = _timer()
+    if timer is not None:
+        timer.stop(name)
+
+
+@contextmanager
+def span(name):
+    """Time the block as part of a span of the current request."""
+    start_span(name)
+    try:
+        yield
+    finally:
+        stop_span(name)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, timing encoding as the serialize span."""
+
+    def dumps(self, obj, **kwargs):
+        with span('serialize'):
+            return super().dumps(obj, **kwargs)
+
+
+def _start_render(sender, template, context, **extra):
+    start_span('render')
+
+
+def _stop_render(sender, template, context, **extra):
+    stop_span('render')
+
+
+def _begin_request():
+    g.request_timer = RequestTimer()
+
+
+def server_timing(spans, total, queries):
+    """Build a Server-Timing header value."""
+    entries = []
+    for name, duration in spans.items():
+        if duration or name == 'db':
+            entry = f"{name};dur={duration:.1f}"
+            if name == 'db':
+                entry += f';desc="{queries} queries"'
+            entries.append(entry)
+    entries.append(f"total;dur={total:.1f}")
+    return ', '.join(entries)
+
+
+def _finish_request(response):
+    timer = g.pop('request_timer', None)
+    if timer is None:
+        return response
+    timer.close()
+    stats = current_query_stats()
+    spans = dict(timer.spans)
+    queries, rows = 0, None
+    if stats is not None:
+        spans['db'] = stats.duration * 1000
+        queries, rows = stats.count, stats.rows
+    total = timer.total()
+
+    response.headers['Server-Timing'] = server_timing(spans, total, queries)
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({
+            'method': request.method,
+            'route': request.url_rule.rule if request.url_rule else None,
+            'path': request.path,
+            'status': response.status_code,
+            # Unknown for streamed responses
+            'bytes': None if response.is_streamed
+            else response.calculate_content_length(),
+            'queries': queries,
+            'rows': rows,
+            'timings_ms': {name: round(duration, 2)
+                           for name, duration in spans.items()},
+            'total_ms': round(total, 2),
+        }))
+    return response
+
+
+def init_app(app):
+    """Time every request the app handles."""
+    app.json = TimedJSONProvider(app)
+    app.before_request(_begin_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_start_render, app)
+    template_rendered.connect(_stop_render, app)
+
+    if app.config.get('REQUEST_LOG', True) and not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
@@ -0,0 +1,16 @@
+#!/usr/bin/python3
+"""
+WSGI entry point for multi-worker deployments.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app (set in gunicorn.conf.py) this module is imported once
+in the master: the app is built and warmed up there, and the workers
+fork with it already in memory.
+"""
+
+from web_dynamic.app import create_app, warm_up
+from web_dynamic.config import ProductionConfig
+
+app = create_app(ProductionConfig)
+warm_up(app)